@@ -0,0 +1,91 @@
+"""
+Benchmark the vectorized and event-driven backtests against a per-bar Python loop.
+
+Generates a synthetic price panel and buy/sell/hold actions, checks both
+engines against a straightforward loop (one ticker and one cost at a time,
+as a notebook would write it), then backtests every ticker across a grid of
+cost levels and action variants in one call.
+
+    python benchmarks/bench_backtest.py --tickers 50 --years 20 --costs 20
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.train.backtest import backtest
+
+
+def loop_backtest(prices: np.ndarray, actions: np.ndarray, cost: float, min_hold: int = 0,
+                  stop_loss: float = None) -> np.ndarray:
+    """Reference: walk the bars of one ticker with the bot's is_buying state machine."""
+    returns = np.zeros(len(prices))
+    position, held, entry = 0.0, 0, np.nan
+    for t in range(len(prices)):
+        if t > 0:
+            returns[t] = position * (prices[t] / prices[t - 1] - 1.0)
+            held += position != 0
+        new = position
+        if stop_loss is not None and position != 0 and prices[t] / entry - 1.0 <= -stop_loss:
+            new = 0.0
+        elif actions[t] == 1 and (position == 0 or held >= min_hold):
+            new = 1.0
+        elif actions[t] == 2 and (position == 0 or held >= min_hold):
+            new = 0.0
+        if new != position:
+            returns[t] -= cost * abs(new - position)
+            entry, held = (prices[t] if new != 0 else np.nan), 0
+        position = new
+    return returns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--costs", type=int, default=20)
+    parser.add_argument("--variants", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_bars = 252 * args.years
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (n_bars, args.tickers)), axis=0))
+    actions = rng.choice([0, 1, 2], p=[0.8, 0.1, 0.1], size=(n_bars, args.tickers, args.variants))
+    costs = np.linspace(0.0, 0.002, args.costs)
+
+    # Equivalence with the per-bar loop
+    for kwargs in ({}, {"min_hold": 5, "stop_loss": 0.05}):
+        result = backtest(prices[:, :3], actions[:, :3, 0], cost=0.001, **kwargs)
+        for j in range(3):
+            expected = loop_backtest(prices[:, j], actions[:, j, 0], 0.001, **kwargs)
+            assert np.allclose(result.returns[:, j], expected, rtol=0, atol=1e-12), kwargs
+
+    n_series = args.tickers * args.variants * args.costs
+    print(f"bars={n_bars} tickers={args.tickers} variants={args.variants} costs={args.costs} series={n_series}")
+
+    start = time.perf_counter()
+    for j in range(min(args.tickers, 5)):
+        loop_backtest(prices[:, j], actions[:, j, 0], costs[0])
+    loop_time = (time.perf_counter() - start) / min(args.tickers, 5)
+    print(f"python loop            : {loop_time * n_series:9.2f} s  (estimated, {loop_time * 1e3:.1f} ms per series)")
+
+    # Every ticker x action variant x cost level in one call: (bars, tickers, variants, costs)
+    start = time.perf_counter()
+    result = backtest(prices[:, :, None, None], actions[:, :, :, None], cost=costs)
+    stats = result.stats()
+    vector_time = time.perf_counter() - start
+    print(f"vectorized             : {vector_time:9.2f} s  ({loop_time * n_series / vector_time:7.1f}x)  "
+          f"best sharpe={stats['sharpe'].max():.2f}")
+
+    start = time.perf_counter()
+    result = backtest(prices[:, :, None, None], actions[:, :, :, None], cost=costs, min_hold=5, stop_loss=0.05)
+    result.stats()
+    event_time = time.perf_counter() - start
+    print(f"event-driven min_hold+stop: {event_time:6.2f} s  ({loop_time * n_series / event_time:7.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
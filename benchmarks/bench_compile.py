@@ -0,0 +1,106 @@
+"""
+Benchmark `compile_data` against the original per-ticker join loop.
+
+Generates synthetic per-ticker CSV files in a temporary directory, compiles
+them with both implementations, checks that the panels match and prints the
+timings of the in-memory compile step and of the full call including the
+joined CSV write.
+
+    python benchmarks/bench_compile.py --tickers 300 --years 16
+"""
+import os
+import sys
+import time
+import pickle
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.process_data.transformation import compile_data, compile_frames
+
+
+def make_universe(root: str, n_tickers: int, years: int, seed: int = 0) -> list:
+    """Write `n_tickers` synthetic OHLCV CSV files with staggered listing dates."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2008-01-01", periods=252 * years)
+    os.makedirs(os.path.join(root, "data", "stock_dfs"), exist_ok=True)
+    tickers = [f"SYN{i:04d}.NS" for i in range(n_tickers)]
+    for i, ticker in enumerate(tickers):
+        idx = dates[rng.integers(0, len(dates) // 4):]
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx))))
+        frame = pd.DataFrame({"Adj Close": close, "Close": close, "High": close * 1.01,
+                              "Low": close * 0.99, "Open": close,
+                              "Volume": rng.integers(0, 10**6, len(idx))},
+                             index=pd.Index(idx.strftime("%Y-%m-%d"), name="Date"))
+        frame.to_csv(os.path.join(root, "data", "stock_dfs", f"{ticker}.csv"))
+    with open(os.path.join(root, "data", "tickers.pickle"), "wb") as f:
+        pickle.dump(tickers, f)
+    return tickers
+
+
+def legacy_compile(tickers: list) -> pd.DataFrame:
+    """The original loop: full parse, drop columns, one outer join per ticker."""
+    main_frame = pd.DataFrame()
+    for ticker in tickers:
+        frame = pd.read_csv(f"data/stock_dfs/{ticker}.csv")
+        frame.set_index('Date', inplace=True)
+        frame.rename(columns={'Adj Close': f'{ticker}'}, inplace=True)
+        frame.drop(columns=['Open', 'High', 'Low', 'Close', 'Volume'], inplace=True)
+        if main_frame.empty:
+            main_frame = frame
+        else:
+            main_frame = main_frame.join(frame, how='outer')
+    return main_frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--years", type=int, default=16)
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        tickers = make_universe(root, args.tickers, args.years)
+        os.chdir(root)
+        try:
+            start = time.perf_counter()
+            legacy = legacy_compile(tickers)
+            legacy_time = time.perf_counter() - start
+            legacy.to_csv("data/joined_legacy.csv")
+            legacy_total = time.perf_counter() - start
+
+            start = time.perf_counter()
+            compile_frames(tickers)
+            new_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            compile_frames(tickers, n_jobs=args.n_jobs)
+            parallel_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            compile_data("tickers.pickle", "joined.csv")
+            new_total = time.perf_counter() - start
+
+            compiled = pd.read_csv("data/joined.csv", index_col="Date")
+        finally:
+            os.chdir(cwd)
+
+    legacy = legacy.sort_index()
+    assert list(compiled.columns) == list(legacy.columns)
+    assert (compiled.index == legacy.index).all()
+    assert np.allclose(compiled.to_numpy(), legacy.to_numpy(), equal_nan=True)
+
+    print(f"tickers={args.tickers} years={args.years}")
+    print(f"legacy join loop           : {legacy_time:8.3f}s")
+    print(f"compile_frames             : {new_time:8.3f}s  ({legacy_time / new_time:5.1f}x)")
+    print(f"compile_frames n_jobs={args.n_jobs:<5}: {parallel_time:8.3f}s  ({legacy_time / parallel_time:5.1f}x)")
+    print(f"legacy + CSV write         : {legacy_total:8.3f}s")
+    print(f"compile_data               : {new_total:8.3f}s  ({legacy_total / new_total:5.1f}x)")
+
+if __name__ == '__main__':
+    main()
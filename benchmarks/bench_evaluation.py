@@ -0,0 +1,104 @@
+"""
+Benchmark the batched evaluation report against per-ticker sklearn metrics and pyplot figures.
+
+The reference is the previous per-ticker path: four sklearn metric calls, a
+seaborn confusion heatmap and an OvR ROC figure drawn through pyplot with
+tight_layout. Metrics and AUCs are compared with sklearn before the timings
+are printed.
+
+    python benchmarks/bench_evaluation.py --tickers 50 --samples 1000 --jobs 1
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import seaborn as sns
+from sklearn.metrics import accuracy_score, auc, confusion_matrix, f1_score, precision_score, recall_score, roc_curve
+
+from src.train.evaluation import ReportGenerator
+
+
+def make_results(n_tickers: int, n_samples: int, seed: int = 0) -> dict:
+    """Synthetic (y_true, y_pred, y_score) per ticker for three classes, with some signal."""
+    rng = np.random.default_rng(seed)
+    results = {}
+    for k in range(n_tickers):
+        y_true = rng.integers(0, 3, n_samples)
+        scores = rng.dirichlet([1, 1, 1], n_samples)
+        scores[np.arange(n_samples), y_true] += rng.uniform(0, 0.5, n_samples)
+        scores /= scores.sum(axis=1, keepdims=True)
+        results[f"T{k:03d}"] = (y_true, scores.argmax(axis=1), scores)
+    return results
+
+
+def reference_report(results: dict, out_dir: str) -> dict:
+    """Reference: sklearn metrics and two pyplot figures per ticker."""
+    rows = {}
+    for name, (y_true, y_pred, y_score) in results.items():
+        row = {"accuracy": accuracy_score(y_true, y_pred),
+               "f1_score": f1_score(y_true, y_pred, average="weighted"),
+               "precision": precision_score(y_true, y_pred, average="weighted", zero_division=0),
+               "recall": recall_score(y_true, y_pred, average="weighted")}
+        plt.figure(figsize=(8, 6))
+        sns.heatmap(confusion_matrix(y_true, y_pred), annot=True, fmt="d", cmap="Blues")
+        plt.tight_layout()
+        plt.savefig(os.path.join(out_dir, f"{name}_cm.png"), dpi=80)
+        plt.close()
+        plt.figure()
+        for label in range(y_score.shape[1]):
+            fpr, tpr, _ = roc_curve(y_true == label, y_score[:, label])
+            row[f"auc_{label}"] = auc(fpr, tpr)
+            plt.plot(fpr, tpr, lw=2)
+        plt.plot([0, 1], [0, 1], color="gray", linestyle="--")
+        plt.tight_layout()
+        plt.savefig(os.path.join(out_dir, f"{name}_roc.png"), dpi=80)
+        plt.close()
+        rows[name] = row
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=1, help="Rendering processes of the report (-1: every core)")
+    args = parser.parse_args()
+
+    results = make_results(args.tickers, args.samples)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        reference = reference_report(results, tmp)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = ReportGenerator(out_dir=os.path.join(tmp, "report"), n_jobs=args.jobs).run(results)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ReportGenerator(out_dir=os.path.join(tmp, "metrics"), plot=False).run(results)
+        metrics_only = time.perf_counter() - start
+        open_figures = len(plt.get_fignums())
+
+    for name, row in reference.items():
+        for key in ("accuracy", "f1_score", "precision", "recall"):
+            np.testing.assert_allclose(report.loc[name, key], row[key], rtol=1e-12)
+        for label, class_name in enumerate(("hold", "buy", "sell")):
+            np.testing.assert_allclose(report.loc[name, f"auc_{class_name}"], row[f"auc_{label}"], rtol=1e-12)
+    assert open_figures == 0, f"{open_figures} figures left open"
+
+    print(f"tickers={args.tickers} samples={args.samples} jobs={args.jobs}")
+    print(f"sklearn + pyplot, per ticker : {loop:7.3f}s")
+    print(f"ReportGenerator              : {batched:7.3f}s  ({loop / batched:,.1f}x)")
+    print(f"ReportGenerator, no figures  : {metrics_only:7.3f}s  ({loop / metrics_only:,.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
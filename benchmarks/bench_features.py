@@ -0,0 +1,81 @@
+"""
+Benchmark `compute_features` against a per-ticker pandas reference.
+
+The reference computes every indicator one ticker at a time with pandas
+rolling/ewm calls, i.e. the per-ticker path being replaced; both outputs are
+compared before the timings are printed. Correctness against independent,
+textbook implementations of the indicators is tested in tests/test_features.py.
+
+    python benchmarks/bench_features.py --tickers 50 --years 16
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.process_data.features import compute_features
+
+
+def make_prices(n_tickers: int, years: int, seed: int = 0) -> pd.DataFrame:
+    """Wide random-walk price panel with staggered listings and a few missing days."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2008-01-01", periods=252 * years, name="Date")
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), n_tickers)), axis=0))
+    for j in range(n_tickers):
+        prices[:rng.integers(0, len(dates) // 4), j] = np.nan
+    prices[rng.random(prices.shape) < 0.001] = np.nan
+    return pd.DataFrame(prices, index=dates, columns=[f"SYN{i:04d}.NS" for i in range(n_tickers)])
+
+
+def reference_features(prices: pd.DataFrame, window: int) -> pd.DataFrame:
+    """Per-ticker pandas implementation of the config.yaml indicators."""
+    out = {}
+    for ticker in prices.columns:
+        close = prices[ticker]
+        delta = close.diff()
+        gains, losses = delta.clip(lower=0), delta.clip(upper=0)
+        avg_gain = gains.ewm(alpha=1 / window, min_periods=window).mean()
+        avg_loss = losses.ewm(alpha=1 / window, min_periods=window).mean().abs()
+        out[ticker] = {
+            "SMA_20_": close.rolling(20).mean(),
+            "EMA_20_": close.ewm(span=20, adjust=False).mean(),
+            "20_day_std_": close.rolling(20).std(),
+            "Momentum_": close - close.shift(window),
+            "MACD_": close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean(),
+            "rsi_": 100 * avg_gain / (avg_gain + avg_loss),
+        }
+    prefixes = list(next(iter(out.values())))
+    return pd.DataFrame({f"{prefix}{ticker}": out[ticker][prefix] for prefix in prefixes for ticker in prices.columns})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--years", type=int, default=16)
+    parser.add_argument("--window", type=int, default=14)
+    args = parser.parse_args()
+
+    prices = make_prices(args.tickers, args.years)
+
+    start = time.perf_counter()
+    reference = reference_features(prices, args.window)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = compute_features(prices, window=args.window)
+    engine_time = time.perf_counter() - start
+
+    assert list(features.columns) == list(reference.columns)
+    assert np.allclose(features.to_numpy(), reference.to_numpy(), rtol=1e-7, atol=1e-9, equal_nan=True)
+
+    print(f"tickers={args.tickers} years={args.years} window={args.window}")
+    print(f"per-ticker pandas : {reference_time:8.3f}s")
+    print(f"compute_features  : {engine_time:8.3f}s  ({reference_time / engine_time:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
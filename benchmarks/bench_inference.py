@@ -0,0 +1,88 @@
+"""
+Benchmark `InferenceEngine.predict` against `VotingClassifier.predict`.
+
+Fits a hard-voting ensemble (random forest, gradient boosting, logistic
+regression) on a synthetic 56-feature buy/sell/hold dataset, checks that the
+engine reproduces the VotingClassifier's labels, and then times both paths
+including preprocessing at batch sizes 1, 50 and 5000, reporting the engine's
+p50/p99 latencies.
+
+    python benchmarks/bench_inference.py --features 56 --rows 5000
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.process_data.scaler import PreprocessingPipeline
+from src.train.inference import InferenceEngine
+
+
+def make_dataset(n_rows: int, n_features: int, seed: int = 0):
+    """Fat-tailed features with labels driven by a few of them."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_t(df=4, size=(n_rows, n_features))
+    signal = X[:, :3].sum(axis=1) + rng.normal(size=n_rows)
+    y = np.select([signal > 1.0, signal < -1.0], [1, 2], 0)
+    return X, y
+
+
+def latencies(fn, X: np.ndarray, batch: int, calls: int) -> np.ndarray:
+    """Per-call latency in microseconds over consecutive batches of `X`."""
+    samples = np.empty(calls)
+    for i in range(calls):
+        lo = (i * batch) % max(len(X) - batch, 1)
+        block = X[lo:lo + batch]
+        start = time.perf_counter_ns()
+        fn(block)
+        samples[i] = (time.perf_counter_ns() - start) / 1e3
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=56)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--dtype", default="float64", choices=["float64", "float32"])
+    args = parser.parse_args()
+
+    X, y = make_dataset(2 * args.rows, args.features)
+    X_train, y_train, X_live = X[:args.rows], y[:args.rows], X[args.rows:]
+    pipeline = PreprocessingPipeline().fit(X_train)
+    features = pipeline.transform(X_train)
+    voting_clf = VotingClassifier([
+        ("rf", RandomForestClassifier(n_estimators=args.trees, random_state=0)),
+        ("gb", GradientBoostingClassifier(n_estimators=50, random_state=0)),
+        ("lr", LogisticRegression(max_iter=500)),
+    ], voting="hard").fit(features, y_train)
+
+    engine = InferenceEngine.from_votingclf(voting_clf, pipeline, dtype=args.dtype)
+    expected = voting_clf.predict(pipeline.transform(X_live))
+    agreement = np.mean(engine.predict(X_live) == expected)
+    if args.dtype == "float64":
+        assert agreement == 1.0, agreement
+    print(f"features={args.features} train_rows={args.rows} trees={args.trees} dtype={args.dtype} "
+          f"agreement={agreement:.4f}")
+
+    def baseline(block):
+        return voting_clf.predict(pipeline.transform(block))
+
+    for batch in (1, 50, 5000):
+        calls = 200 if batch < 5000 else 10
+        legacy = latencies(baseline, X_live, batch, calls)
+        engine._latency.clear()
+        latencies(engine.predict, X_live, batch, calls)
+        stats = engine.latency()
+        print(f"batch={batch:<5} VotingClassifier p50={np.median(legacy):10.1f} us  p99={np.percentile(legacy, 99):10.1f} us"
+              f" | engine p50={stats['p50_us']:10.1f} us  p99={stats['p99_us']:10.1f} us"
+              f"  ({np.median(legacy) / stats['p50_us']:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
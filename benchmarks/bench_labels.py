@@ -0,0 +1,94 @@
+"""
+Benchmark the vectorized labeling engine against per-row loops.
+
+The references walk every ticker and bar in Python: one forward return per
+(bar, horizon) and, for the triple barrier, a scan of the next `horizon`
+closes until a barrier is touched. Outputs are compared before the timings
+are printed.
+
+    python benchmarks/bench_labels.py --tickers 50 --years 16 --horizon 10
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.process_data.labels import BUY, HOLD, SELL, multi_horizon_labels, triple_barrier_labels
+from bench_features import make_prices
+
+
+def loop_forward_labels(prices: np.ndarray, horizons, threshold: float, lower: float) -> np.ndarray:
+    """Reference: (bars, horizons, tickers) labels, one bar at a time."""
+    n_bars, n_tickers = prices.shape
+    labels = np.full((n_bars, len(horizons), n_tickers), np.nan)
+    for j in range(n_tickers):
+        for k, horizon in enumerate(horizons):
+            for t in range(n_bars - horizon):
+                r = prices[t + horizon, j] / prices[t, j] - 1.0
+                if np.isnan(r):
+                    continue
+                labels[t, k, j] = BUY if r > threshold else SELL if r < -lower else HOLD
+    return labels
+
+
+def loop_triple_barrier(prices: np.ndarray, horizon: int, upper: float, lower: float) -> np.ndarray:
+    """Reference: scan each bar's path until the first barrier touch."""
+    n_bars, n_tickers = prices.shape
+    labels = np.full((n_bars, n_tickers), np.nan)
+    for j in range(n_tickers):
+        for t in range(n_bars - horizon):
+            path = prices[t + 1:t + 1 + horizon, j] / prices[t, j] - 1.0
+            if np.isnan(path).any():
+                continue
+            label = HOLD
+            for r in path:
+                if r >= upper:
+                    label = BUY
+                    break
+                if r <= -lower:
+                    label = SELL
+                    break
+            labels[t, j] = label
+    return labels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--years", type=int, default=16)
+    parser.add_argument("--horizon", type=int, default=10)
+    args = parser.parse_args()
+
+    prices = make_prices(args.tickers, args.years)
+    values = prices.to_numpy()
+    horizons = (1, 5, args.horizon, 20)
+
+    start = time.perf_counter()
+    reference = loop_forward_labels(values, horizons, 0.01, 0.02)
+    loop_forward = time.perf_counter() - start
+    start = time.perf_counter()
+    labels = multi_horizon_labels(prices, horizons, threshold=0.01, lower=0.02)
+    fast_forward = time.perf_counter() - start
+    np.testing.assert_array_equal(labels.to_numpy().reshape(reference.shape), reference)
+
+    start = time.perf_counter()
+    reference = loop_triple_barrier(values, args.horizon, 0.03, 0.02)
+    loop_barrier = time.perf_counter() - start
+    start = time.perf_counter()
+    labels = triple_barrier_labels(prices, args.horizon, upper=0.03, lower=0.02)
+    fast_barrier = time.perf_counter() - start
+    np.testing.assert_array_equal(labels.to_numpy(), reference)
+
+    print(f"bars={len(prices)} tickers={args.tickers} horizons={horizons}")
+    print(f"forward, {len(horizons)} horizons : loop {loop_forward:7.3f}s  vectorized {fast_forward:7.4f}s  "
+          f"({loop_forward / fast_forward:,.0f}x)")
+    print(f"triple barrier h={args.horizon:<3}   : loop {loop_barrier:7.3f}s  vectorized {fast_barrier:7.4f}s  "
+          f"({loop_barrier / fast_barrier:,.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the buffered Logger against the original open/append/close per message.
+
+Logs the same messages through the original implementation (one open, write
+and close per line) and through the background LogWriter, checks that both
+files hold the same lines, and reports messages/sec at the call site and
+including the final flush. Console output is off for both so only file
+logging is timed.
+
+    python benchmarks/bench_logging.py --messages 200000
+"""
+import os
+import sys
+import time
+import argparse
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.utils import Logger
+
+
+def legacy_log(log_file_path: str, msg: str, level: str = "INFO", pipeline_name: str = "general") -> None:
+    """Reference: the original Logger.log without the console print."""
+    now = datetime.datetime.now()
+    time_str = now.strftime("%H:%M:%S")
+    log_message = f"[{time_str}] [{level}] [{pipeline_name}] {msg}"
+    with open(log_file_path, "a+", encoding="utf-8") as log_file:
+        log_file.write(log_message + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--structured", action="store_true", help="also time JSON-lines output")
+    args = parser.parse_args()
+    messages = [f"fold {i % 5} candidate {i} score={i / args.messages:.6f}" for i in range(args.messages)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.log")
+        start = time.perf_counter()
+        for msg in messages:
+            legacy_log(legacy_path, msg, "INFO", "training")
+        legacy = time.perf_counter() - start
+
+        logger = Logger(log_dir=os.path.join(tmp, "buffered"), console=False)
+        start = time.perf_counter()
+        for msg in messages:
+            logger.log(msg, "INFO", "training")
+        queued = time.perf_counter() - start
+        logger.flush()
+        buffered = time.perf_counter() - start
+
+        # Same lines, ignoring the timestamps
+        with open(legacy_path) as f:
+            expected = [line.split("] ", 1)[1] for line in f]
+        with open(logger.log_file_path) as f:
+            actual = [line.split("] ", 1)[1] for line in f]
+        assert actual == expected, "buffered log differs from the reference"
+
+        print(f"messages={args.messages}")
+        print(f"open/append/close : {args.messages / legacy:>12,.0f} msg/s")
+        print(f"buffered (call)   : {args.messages / queued:>12,.0f} msg/s  ({legacy / queued:.1f}x)")
+        print(f"buffered (flushed): {args.messages / buffered:>12,.0f} msg/s  ({legacy / buffered:.1f}x)")
+
+        if args.structured:
+            logger = Logger(log_dir=os.path.join(tmp, "structured"), structured=True, console=False)
+            start = time.perf_counter()
+            for msg in messages:
+                logger.log(msg, "INFO", "training")
+            logger.flush()
+            print(f"structured (flushed): {args.messages / (time.perf_counter() - start):>10,.0f} msg/s")
+        logger.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Import-time budget of the command-line entry point.
+
+Each measurement starts a fresh interpreter, so module caches of this process
+do not hide the cold-start cost paid by scheduled jobs and bot restarts. The
+check fails (exit status 1) if importing `src.cli` and loading config.yaml
+takes longer than the budget over a bare interpreter, or if it pulls in any of
+the heavy libraries the subcommands import lazily. The cold import of each
+subcommand's modules is printed for reference.
+
+    python benchmarks/bench_startup.py --budget-ms 150 --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY = ("numpy", "pandas", "sklearn", "scipy", "matplotlib", "seaborn", "yfinance", "bs4", "requests", "joblib",
+         "tqdm", "binance")
+
+STARTUP = ("import sys, json\n"
+           "import src.cli\n"
+           "src.cli.load_config('config.yaml')\n"
+           "src.cli.build_parser()\n"
+           f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))\n")
+
+SUBCOMMANDS = {"fetch": "import src.process_data.fetcher",
+               "compile": "import src.process_data.transformation",
+               "train": "import src.train.orchestrator",
+               "evaluate": "import src.train.evaluation, src.train.orchestrator"}
+
+
+def cold_time(code: str, repeat: int) -> tuple:
+    """Median wall time (s) of running `code` in a fresh interpreter, and the last run's stdout."""
+    times, out = [], ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True,
+                             text=True).stdout
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="allowed startup time over a bare interpreter")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bare, _ = cold_time("pass", args.repeat)
+    startup, out = cold_time(STARTUP, args.repeat)
+    heavy = json.loads(out)
+    overhead_ms = 1000 * (startup - bare)
+
+    print(f"bare interpreter       : {1000 * bare:7.1f} ms")
+    print(f"cli import + config    : {1000 * startup:7.1f} ms  (+{overhead_ms:.1f} ms, budget {args.budget_ms:.0f} ms)")
+    for name, code in SUBCOMMANDS.items():
+        seconds, _ = cold_time(code, args.repeat)
+        print(f"{name:<8} cold imports  : {1000 * seconds:7.1f} ms")
+
+    failures = []
+    if heavy:
+        failures.append(f"startup imports heavy modules: {', '.join(heavy)}")
+    if overhead_ms > args.budget_ms:
+        failures.append(f"startup takes {overhead_ms:.1f} ms over the bare interpreter, budget {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
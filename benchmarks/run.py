@@ -0,0 +1,320 @@
+"""
+Benchmark suite of the pipeline hot paths with regression tracking.
+
+Every benchmark generates its synthetic dataset locally (fixed seeds), runs in
+a fresh process with network connections disabled, and records the best wall
+time of `--repeat` runs, the throughput, the peak traced allocation of one run
+and the peak RSS of the process. Results are compared with the stored
+baselines of the same scale in benchmarks/baselines.json; a benchmark slower
+than its baseline by more than `--tolerance` (or using more memory than
+`--memory-tolerance`) is flagged and the exit status is 1. Baselines are only
+comparable on the machine they were measured on (see their "environment");
+refresh them with --update-baseline after an intended change or on new hardware.
+
+Scales:
+    smoke   5 tickers, 2 years daily, 2 days of minute bars (checks the suite itself; no baseline)
+    nifty   50 tickers, 16 years daily, 1 month of minute bars
+    large   500 tickers, 20 years daily, 3 months of minute bars
+
+    python benchmarks/run.py --scale nifty
+    python benchmarks/run.py --scale large --only compile_data outliers --repeat 5
+    python benchmarks/run.py --scale nifty --update-baseline
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import contextlib
+import datetime
+import platform
+import tempfile
+import statistics
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+BASELINES = os.path.join(BENCH_DIR, "baselines.json")
+
+SCALES = {"smoke": {"tickers": 5, "years": 2, "minute_days": 2},
+          "nifty": {"tickers": 50, "years": 16, "minute_days": 30},
+          "large": {"tickers": 500, "years": 20, "minute_days": 90}}
+
+# name -> (setup, unit); setup(scale) returns (run, items) with the working directory set to a scratch directory
+BENCHMARKS: Dict[str, Tuple[Callable[[Dict], Tuple[Callable[[], Optional[float]], int]], str]] = {}
+
+
+def benchmark(name: str, unit: str) -> Callable:
+    """
+    Register a benchmark.
+
+    The decorated setup builds the inputs and returns `(run, items)`: `run`
+    executes the hot path once, and `items` (rows, cells, bars, ...) per run
+    gives the throughput. `run` may return the seconds of its timed section to
+    leave per-run preparation out of the measurement.
+    """
+    def decorator(setup: Callable) -> Callable:
+        BENCHMARKS[name] = (setup, unit)
+        return setup
+    return decorator
+
+
+def model_inputs(scale: Dict, seed: int = 0):
+    """One model's inputs as in training: every ticker's price plus six indicators, fat-tailed."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    return rng.standard_t(df=3, size=(252 * scale["years"], scale["tickers"] + 6))
+
+
+def minute_bars(days: int, seed: int = 0):
+    """Random-walk 1-minute bars in the layout of `simulator.load_bars`."""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    n = days * 1440
+    close = 90_000 * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+    return pd.DataFrame({"open_time": 1_700_000_000_000 + 60_000 * np.arange(n, dtype=np.int64),
+                         "open": close, "high": close * 1.0005, "low": close * 0.9995, "close": close,
+                         "volume": rng.uniform(0, 10, n)})
+
+# -------------------------------------------------------------------------------------------------------------------
+# Hot paths
+@benchmark("compile_data", "rows")
+def bench_compile(scale: Dict):
+    from bench_compile import make_universe
+    from src.process_data.transformation import compile_data
+
+    tickers = make_universe(".", scale["tickers"], scale["years"])
+    rows = 0
+    for ticker in tickers:
+        with open(f"data/stock_dfs/{ticker}.csv", "rb") as f:
+            rows += f.read().count(b"\n") - 1
+    return lambda: compile_data("tickers.pickle", "joined.csv"), rows
+
+
+@benchmark("compute_features", "cells")
+def bench_features(scale: Dict):
+    from bench_features import make_prices
+    from src.process_data.features import compute_features
+
+    prices = make_prices(scale["tickers"], scale["years"])
+    return lambda: compute_features(prices, window=14), prices.size
+
+
+@benchmark("outliers", "cells")
+def bench_outliers(scale: Dict):
+    from src.process_data.scaler import OutlierHandlers
+
+    X = model_inputs(scale)
+    handler = OutlierHandlers(X[: len(X) * 3 // 4], threshold=3.0)
+    return lambda: handler.handle(X), X.size
+
+
+@benchmark("scale_data", "cells")
+def bench_scale(scale: Dict):
+    from src.process_data.scaler import scale_data
+
+    X = model_inputs(scale)
+    os.makedirs("models", exist_ok=True)
+    return lambda: scale_data(X, "scaler.pkl"), X.size
+
+
+@benchmark("htuner_tune", "fits")
+def bench_tune(scale: Dict):
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from src.process_data.scaler import PreprocessingPipeline
+    from src.train.Htuning import Htuner
+
+    X = model_inputs(scale)
+    rng = np.random.default_rng(1)
+    y = np.where(X[:, 0] + rng.normal(0, 1, len(X)) > 0.5, 1, np.where(X[:, 0] < -0.5, 2, 0))
+    grid = {"max_depth": [3, 6, None], "min_samples_leaf": [1, 5]}
+    n_iter, cv = 4, 3
+
+    def run():
+        tuner = Htuner([RandomForestClassifier(n_estimators=20, random_state=0)], [grid])
+        tuner.tune(X, y, cv=cv, n_iter=n_iter, preprocessing=PreprocessingPipeline(3.0))
+    return run, n_iter * cv + 1  # Candidate fits per fold, plus the refit
+
+
+@benchmark("evaluate_model", "samples")
+def bench_evaluate(scale: Dict):
+    import numpy as np
+    from src.train.evaluation import evaluate_model
+
+    rng = np.random.default_rng(0)
+    n = 252 * scale["years"] * scale["tickers"]
+    y_true = rng.integers(0, 3, n)
+    y_pred = np.where(rng.random(n) < 0.4, y_true, rng.integers(0, 3, n))
+    return lambda: evaluate_model(y_true, y_pred), n
+
+
+@benchmark("bot_tick_loop", "bars")
+def bench_bot(scale: Dict):
+    sys.path.insert(0, os.path.join(ROOT, "crpt-bot"))
+    from simulator import SimulatedClient, replay_bot
+
+    bars = minute_bars(scale["minute_days"])
+
+    def run():
+        client = SimulatedClient(bars)  # Builds the kline table, outside the timed loop
+        return replay_bot(client)["wall"]
+    return run, len(bars) - 61  # Bars replayed after the hour of warm-up
+
+# -------------------------------------------------------------------------------------------------------------------
+# Runner
+def _offline() -> None:
+    """Make any network connection attempt fail, so a benchmark cannot silently depend on the network."""
+    def refuse(*args, **kwargs):
+        raise ConnectionRefusedError("benchmarks run offline; network access is disabled")
+    socket.socket.connect = refuse
+    socket.socket.connect_ex = refuse
+    socket.create_connection = refuse
+
+
+def _measure(name: str, scale_name: str, repeat: int) -> Dict:
+    """Run one benchmark in this (fresh) process and return its record."""
+    from src.profiling import peak_rss_mb
+    _offline()
+    setup, unit = BENCHMARKS[name]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):  # Progress bars and bot logs
+        os.chdir(workdir)
+        try:
+            start = time.perf_counter()
+            run, items = setup(SCALES[scale_name])
+            setup_s = time.perf_counter() - start
+
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                timed = run()
+                elapsed = time.perf_counter() - start
+                times.append(timed if isinstance(timed, float) else elapsed)
+
+            tracemalloc.start()
+            run()
+            _, peak_alloc = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+    best = min(times)
+    return {"unit": unit, "items": items, "wall_s": best, "median_s": statistics.median(times),
+            "throughput": items / best if best > 0 else float("inf"), "peak_alloc_mb": peak_alloc / 2 ** 20,
+            "peak_rss_mb": peak_rss_mb(), "setup_s": setup_s,
+            "repeat": repeat}
+
+
+def environment() -> Dict:
+    """Versions and hardware the results were measured on."""
+    import numpy
+    import pandas
+    import sklearn
+    return {"python": platform.python_version(), "numpy": numpy.__version__, "pandas": pandas.__version__,
+            "sklearn": sklearn.__version__, "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float,
+            memory_tolerance: float, min_delta_s: float = 0.005) -> Dict[str, str]:
+    """
+    Status of every result against its baseline: 'new', 'ok', 'faster' or 'REGRESSION (...)'.
+
+    A slowdown must exceed both the relative `tolerance` and `min_delta_s`, so
+    millisecond-scale paths are not flagged for timer noise.
+    """
+    status = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            status[name] = "new"
+            continue
+        problems = []
+        if result["wall_s"] > base["wall_s"] * (1 + tolerance) and result["wall_s"] - base["wall_s"] > min_delta_s:
+            problems.append(f"time +{100 * (result['wall_s'] / base['wall_s'] - 1):.0f}%")
+        if result["peak_alloc_mb"] > base["peak_alloc_mb"] * (1 + memory_tolerance) + 1:
+            problems.append(f"memory +{100 * (result['peak_alloc_mb'] / base['peak_alloc_mb'] - 1):.0f}%")
+        if problems:
+            status[name] = f"REGRESSION ({', '.join(problems)})"
+        else:
+            status[name] = "faster" if result["wall_s"] < base["wall_s"] * (1 - tolerance) else "ok"
+    return status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=list(SCALES), default="nifty")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=None, help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark; the best one counts")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative slowdown over the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="slowdowns below this are never flagged")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed growth of peak allocation")
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--output", default=None, help="also write the results to this JSON file")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (setup, unit) in BENCHMARKS.items():
+            print(f"{name:<18} {unit}")
+        return
+
+    names = args.only or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        # A fresh process per benchmark keeps peak RSS and imports separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results[name] = pool.submit(_measure, name, args.scale, args.repeat).result()
+        print(f"  {name}: {1000 * results[name]['wall_s']:.1f} ms", file=sys.stderr)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+    stored = baselines.get(args.scale, {})
+    env = environment()
+    status = compare(results, stored.get("results", {}), args.tolerance, args.memory_tolerance,
+                     args.min_delta_ms / 1000)
+
+    print(f"scale={args.scale} {SCALES[args.scale]} repeat={args.repeat}")
+    if stored and stored.get("environment") != env:
+        print(f"note: baseline measured on {stored.get('environment')}")
+    print(f"{'benchmark':<18} {'wall ms':>10} {'throughput':>22} {'alloc MB':>9} {'RSS MB':>8} {'vs base':>8}  status")
+    for name, result in results.items():
+        base = stored.get("results", {}).get(name)
+        change = f"{100 * (result['wall_s'] / base['wall_s'] - 1):+.0f}%" if base else "-"
+        throughput = f"{result['throughput']:,.0f} {result['unit']}/s"
+        print(f"{name:<18} {1000 * result['wall_s']:10.2f} {throughput:>22} {result['peak_alloc_mb']:9.1f} "
+              f"{result['peak_rss_mb']:8.1f} {change:>8}  {status[name]}")
+
+    record = {"scale": args.scale, "measured": datetime.datetime.now().isoformat(timespec="seconds"),
+              "environment": env, "results": results, "status": status}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(record, f, indent=2)
+    if args.update_baseline:
+        baseline = baselines.setdefault(args.scale, {"results": {}})
+        baseline["results"].update(results)
+        baseline.update({"measured": record["measured"], "environment": env})
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"baseline of scale {args.scale!r} updated in {args.baselines}")
+        return
+
+    regressions = [name for name, s in status.items() if s.startswith("REGRESSION")]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
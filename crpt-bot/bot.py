@@ -1,19 +1,40 @@
-from decouple import config
-from binance.client import Client
 import pandas as pd
-import pandas_ta as ta
-import json
 import os
+import sys
 import time
-import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.process_data.streaming import StreamingRSI
+from tradelog import log, trade_log
+from state import StateStore
 
 # Set up trading parameters
 asset = "BTCUSDT"  # The trading pair to monitor (e.g., Bitcoin/USDT)
 entry_p = 25       # RSI value below which the bot will buy
 exit_p = 74        # RSI value above which the bot will sell
 
-# Initialize Binance client using API keys stored in environment variables
-client = Client(config('API_Key'), config('Secret_Key'), testnet=True)
+KLINE_INTERVAL = "1m"  # Client.KLINE_INTERVAL_1MINUTE
+
+# Exchange client, set by main(): Binance testnet, or a SimulatedClient for offline replays
+client = None
+
+# Bot state (is_buying flag, open orders), set by main(); bot_account.json is migrated on first use
+state = None
+
+# Incremental RSI state: seeded once, then updated with each newly closed 1-minute bar
+rsi_state = StreamingRSI(length=14)
+last_closed = None  # Open time (ms) of the last closed kline fed into rsi_state
+last_rsi = float("nan")  # Last RSI returned, reused when a poll returns no klines
+
+# -------------------------------------------------------------------------------------------------------------------
+# Connect to Binance
+def connect():
+    """
+    Creates the Binance testnet client using API keys stored in environment variables.
+    """
+    from decouple import config
+    from binance.client import Client
+    return Client(config('API_Key'), config('Secret_Key'), testnet=True)
 
 # -------------------------------------------------------------------------------------------------------------------
 # Fetch historical price data (klines) for the given asset
@@ -22,7 +43,7 @@ def fetch_klines(asset):
     Fetches 1-minute candlestick data for the past hour for a given asset.
     Returns a DataFrame with time and closing prices.
     """
-    klines = client.get_historical_klines(asset, Client.KLINE_INTERVAL_1MINUTE, "1 hour ago UTC")
+    klines = client.get_historical_klines(asset, KLINE_INTERVAL, "1 hour ago UTC")
     klines = [[x[0], float(x[4])] for x in klines]  # Extract time and closing price
     klines = pd.DataFrame(klines, columns=["time", "price"])
     klines['time'] = pd.to_datetime(klines['time'], unit="ms")  # Convert time to datetime
@@ -32,79 +53,56 @@ def fetch_klines(asset):
 # Calculate the RSI (Relative Strength Index) for the asset
 def get_rsi(asset):
     """
-    Calculates the 14-period RSI for the given asset using the closing prices from fetch_klines.
-    Returns the most recent RSI value.
+    Calculates the 14-period RSI for the given asset, including the still-open 1-minute bar.
+    The first call seeds the RSI state with the past hour of klines; later calls only fetch
+    the bars since the last closed one and update the state in O(1) per bar.
+
+    The Wilder smoothing is the one of pandas_ta.rsi, but it now runs over every bar since
+    the seed instead of being recomputed over the last hour alone, so values drift from the
+    old 60-bar RSI by a few tenths of a point (up to a few points in fast markets) and a
+    threshold crossing can move by a bar.
+    Returns the most recent RSI value, or the previous one if the exchange returns no klines.
     """
-    klines = fetch_klines(asset)
-    klines["rsi"] = ta.rsi(close=klines['price'], length=14)  # Calculate RSI
-    return klines['rsi'].iloc[-1]  # Return the latest RSI value
+    global last_closed, last_rsi
+    start = "1 hour ago UTC" if last_closed is None else last_closed
+    klines = client.get_historical_klines(asset, KLINE_INTERVAL, start)
+    if not klines:
+        return last_rsi
 
-# -------------------------------------------------------------------------------------------------------------------
-# Create an account file to track bot state
-def create_account():
-    """
-    Creates a JSON file to track the bot's state, including whether it can buy or sell.
-    """
-    account = {
-        "is_buying": True,  # Indicates whether the bot is ready to buy
-        "assets": {},       # Placeholder for asset balances
-    }
-    with open("bot_account.json", "w") as f:
-        f.write(json.dumps(account))
-
-# -------------------------------------------------------------------------------------------------------------------
-# Log messages to both the console and a log file
-def log(msg):
-    """
-    Logs a message to the console and appends it to a daily log file in the 'logs' directory.
-    """
-    print(f"LOG: {msg}")
-    if not os.path.isdir("logs"):
-        os.makedirs("logs")
-    now = datetime.datetime.now()
-    today = now.strftime("%Y-%m-%d")
-    time = now.strftime("%H-%M-%S")
+    # Commit every newly closed bar; the last kline is still forming
+    for kline in klines[:-1]:
+        if last_closed is None or kline[0] > last_closed:
+            rsi_state.update(float(kline[4]))
+            last_closed = kline[0]
 
-    with open(f"logs/{today}.txt", "a+") as log_file:
-        log_file.write(f"{time}: {msg}\n")
-
-# -------------------------------------------------------------------------------------------------------------------
-# Log trade details into a CSV file
-def trade_log(sym, side, price, amount):
-    """
-    Logs trade information (symbol, side, price, amount) into a CSV file in the 'trades' directory.
-    Creates the directory and file if they don't exist.
-    """
-    print(f"{side} {amount} {sym} for {price} per")
-    if not os.path.isdir("trades"):
-        os.mkdir("trades")
-    now = datetime.datetime.now()
-    today = now.strftime("%Y-%m-%d")
-
-    if not os.path.exists(f"trades/{today}.csv"):
-        with open(f"trades/{today}.csv", "w") as trade_file:
-            trade_file.write("sym,side,amount,price\n")  # Write header
-
-    with open(f"trades/{today}.csv", "a") as trade_file:
-        trade_file.write(f"{sym},{side},{amount},{price}\n")
+    last_rsi = rsi_state.peek(float(klines[-1][4]))  # RSI with the current bar's price
+    return last_rsi
 
 # -------------------------------------------------------------------------------------------------------------------
 # Execute a trade
-def do_trade(account, client, asset, side, quantity):
+def do_trade(state, client, asset, side, quantity):
     """
-    Executes a trade (buy or sell) on Binance and updates the account state.
+    Executes a trade (buy or sell) on Binance and updates the bot state.
     Logs the trade details once the order is filled.
     """
     if side == "buy":
         order = client.order_market_buy(symbol=asset, quantity=quantity)
-        account["is_buying"] = False  # Switch state to prevent multiple buys
     else:
         order = client.order_market_sell(symbol=asset, quantity=quantity)
-        account["is_buying"] = True  # Switch state to allow buying
 
-    order_id = order['orderId']
+    # Journal the order and switch state to prevent repeated buys/sells
+    state.open_order(asset, order['orderId'], side, quantity)
+    state.set_buying(asset, side == "sell")
+    wait_fill(state, client, asset, order, side, quantity)
 
-    # Wait until the order is fully filled
+# -------------------------------------------------------------------------------------------------------------------
+# Track an order until filled
+def wait_fill(state, client, asset, order, side, quantity):
+    """
+    Waits until the order is fully filled, logs it and records the fill in the bot state.
+    Also used at start-up to finish orders that were pending when the bot stopped.
+    """
+    order_id = order['orderId']
     while order['status'] != "FILLED":
         order = client.get_order(symbol=asset, orderId=order_id)
         time.sleep(1)
@@ -114,39 +112,52 @@ def do_trade(account, client, asset, side, quantity):
 
     # Log the trade details
     trade_log(asset, side, price_paid, quantity)
+    state.fill_order(order_id, quantity)
 
-    # Update account state in JSON file
-    with open("bot_account.json", "w") as f:
-        f.write(json.dumps(account))
+# -------------------------------------------------------------------------------------------------------------------
+# One pass of the trading logic
+def step(rsi, old_rsi):
+    """
+    Trades when the RSI crosses the entry or exit point, using the in-memory bot state.
+    Returns the side traded ("buy" or "sell"), or None.
+    """
+    # Execute trades based on RSI thresholds
+    if state.is_buying(asset):
+        if rsi < entry_p and old_rsi > entry_p:  # RSI crosses below entry point
+            do_trade(state, client, asset, "buy", quantity=0.01)
+            return "buy"
+    else:
+        if rsi > exit_p and old_rsi < exit_p:  # RSI crosses above exit point
+            do_trade(state, client, asset, "sell", quantity=0.01)
+            return "sell"
+    return None
 
 # -------------------------------------------------------------------------------------------------------------------
 # Main trading logic
-def main(trade=False):
+def main(trade=False, exchange_client=None):
     """
     Main function to monitor RSI and execute trades based on entry and exit conditions.
+    `exchange_client` replaces the Binance client, e.g. with a SimulatedClient.
     """
+    global client, state
+    client = exchange_client if exchange_client is not None else connect()
+    state = StateStore("bot_state")
+
+    # Finish orders that were still pending when the bot last stopped
+    for pending in state.pending_orders(asset):
+        order = client.get_order(symbol=asset, orderId=pending['order_id'])
+        wait_fill(state, client, asset, order, pending['side'], pending['quantity'])
+
     rsi = get_rsi(asset)  # Get initial RSI
     old_rsi = rsi
 
     while trade:
         try:
-            # Load or create the account file
-            if not os.path.exists("bot_account.json"):
-                create_account()
-            with open('bot_account.json') as f:
-                account = json.load(f)
-
             # Update RSI values
             old_rsi = rsi
             rsi = get_rsi(asset)
 
-            # Execute trades based on RSI thresholds
-            if account['is_buying']:
-                if rsi < entry_p and old_rsi > entry_p:  # RSI crosses below entry point
-                    do_trade(account, client, asset, "buy", quantity=0.01)
-            else:
-                if rsi > exit_p and old_rsi < exit_p:  # RSI crosses above exit point
-                    do_trade(account, client, asset, "sell", quantity=0.01)
+            step(rsi, old_rsi)
 
             # Log the current status
             balance = client.get_asset_balance(asset="BTC")
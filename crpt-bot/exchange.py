@@ -0,0 +1,120 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+
+class Kline(NamedTuple):
+    """One kline update: the bar's open time (ms), its latest close and whether the bar has closed."""
+    symbol: str
+    open_time: int
+    close: float
+    closed: bool
+
+
+# -------------------------------------------------------------------------------------------------------------------
+# Exchange interface used by the async runtime
+class Exchange:
+    """
+    Asynchronous exchange interface of the bot runtime.
+
+    The runtime only talks to this interface, so it can be driven by Binance
+    (`BinanceExchange`) or by a local simulated exchange in tests and replays.
+    Orders are plain dicts in Binance's format ('orderId', 'status', 'fills').
+    """
+    async def history(self, symbol: str, interval: str, start: str) -> List[Kline]:
+        """Closed and open klines since `start` (e.g. '1 hour ago UTC' or a ms timestamp), oldest first."""
+        raise NotImplementedError
+
+    def stream(self, symbol: str, interval: str) -> AsyncIterator[Kline]:
+        """Live kline updates: the open bar as it changes, then its final update with closed=True."""
+        raise NotImplementedError
+
+    async def market_order(self, symbol: str, side: str, quantity: float) -> Dict:
+        """Place a market order ('buy' or 'sell') and return the order as acknowledged."""
+        raise NotImplementedError
+
+    async def get_order(self, symbol: str, order_id: int) -> Dict:
+        """Current state of an order."""
+        raise NotImplementedError
+
+    async def balance(self, asset: str) -> Dict:
+        """Balance of one asset, e.g. {'asset': 'BTC', 'free': '0.01', 'locked': '0'}."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release connections."""
+
+
+# -------------------------------------------------------------------------------------------------------------------
+# Binance adapter
+class BinanceExchange(Exchange):
+    """
+    Binance spot exchange over python-binance's AsyncClient and kline websockets.
+    """
+    def __init__(self, api_key: str, secret_key: str, testnet: bool = True) -> None:
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.testnet = testnet
+        self._client = None
+        self._sockets = None
+
+    async def _connect(self):
+        if self._client is None:
+            from binance import AsyncClient, BinanceSocketManager
+            self._client = await AsyncClient.create(self.api_key, self.secret_key, testnet=self.testnet)
+            self._sockets = BinanceSocketManager(self._client)
+        return self._client
+
+    async def history(self, symbol: str, interval: str, start: str) -> List[Kline]:
+        client = await self._connect()
+        klines = await client.get_historical_klines(symbol, interval, start)
+        # The last kline is still forming
+        return [Kline(symbol, k[0], float(k[4]), i < len(klines) - 1) for i, k in enumerate(klines)]
+
+    async def stream(self, symbol: str, interval: str) -> AsyncIterator[Kline]:
+        await self._connect()
+        async with self._sockets.kline_socket(symbol, interval=interval) as socket:
+            while True:
+                message = await socket.recv()
+                if message.get("e") == "error":
+                    raise ConnectionError(message.get("m", "kline stream error"))
+                k = message["k"]
+                yield Kline(symbol, k["t"], float(k["c"]), bool(k["x"]))
+
+    async def market_order(self, symbol: str, side: str, quantity: float) -> Dict:
+        client = await self._connect()
+        if side == "buy":
+            return await client.order_market_buy(symbol=symbol, quantity=quantity)
+        return await client.order_market_sell(symbol=symbol, quantity=quantity)
+
+    async def get_order(self, symbol: str, order_id: int) -> Dict:
+        client = await self._connect()
+        return await client.get_order(symbol=symbol, orderId=order_id)
+
+    async def balance(self, asset: str) -> Dict:
+        client = await self._connect()
+        return await client.get_asset_balance(asset=asset)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close_connection()
+            self._client = None
+
+
+async def wait_filled(exchange: Exchange, symbol: str, order: Dict, poll: float = 1.0,
+                      timeout: Optional[float] = None) -> Dict:
+    """
+    Waits for an order to fill without blocking the event loop.
+
+    Polls `get_order` every `poll` seconds, like the bot's `do_trade`, but
+    sleeps with asyncio so the signal loops of all symbols keep running.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    while order["status"] != "FILLED":
+        if order["status"] in ("CANCELED", "REJECTED", "EXPIRED"):
+            raise RuntimeError(f"Order {order['orderId']} on {symbol} ended as {order['status']}")
+        if deadline is not None and loop.time() > deadline:
+            raise TimeoutError(f"Order {order['orderId']} on {symbol} not filled after {timeout}s")
+        await asyncio.sleep(poll)
+        order = await exchange.get_order(symbol, order["orderId"])
+    return order
@@ -0,0 +1,264 @@
+"""
+Asyncio runtime of the RSI bot for one or more symbols.
+
+Each symbol consumes a streaming kline feed, keeps its RSI incrementally
+(StreamingRSI seeded from the last hour) and applies the bot's crossover rules
+on every update. Orders are tracked in background tasks, so waiting for a fill
+never stalls signal evaluation for this or any other symbol.
+
+    python crpt-bot/runtime.py --symbols BTCUSDT ETHUSDT --entry 25 --exit 74
+"""
+import os
+import sys
+import asyncio
+import argparse
+import functools
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.process_data.streaming import StreamingRSI
+from exchange import Exchange, Kline, wait_filled
+from tradelog import log, trade_log
+from state import StateStore
+
+QUOTE_ASSETS = ("USDT", "BUSD", "USDC", "BTC", "ETH")
+
+
+def base_asset(symbol: str) -> str:
+    """Base asset of a trading pair, e.g. 'BTC' for 'BTCUSDT'."""
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)]
+    return symbol
+
+# -------------------------------------------------------------------------------------------------------------------
+# Per-symbol signal state
+class SymbolRunner:
+    """
+    Incremental RSI and the bot's crossover state machine for one symbol.
+    """
+    def __init__(self, symbol: str, entry_p: float = 25, exit_p: float = 74, length: int = 14,
+                 quantity: float = 0.01, is_buying: bool = True) -> None:
+        self.symbol = symbol
+        self.entry_p = entry_p
+        self.exit_p = exit_p
+        self.quantity = quantity
+        self.is_buying = is_buying
+        self.rsi_state = StreamingRSI(length=length)
+        self.last_closed: Optional[int] = None  # Open time (ms) of the last closed kline fed into rsi_state
+        self.rsi = float("nan")
+        self.old_rsi = float("nan")
+        self.pending: Optional[asyncio.Task] = None  # Order being tracked
+
+    def on_kline(self, kline: Kline) -> Optional[str]:
+        """
+        Feed one kline update and return 'buy', 'sell' or None.
+
+        Closed bars are committed to the RSI state once; updates of the open bar
+        only peek. The crossover rules compare the RSI with its value at the
+        previous update, exactly as the polling bot compares consecutive polls.
+        """
+        if kline.closed:
+            if self.last_closed is None or kline.open_time > self.last_closed:
+                value = self.rsi_state.update(kline.close)
+                self.last_closed = kline.open_time
+            else:
+                return None
+        elif self.last_closed is not None and kline.open_time <= self.last_closed:
+            return None  # Stale update of a bar that has already closed
+        else:
+            value = self.rsi_state.peek(kline.close)
+
+        self.old_rsi, self.rsi = self.rsi, float(value)
+        if self.pending is not None:
+            return None
+        if self.is_buying:
+            if self.rsi < self.entry_p and self.old_rsi > self.entry_p:  # RSI crosses below entry point
+                return "buy"
+        elif self.rsi > self.exit_p and self.old_rsi < self.exit_p:  # RSI crosses above exit point
+            return "sell"
+        return None
+
+# -------------------------------------------------------------------------------------------------------------------
+# Runtime over all symbols
+class BotRuntime:
+    """
+    Runs one streaming signal loop per symbol plus a status loop, in one event loop.
+
+    Per-symbol `is_buying` flags, positions and open orders are kept in a
+    StateStore journal, so a restart resumes tracking of unfilled orders. An old
+    `bot_account.json` is migrated on first start.
+    """
+    def __init__(self, exchange: Exchange, symbols: Union[Sequence[str], Dict[str, Dict]],
+                 state_path: str = "bot_state", account_path: str = "bot_account.json", interval: str = "1m",
+                 poll: float = 1.0, status_interval: float = 10.0, order_timeout: Optional[float] = None,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0,
+                 on_decision: Optional[Callable[[SymbolRunner, Kline, Optional[str]], None]] = None) -> None:
+        """
+        Args:
+            exchange (Exchange): Exchange implementation (Binance or simulated).
+            symbols: Symbols, or symbol -> SymbolRunner settings (entry_p, exit_p, length, quantity).
+            state_path (str): File prefix of the StateStore snapshot and journal. Default is 'bot_state'.
+            account_path (str): Legacy account file migrated on first start. Default is 'bot_account.json'.
+            interval (str): Kline interval. Default is '1m'.
+            poll (float): Seconds between order status checks. Default is 1.0.
+            status_interval (float): Seconds between status log lines. Default is 10.0.
+            order_timeout (Optional[float]): Give up tracking an order after this many seconds. Default is None.
+            reconnect_delay (float): Seconds before the first reconnect of a dropped stream. Default is 1.0.
+            max_reconnect_delay (float): Cap of the doubling reconnect delay. Default is 60.0.
+            on_decision (Optional[Callable]): Called with (runner, kline, side) once each streamed kline is
+                handled and its order submitted, e.g. to measure tick-to-decision latency. Default is None.
+        """
+        self.exchange = exchange
+        self.interval = interval
+        self.poll = poll
+        self.status_interval = status_interval
+        self.order_timeout = order_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.on_decision = on_decision
+        self.state = StateStore(state_path, legacy_path=account_path)
+
+        settings = symbols if isinstance(symbols, dict) else {symbol: {} for symbol in symbols}
+        self.runners: Dict[str, SymbolRunner] = {}
+        for symbol, params in settings.items():
+            self.runners[symbol] = SymbolRunner(symbol, is_buying=self.state.is_buying(symbol), **params)
+        self.orders: List[Dict] = []  # Filled orders of this run
+        self._stop = asyncio.Event()
+
+    async def seed(self, runner: SymbolRunner) -> None:
+        """
+        Warm a symbol's RSI up from the last hour of klines, or after a reconnect
+        catch up from its last closed bar (bars already fed are skipped).
+        """
+        start = "1 hour ago UTC" if runner.last_closed is None else runner.last_closed
+        for kline in await self.exchange.history(runner.symbol, self.interval, start):
+            runner.on_kline(kline)
+
+    async def _trade(self, runner: SymbolRunner, side: str) -> None:
+        """Submit an order and track it until filled, while the signal loops keep running."""
+        order = await self.exchange.market_order(runner.symbol, side, runner.quantity)
+        self.state.open_order(runner.symbol, order["orderId"], side, runner.quantity)
+        runner.is_buying = side == "sell"  # Switch state right away, as do_trade does
+        self.state.set_buying(runner.symbol, runner.is_buying)
+        await self._track(runner, order, side, runner.quantity)
+
+    async def _track(self, runner: SymbolRunner, order: Dict, side: str, quantity: float) -> None:
+        """Wait for an order to fill and record the fill."""
+        try:
+            order = await wait_filled(self.exchange, runner.symbol, order, self.poll, self.order_timeout)
+        except RuntimeError as e:
+            self.state.cancel_order(order["orderId"])
+            log(f"ERROR: {e}")
+            return
+        except TimeoutError as e:
+            log(f"ERROR: {e}")  # Still pending in the state store; tracking resumes on restart
+            return
+        price_paid = sum([float(fill['price']) * float(fill['qty']) for fill in order['fills']])
+        trade_log(runner.symbol, side, price_paid, quantity)
+        self.state.fill_order(order["orderId"], quantity)
+        self.orders.append(order)
+
+    async def resume(self, runner: SymbolRunner) -> None:
+        """Track the orders of a symbol that were still pending when the bot last stopped."""
+        for pending in self.state.pending_orders(runner.symbol):
+            order = await self.exchange.get_order(runner.symbol, pending["order_id"])
+            await self._track(runner, order, pending["side"], pending["quantity"])
+
+    def _submit(self, runner: SymbolRunner, coro) -> None:
+        task = asyncio.create_task(coro)
+        runner.pending = task
+        task.add_done_callback(functools.partial(self._done, runner))
+
+    @staticmethod
+    def _done(runner: SymbolRunner, task: asyncio.Task) -> None:
+        """Release the symbol and log a failed order task, as the polling bot logs every failure."""
+        runner.pending = None
+        if not task.cancelled() and task.exception() is not None:
+            log(f"ERROR: {task.exception()}")
+
+    async def consume(self, runner: SymbolRunner) -> None:
+        """
+        Signal loop of one symbol over its kline stream.
+
+        A dropped stream (ConnectionError or another OSError) is reopened after
+        a doubling delay, re-seeding the RSI from the bars missed meanwhile.
+        """
+        if self.state.pending_orders(runner.symbol):
+            self._submit(runner, self.resume(runner))
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                await self.seed(runner)
+                async for kline in self.exchange.stream(runner.symbol, self.interval):
+                    delay = self.reconnect_delay
+                    side = runner.on_kline(kline)
+                    if side is not None:
+                        self._submit(runner, self._trade(runner, side))
+                    if self.on_decision is not None:
+                        self.on_decision(runner, kline, side)
+                    if self._stop.is_set():
+                        break
+                return
+            except OSError as e:
+                log(f"ERROR: {runner.symbol} stream lost ({e}), reconnecting in {delay:g}s")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def status(self) -> None:
+        """Log RSI and balance of every symbol periodically."""
+        while not self._stop.is_set():
+            for runner in self.runners.values():
+                try:
+                    balance = await self.exchange.balance(base_asset(runner.symbol))
+                    log(f"asset: {runner.symbol}, rsi: {runner.rsi:.4f}, balance: {balance}")
+                except Exception as e:
+                    log("ERROR: " + str(e))
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.status_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        """Ask every loop to finish after its current update."""
+        self._stop.set()
+
+    async def run(self) -> None:
+        """Run all symbols until the streams end or `stop` is called, then wait for open orders."""
+        consumers = [asyncio.create_task(self.consume(runner)) for runner in self.runners.values()]
+        status = asyncio.create_task(self.status())
+        try:
+            await asyncio.gather(*consumers)
+        finally:
+            self.stop()
+            await status
+            pending = [runner.pending for runner in self.runners.values() if runner.pending is not None]
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            await self.exchange.close()
+            self.state.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", nargs="+", default=["BTCUSDT"])
+    parser.add_argument("--entry", type=float, default=25)
+    parser.add_argument("--exit", type=float, default=74)
+    parser.add_argument("--length", type=int, default=14)
+    parser.add_argument("--quantity", type=float, default=0.01)
+    args = parser.parse_args()
+
+    from decouple import config
+    from exchange import BinanceExchange
+
+    exchange = BinanceExchange(config('API_Key'), config('Secret_Key'), testnet=True)
+    symbols = {symbol: {"entry_p": args.entry, "exit_p": args.exit, "length": args.length,
+                        "quantity": args.quantity} for symbol in args.symbols}
+    asyncio.run(BotRuntime(exchange, symbols).run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+Local exchange simulator and replay harness for the RSI bot.
+
+`SimulatedClient` implements the part of python-binance's Client used by
+bot.py (get_historical_klines, order_market_buy/sell, get_order,
+get_asset_balance) on top of recorded bars such as BTC-USD_data.csv. Bars
+are replayed at a configurable speed, or as fast as possible when the
+harness advances them, and market orders fill after a configurable latency.
+`SimulatedExchange` exposes the same replay through the async Exchange
+interface of runtime.py.
+
+The harness runs the bot's own loop (bot.get_rsi + bot.step), or the async
+runtime, over the replay in a scratch directory. It reports bars/sec, the
+distribution of tick-to-decision latency for every bar and tick-to-order
+latency for bars that traded.
+
+    python crpt-bot/simulator.py --csv crpt-bot/BTC-USD_data.csv --fill-latency 0
+    python crpt-bot/simulator.py --runtime --entry 45 --exit 55
+"""
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import AsyncIterator, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from exchange import Exchange, Kline
+
+_AGO = re.compile(r"(\d+)\s+(minute|hour|day)s?\s+ago", re.IGNORECASE)
+_UNIT_MS = {"minute": 60_000, "hour": 3_600_000, "day": 86_400_000}
+
+
+def load_bars(path: str) -> pd.DataFrame:
+    """Reads a bar CSV (Datetime, Open, High, Low, Close, Volume) into ms open times and OHLCV columns."""
+    frame = pd.read_csv(path)
+    time_col = frame.columns[0]
+    open_time = pd.to_datetime(frame[time_col], utc=True).dt.as_unit("ms").astype("int64")  # unit varies by pandas version
+    bars = pd.DataFrame({"open_time": open_time.to_numpy()})
+    for col in ("Open", "High", "Low", "Close", "Volume"):
+        bars[col.lower()] = frame[col].to_numpy(dtype=np.float64) if col in frame else frame["Close"].to_numpy()
+    return bars
+
+# -------------------------------------------------------------------------------------------------------------------
+# Synchronous Client replacement
+class SimulatedClient:
+    """
+    Replays recorded bars behind the python-binance Client calls used by the bot.
+
+    The bar at the cursor is the one still forming; everything before it is
+    closed. With `speed`, the cursor follows the wall clock (`speed` bars of
+    `bar_seconds` per `bar_seconds` of wall time, i.e. speed=1 is real time);
+    without it the harness moves the cursor with `advance`.
+    """
+    KLINE_INTERVAL_1MINUTE = "1m"
+
+    def __init__(self, bars: pd.DataFrame, symbol: str = "BTCUSDT", speed: Optional[float] = None,
+                 fill_latency: float = 0.0, warmup: int = 60, bar_seconds: float = 60.0,
+                 balances: Optional[Dict[str, float]] = None) -> None:
+        """
+        Args:
+            bars (pd.DataFrame): Bars from `load_bars`.
+            symbol (str): Symbol served. Default is 'BTCUSDT'.
+            speed (Optional[float]): Replay speed multiple of real time; None advances manually. Default is None.
+            fill_latency (float): Seconds before a market order fills; 0 fills in the acknowledgement. Default is 0.0.
+            warmup (int): Bars already closed when the replay starts. Default is 60 (the bot's hour of history).
+            bar_seconds (float): Bar length in seconds. Default is 60.0.
+            balances (Optional[Dict[str, float]]): Starting balances. Default is 100000 USDT.
+        """
+        self.bars = bars.reset_index(drop=True)
+        self.symbol = symbol
+        self.speed = speed
+        self.fill_latency = fill_latency
+        self.bar_seconds = bar_seconds
+        self.start = min(warmup, len(self.bars) - 1)
+        self.balances = dict(balances or {"USDT": 100_000.0})
+        self.orders: Dict[int, Dict] = {}
+        self._cursor = self.start
+        self._t0 = time.perf_counter_ns()
+        self.tick_ns = self._t0  # Wall time at which the current bar appeared
+
+        self._times = self.bars["open_time"].to_numpy()
+        self._closes = self.bars["close"].to_numpy()
+        self._klines = [[int(t), f"{o}", f"{h}", f"{l}", f"{c}", f"{v}", int(t + bar_seconds * 1000 - 1),
+                         "0", 0, "0", "0", "0"]
+                        for t, o, h, l, c, v in self.bars[["open_time", "open", "high", "low", "close",
+                                                           "volume"]].itertuples(index=False)]
+
+    @property
+    def cursor(self) -> int:
+        """Index of the forming bar."""
+        if self.speed:
+            elapsed = (time.perf_counter_ns() - self._t0) / 1e9
+            cursor = min(self.start + int(elapsed * self.speed / self.bar_seconds), len(self.bars) - 1)
+            if cursor != self._cursor:
+                self._cursor = cursor
+                self.tick_ns = self._t0 + int((cursor - self.start) * self.bar_seconds / self.speed * 1e9)
+        return self._cursor
+
+    @property
+    def finished(self) -> bool:
+        return self.cursor >= len(self.bars) - 1
+
+    def advance(self, n: int = 1) -> bool:
+        """Move the forming bar forward; returns False once the recording is exhausted."""
+        if self._cursor + n > len(self.bars) - 1:
+            return False
+        self._cursor += n
+        self.tick_ns = time.perf_counter_ns()
+        return True
+
+    def _start_index(self, start_str) -> int:
+        now = self._times[self.cursor]
+        if isinstance(start_str, str):
+            match = _AGO.search(start_str)
+            if match is None:
+                start_ms = int(pd.Timestamp(start_str).value // 1_000_000)
+            else:
+                start_ms = now - int(match.group(1)) * _UNIT_MS[match.group(2).lower()]
+        else:
+            start_ms = int(start_str)
+        return int(np.searchsorted(self._times, start_ms, side="left"))
+
+    def get_historical_klines(self, symbol: str, interval: str, start_str, end_str=None, limit: int = 1000) -> List:
+        """Klines from `start_str` (relative like '1 hour ago UTC', or ms) up to the forming bar."""
+        cursor = self.cursor
+        return self._klines[self._start_index(start_str):cursor + 1]
+
+    def _order(self, symbol: str, side: str, quantity: float) -> Dict:
+        order_id = len(self.orders) + 1
+        self.orders[order_id] = {"symbol": symbol, "orderId": order_id, "side": side.upper(), "status": "NEW",
+                                 "origQty": str(quantity), "fills": [], "created_ns": time.perf_counter_ns(),
+                                 "tick_ns": self.tick_ns, "bar": self.cursor}
+        return self.get_order(symbol, order_id)
+
+    def order_market_buy(self, symbol: str, quantity: float) -> Dict:
+        return self._order(symbol, "buy", quantity)
+
+    def order_market_sell(self, symbol: str, quantity: float) -> Dict:
+        return self._order(symbol, "sell", quantity)
+
+    def get_order(self, symbol: str, orderId: int) -> Dict:
+        """Order state; fills at the forming bar's close once `fill_latency` has passed."""
+        order = self.orders[orderId]
+        if order["status"] == "NEW" and time.perf_counter_ns() - order["created_ns"] >= self.fill_latency * 1e9:
+            price, quantity = float(self._closes[self.cursor]), float(order["origQty"])
+            order["status"] = "FILLED"
+            order["fills"] = [{"price": str(price), "qty": str(quantity)}]
+            base = symbol[:-4] if symbol.endswith("USDT") else symbol
+            sign = 1.0 if order["side"] == "BUY" else -1.0
+            self.balances[base] = self.balances.get(base, 0.0) + sign * quantity
+            self.balances["USDT"] = self.balances.get("USDT", 0.0) - sign * quantity * price
+        return {k: v for k, v in order.items() if k not in ("created_ns", "tick_ns", "bar")}
+
+    def get_asset_balance(self, asset: str) -> Dict:
+        return {"asset": asset, "free": f"{self.balances.get(asset, 0.0):.8f}", "locked": "0.00000000"}
+
+    def order_latencies_us(self) -> np.ndarray:
+        """Tick-to-order latency of every order placed, in microseconds."""
+        return np.array([(o["created_ns"] - o["tick_ns"]) / 1e3 for o in self.orders.values()])
+
+# -------------------------------------------------------------------------------------------------------------------
+# Async adapter for runtime.py
+class SimulatedExchange(Exchange):
+    """
+    The replay of a `SimulatedClient` behind the async Exchange interface.
+
+    Each bar is streamed as an update of the forming bar followed by its close.
+    """
+    def __init__(self, client: SimulatedClient) -> None:
+        self.client = client
+
+    async def history(self, symbol: str, interval: str, start: str) -> List[Kline]:
+        klines = self.client.get_historical_klines(symbol, interval, start)
+        return [Kline(symbol, k[0], float(k[4]), i < len(klines) - 1) for i, k in enumerate(klines)]
+
+    async def stream(self, symbol: str, interval: str) -> AsyncIterator[Kline]:
+        client = self.client
+        while True:
+            i = client.cursor
+            yield Kline(symbol, int(client._times[i]), float(client._closes[i]), False)
+            if client.speed:
+                while client.cursor == i and not client.finished:
+                    await asyncio.sleep(client.bar_seconds / client.speed / 10)
+            elif not client.advance():
+                return
+            await asyncio.sleep(0)
+            yield Kline(symbol, int(client._times[i]), float(client._closes[i]), True)
+            if client.speed and client.finished:
+                return
+
+    async def market_order(self, symbol: str, side: str, quantity: float) -> Dict:
+        return self.client._order(symbol, side, quantity)
+
+    async def get_order(self, symbol: str, order_id: int) -> Dict:
+        return self.client.get_order(symbol, order_id)
+
+    async def balance(self, asset: str) -> Dict:
+        return self.client.get_asset_balance(asset)
+
+# -------------------------------------------------------------------------------------------------------------------
+# Replay harness
+def percentiles(samples: np.ndarray) -> str:
+    if len(samples) == 0:
+        return "n/a"
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+    return f"p50={p50:9.1f} us  p90={p90:9.1f} us  p99={p99:9.1f} us  max={samples.max():9.1f} us  (n={len(samples)})"
+
+
+def replay_bot(client: SimulatedClient, entry_p: float = 25, exit_p: float = 74) -> Dict:
+    """
+    Runs bot.py's loop (get_rsi, then step) once per replayed bar.
+
+    Returns bars, wall time and tick-to-decision latencies in microseconds.
+    """
+    import bot
+    from src.process_data.streaming import StreamingRSI
+
+    bot.client, bot.entry_p, bot.exit_p = client, entry_p, exit_p
+    bot.state = bot.StateStore("bot_state")
+    bot.rsi_state, bot.last_closed, bot.last_rsi = StreamingRSI(length=14), None, float("nan")
+    rsi = bot.get_rsi(bot.asset)
+
+    decisions = []
+    start = time.perf_counter()
+    while (client.finished is False) if client.speed else client.advance():
+        old_rsi, rsi = rsi, bot.get_rsi(bot.asset)
+        bot.step(rsi, old_rsi)
+        decisions.append((time.perf_counter_ns() - client.tick_ns) / 1e3)
+        if client.speed:
+            # Poll the wall-clock replay until the next bar appears, like the bot's sleep
+            bar = client.cursor
+            while client.cursor == bar and not client.finished:
+                time.sleep(client.bar_seconds / client.speed / 10)
+    return {"bars": len(decisions), "wall": time.perf_counter() - start, "decisions": np.array(decisions)}
+
+
+def replay_runtime(client: SimulatedClient, entry_p: float = 25, exit_p: float = 74) -> Dict:
+    """
+    Runs runtime.BotRuntime over the replay.
+
+    Returns bars, wall time and the tick-to-decision latency of every streamed
+    kline update in microseconds (both updates of a bar: forming and closed).
+    """
+    from runtime import BotRuntime
+
+    decisions = []
+
+    def on_decision(runner, kline, side):
+        decisions.append((time.perf_counter_ns() - client.tick_ns) / 1e3)
+
+    runtime = BotRuntime(SimulatedExchange(client), {client.symbol: {"entry_p": entry_p, "exit_p": exit_p}},
+                         poll=0.001, status_interval=3600, on_decision=on_decision)
+    first = client.cursor
+    start = time.perf_counter()
+    asyncio.run(runtime.run())
+    return {"bars": client.cursor - first, "wall": time.perf_counter() - start, "decisions": np.array(decisions)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "BTC-USD_data.csv"))
+    parser.add_argument("--speed", type=float, default=None, help="multiple of real time; default as fast as possible")
+    parser.add_argument("--fill-latency", type=float, default=0.0, help="seconds until a market order fills")
+    parser.add_argument("--entry", type=float, default=25)
+    parser.add_argument("--exit", type=float, default=74)
+    parser.add_argument("--runtime", action="store_true", help="replay the asyncio runtime instead of bot.py")
+    parser.add_argument("--workdir", default=None, help="directory for account, logs and trades; default a temp dir")
+    args = parser.parse_args()
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    bars = load_bars(args.csv)
+    client = SimulatedClient(bars, speed=args.speed, fill_latency=args.fill_latency)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bot-replay-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        replay = replay_runtime if args.runtime else replay_bot
+        result = replay(client, args.entry, args.exit)
+    finally:
+        os.chdir(cwd)
+
+    print(f"mode={'runtime' if args.runtime else 'bot'} bars={result['bars']} wall={result['wall']:.3f}s "
+          f"throughput={result['bars'] / result['wall']:,.0f} bars/s orders={len(client.orders)} workdir={workdir}")
+    print(f"tick-to-decision : {percentiles(result['decisions'])}")
+    print(f"tick-to-order    : {percentiles(client.order_latencies_us())}")
+
+
+if __name__ == '__main__':
+    main()
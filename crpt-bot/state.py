@@ -0,0 +1,175 @@
+"""
+Crash-safe state of the bot: per-symbol positions and open orders.
+
+State lives in memory; every change is appended to a journal (one JSON line
+per change, flushed and fsynced) before it is applied, and the journal is
+folded into an atomically replaced snapshot every `snapshot_every` changes.
+Reads never touch the disk, so the polling loops do no per-tick file I/O.
+
+On start the snapshot is loaded and the journal replayed on top of it; a
+torn last line from a crash mid-append is dropped. An old `bot_account.json`
+is migrated the first time the store is opened.
+
+Files: `{path}.snapshot.json` and `{path}.wal`.
+"""
+import os
+import json
+from typing import Dict, List, Optional
+
+
+class StateStore:
+    """
+    In-memory bot state persisted through a write-ahead journal and snapshots.
+
+    State layout:
+        is_buying: flag of symbols without their own entry (the single-symbol bot's flag)
+        assets: symbol -> {"is_buying": bool, "position": float}
+        orders: order id -> {"symbol", "side", "quantity"} for orders not yet filled
+    """
+    def __init__(self, path: str = "bot_state", snapshot_every: int = 1000, fsync: bool = True,
+                 legacy_path: Optional[str] = "bot_account.json", default_buying: bool = True) -> None:
+        """
+        Args:
+            path (str): File prefix of the snapshot and journal. Default is 'bot_state'.
+            snapshot_every (int): Journal records between snapshots. Default is 1000.
+            fsync (bool): fsync every journal append and snapshot. Default is True.
+            legacy_path (Optional[str]): bot_account.json to migrate when no state exists yet. Default is 'bot_account.json'.
+            default_buying (bool): `is_buying` of symbols never seen before. Default is True.
+        """
+        self.snapshot_path = f"{path}.snapshot.json"
+        self.wal_path = f"{path}.wal"
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        if os.path.dirname(self.wal_path):
+            os.makedirs(os.path.dirname(self.wal_path), exist_ok=True)
+
+        self.state = {"seq": 0, "is_buying": default_buying, "assets": {}, "orders": {}}
+        self._journaled = 0  # Records in the journal since the last snapshot
+        fresh = not os.path.exists(self.snapshot_path) and not os.path.exists(self.wal_path)
+        self._recover()
+        self._wal = open(self.wal_path, "a")
+        if fresh and legacy_path and os.path.exists(legacy_path):
+            self._migrate(legacy_path)
+
+    # ---------------------------------------------------------------------------------------------------------------
+    # Recovery
+    def _recover(self) -> None:
+        """Load the snapshot, then replay the journal records written after it."""
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                self.state = json.load(f)
+        if not os.path.exists(self.wal_path):
+            return
+
+        with open(self.wal_path) as f:
+            lines = f.read().split("\n")
+        valid = 0  # Bytes of complete records, to cut a torn tail
+        for line in lines:
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # Torn write: everything after it is lost
+            valid += len(line) + 1
+            if record["seq"] > self.state["seq"]:
+                self._apply(record)
+                self._journaled += 1
+        if valid < os.path.getsize(self.wal_path):
+            with open(self.wal_path, "r+") as f:
+                f.truncate(valid)
+
+    def _migrate(self, legacy_path: str) -> None:
+        """Import the `is_buying` flags of an old bot_account.json."""
+        with open(legacy_path) as f:
+            account = json.load(f)
+        self.state["is_buying"] = account.get("is_buying", self.state["is_buying"])
+        for symbol, asset in account.get("assets", {}).items():
+            if isinstance(asset, dict) and "is_buying" in asset:
+                self.set_buying(symbol, asset["is_buying"])
+        self.snapshot()
+
+    # ---------------------------------------------------------------------------------------------------------------
+    # Journal
+    def _apply(self, record: Dict) -> None:
+        op, state = record["op"], self.state
+        if op == "buying":
+            self._asset(record["symbol"])["is_buying"] = record["value"]
+        elif op == "order":
+            state["orders"][str(record["order_id"])] = {"symbol": record["symbol"], "side": record["side"],
+                                                        "quantity": record["quantity"]}
+        elif op == "fill":
+            order = state["orders"].pop(str(record["order_id"]), None)
+            if order is not None:
+                sign = 1.0 if order["side"] == "buy" else -1.0
+                self._asset(order["symbol"])["position"] += sign * record["quantity"]
+        elif op == "cancel":
+            state["orders"].pop(str(record["order_id"]), None)
+        state["seq"] = record["seq"]
+
+    def _log(self, op: str, **fields) -> None:
+        """Journal one change, then apply it in memory."""
+        record = {"seq": self.state["seq"] + 1, "op": op, **fields}
+        self._wal.write(json.dumps(record) + "\n")
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+        self._apply(record)
+        self._journaled += 1
+        if self._journaled >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self) -> None:
+        """Write the full state atomically and start an empty journal."""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # Records up to state['seq'] are in the snapshot, so the journal can restart
+        self._wal.close()
+        self._wal = open(self.wal_path, "w")
+        self._journaled = 0
+
+    def close(self) -> None:
+        if not self._wal.closed:
+            self._wal.close()
+
+    # ---------------------------------------------------------------------------------------------------------------
+    # State access
+    def _asset(self, symbol: str) -> Dict:
+        return self.state["assets"].setdefault(symbol, {"is_buying": self.state["is_buying"],
+                                                            "position": 0.0})
+
+    def is_buying(self, symbol: str) -> bool:
+        asset = self.state["assets"].get(symbol)
+        return self.state["is_buying"] if asset is None else asset["is_buying"]
+
+    def position(self, symbol: str) -> float:
+        asset = self.state["assets"].get(symbol)
+        return 0.0 if asset is None else asset["position"]
+
+    def set_buying(self, symbol: str, value: bool) -> None:
+        if symbol not in self.state["assets"] or self.is_buying(symbol) != value:
+            self._log("buying", symbol=symbol, value=bool(value))
+
+    def open_order(self, symbol: str, order_id: int, side: str, quantity: float) -> None:
+        """Record a submitted order; it stays pending until `fill_order` or `cancel_order`."""
+        self._log("order", symbol=symbol, order_id=order_id, side=side, quantity=quantity)
+
+    def fill_order(self, order_id: int, quantity: float) -> None:
+        """Record a filled order and move the symbol's position."""
+        self._log("fill", order_id=order_id, quantity=quantity)
+
+    def cancel_order(self, order_id: int) -> None:
+        self._log("cancel", order_id=order_id)
+
+    def pending_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        """Orders submitted but not filled, e.g. to resume tracking after a restart."""
+        return [{"order_id": int(order_id), **order} for order_id, order in self.state["orders"].items()
+                if symbol is None or order["symbol"] == symbol]
+
+
+if __name__ == '__main__':pass
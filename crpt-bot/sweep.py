@@ -0,0 +1,137 @@
+"""
+Parameter sweep for the RSI bot's entry/exit/length settings.
+
+Backtests the bot's exact crossover rules on minute bars:
+    buy  when flat   and rsi < entry_p and old_rsi > entry_p
+    sell when long   and rsi > exit_p  and old_rsi < exit_p
+RSI is computed once per length; the buy/sell crossovers of every entry and
+exit level are broadcast into one (bars x entries x exits) action block and
+run through the vectorized backtest. Lengths are spread over a process pool,
+and the parameter sets are ranked by PnL and drawdown.
+
+The live bot polls every 10 s, so `old_rsi` may come from the same bar; the
+sweep compares consecutive closed bars.
+
+    python crpt-bot/sweep.py --csv crpt-bot/BTC-USD_data.csv --jobs 4 --top 20
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.process_data.features import rsi
+from src.process_data.labels import BUY, SELL
+from src.train.backtest import backtest
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+# -------------------------------------------------------------------------------------------------------------------
+# Crossover actions of every entry/exit pair for one RSI series
+def crossover_actions(rsi_values: np.ndarray, entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """
+    Buy/sell/hold actions of the bot's crossover rules for every (entry, exit) pair.
+
+    A bar cannot cross below an entry level and above an exit level at the same
+    time, so the two signal sets combine without conflicts.
+
+    Returns an array of shape (n_bars, n_entries, n_exits).
+    """
+    current, previous = rsi_values[1:, None], rsi_values[:-1, None]
+    with np.errstate(invalid="ignore"):
+        buys = (current < entries) & (previous > entries)    # (bars-1, entries)
+        sells = (current > exits) & (previous < exits)      # (bars-1, exits)
+    actions = np.where(buys[:, :, None], BUY, np.where(sells[:, None, :], SELL, 0)).astype(np.int8)
+    return np.concatenate([np.zeros((1, len(entries), len(exits)), dtype=np.int8), actions])
+
+# -------------------------------------------------------------------------------------------------------------------
+# Backtest all thresholds of one RSI length
+def sweep_length(closes: np.ndarray, length: int, entries: Sequence[float], exits: Sequence[float],
+                 cost: float = 0.001, block: int = 8) -> pd.DataFrame:
+    """
+    Backtests every entry/exit pair for one RSI length.
+
+    RSI is computed once; entries are processed `block` at a time to bound memory
+    on long minute-bar histories.
+    """
+    entries, exits = np.asarray(entries, dtype=np.float64), np.asarray(exits, dtype=np.float64)
+    rsi_values = rsi(pd.DataFrame({"close": closes}), length)["close"].to_numpy()
+
+    frames = []
+    for lo in range(0, len(entries), block):
+        entry_block = entries[lo:lo + block]
+        actions = crossover_actions(rsi_values, entry_block, exits)
+        result = backtest(closes[:, None, None], actions, cost=cost, periods_per_year=MINUTES_PER_YEAR)
+        stats = result.stats()
+        stats.index = pd.MultiIndex.from_product([[length], entry_block, exits], names=["length", "entry", "exit"])
+        frames.append(stats)
+    return pd.concat(frames)
+
+
+def _sweep_task(task) -> pd.DataFrame:
+    return sweep_length(*task)
+
+# -------------------------------------------------------------------------------------------------------------------
+# Full grid across lengths
+def sweep(closes: np.ndarray, lengths: Sequence[int], entries: Sequence[float], exits: Sequence[float],
+          cost: float = 0.001, n_jobs: int = 1, block: int = 8) -> pd.DataFrame:
+    """
+    Backtests the whole (length, entry, exit) grid and ranks it.
+
+    Ranking: parameter sets are ranked by total return and by max drawdown
+    separately, and ordered by the mean of the two ranks.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    tasks = [(closes, length, entries, exits, cost, block) for length in lengths]
+    if n_jobs == 1:
+        frames = [_sweep_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=None if n_jobs == -1 else n_jobs) as pool:
+            frames = list(pool.map(_sweep_task, tasks))
+
+    results = pd.concat(frames)
+    results["pnl_rank"] = results["total_return"].rank(ascending=False)
+    results["drawdown_rank"] = results["max_drawdown"].rank(ascending=False)
+    results["rank"] = (results["pnl_rank"] + results["drawdown_rank"]) / 2
+    return results.sort_values(["rank", "total_return"], ascending=[True, False])
+
+
+def load_closes(path: str, column: Optional[str] = None) -> np.ndarray:
+    """Reads the close column of a minute-bar CSV such as BTC-USD_data.csv."""
+    frame = pd.read_csv(path)
+    column = column or ("Close" if "Close" in frame.columns else "close")
+    return frame[column].to_numpy(dtype=np.float64)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "BTC-USD_data.csv"))
+    parser.add_argument("--column", default=None)
+    parser.add_argument("--lengths", type=int, nargs=3, default=[7, 29, 1], metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--entries", type=float, nargs=3, default=[10, 46, 1], metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--exits", type=float, nargs=3, default=[55, 91, 1], metavar=("START", "STOP", "STEP"))
+    parser.add_argument("--cost", type=float, default=0.001)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", default=None, help="CSV file for the full ranked results")
+    args = parser.parse_args()
+
+    closes = load_closes(args.csv, args.column)
+    lengths, entries, exits = np.arange(*args.lengths), np.arange(*args.entries), np.arange(*args.exits)
+
+    start = time.perf_counter()
+    results = sweep(closes, lengths, entries, exits, cost=args.cost, n_jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+    print(f"bars={len(closes)} combinations={len(results)} time={elapsed:.2f}s "
+          f"({len(results) / elapsed:,.0f} combinations/s)")
+    print(results.head(args.top)[["total_return", "max_drawdown", "sharpe", "trades", "rank"]].to_string())
+    if args.out:
+        results.to_csv(args.out)
+
+
+if __name__ == '__main__':
+    main()
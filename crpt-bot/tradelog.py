@@ -0,0 +1,44 @@
+import os
+import sys
+import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.utils import LogWriter
+
+# Background writers of the daily log and trade files, created on first use (in the bot's working directory)
+_writers = {}
+
+
+def _writer(name, **kwargs):
+    if name not in _writers:
+        _writers[name] = LogWriter(name, **kwargs)
+    return _writers[name]
+
+# -------------------------------------------------------------------------------------------------------------------
+# Log messages to both the console and a log file
+def log(msg):
+    """
+    Logs a message to the console and queues it for the daily log file in the 'logs' directory.
+    """
+    print(f"LOG: {msg}")
+    now = datetime.datetime.now()
+    _writer("logs", pattern="{date}.txt").write(f"{now.strftime('%H-%M-%S')}: {msg}", now.date().isoformat())
+
+# -------------------------------------------------------------------------------------------------------------------
+# Log trade details into a CSV file
+def trade_log(sym, side, price, amount):
+    """
+    Logs trade information (symbol, side, price, amount) into the daily CSV file in the 'trades' directory.
+    The directory, file and header are created by the writer when needed.
+    """
+    print(f"{side} {amount} {sym} for {price} per")
+    _writer("trades", pattern="{date}.csv", header="sym,side,amount,price").write(f"{sym},{side},{amount},{price}")
+
+# -------------------------------------------------------------------------------------------------------------------
+# Wait for queued lines
+def flush():
+    """
+    Blocks until every queued log and trade line is written.
+    """
+    for writer in _writers.values():
+        writer.flush()
@@ -1,17 +1,25 @@
-from setuptools import setup, find_packages
+from setuptools import setup, find_namespace_packages
+
+# Runtime dependencies are kept in one place, requirements.txt
+with open('requirements.txt') as f:
+    requirements = [line.strip() for line in f if line.strip() and not line.startswith('#')]
 
 setup(
     name='AlphaOracle',
     version='0.0.1',
-    packages=find_packages(),
-    install_requires=[
-        # Add your project's dependencies here
-        # For example: 'numpy', 'torch'
-    ],
+    packages=find_namespace_packages(include=['src', 'src.*']),
+    install_requires=requirements,
+    extras_require={
+        # The crypto bot's exchange client and API-key loading
+        'bot': ['python-binance', 'python-decouple'],
+    },
+    entry_points={
+        'console_scripts': ['alphaoracle=src.cli:main'],
+    },
     include_package_data=True,
     description='This lib will contain helper functions for AI use',
     author='pratyakshagarwal',
     author_email='pratyakshagarwal93@gmail.com',
     license='Apache 2.0',
 )
-# pip install -e .
\ No newline at end of file
+# pip install -e .
@@ -0,0 +1,218 @@
+import os
+import json
+import types
+import joblib
+import hashlib
+import contextlib
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.profiling import record
+
+# Content digests of files already hashed by this process, keyed by (path, size, mtime)
+_FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str) -> str:
+    """
+    Content digest of a file, memoised on its size and modification time.
+
+    Args:
+        path (str): File to hash.
+
+    Returns:
+        str: Hex blake2b digest of the file's bytes.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _FILE_DIGESTS:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _FILE_DIGESTS[memo_key] = h.hexdigest()
+    return _FILE_DIGESTS[memo_key]
+
+
+def digest(value: Any) -> str:
+    """
+    Content digest of a stage input: arrays and frames by their bytes, modules
+    by their source file, everything else by its canonical JSON.
+
+    Args:
+        value (Any): ndarray, DataFrame/Series, module, or JSON-serialisable value.
+
+    Returns:
+        str: Hex blake2b digest.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(value, types.ModuleType):
+        return file_digest(value.__file__)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(digest(value.to_numpy()).encode())
+        h.update(digest(value.index.to_numpy()).encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(json.dumps([str(c) for c in value.columns]).encode())
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            h.update(json.dumps(value.tolist(), default=str).encode())
+        else:
+            array = np.ascontiguousarray(value)
+            h.update(f"{array.dtype.str}{array.shape}".encode())
+            h.update(array.reshape(-1).view(np.uint8).data)  # Raw bytes, also for datetime64 buffers
+    else:
+        h.update(json.dumps(value, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class StageCache:
+    """
+    Content-addressed on-disk cache of pipeline stage outputs.
+
+    A stage's key hashes everything its output depends on: the stage name, its
+    source files, the config sections and parameters it reads, the code of the
+    modules that compute it, and the keys or contents of its upstream inputs.
+    Chaining keys this way forms a DAG: changing one input invalidates exactly
+    the stages downstream of it. Outputs are written with joblib, atomically;
+    hits refresh the entry's modification time, which drives least-recently-used
+    eviction once the cache exceeds `max_bytes` or `max_entries`.
+
+    Layout: `root/{stage}-{key}.joblib`.
+    """
+    def __init__(self, root: str = "data/cache", max_bytes: Optional[int] = 2 * 1024 ** 3,
+                 max_entries: Optional[int] = None, enabled: bool = True) -> None:
+        """
+        Args:
+            root (str): Cache directory. Default is 'data/cache'.
+            max_bytes (Optional[int]): Size budget of the directory. Default is 2 GiB.
+            max_entries (Optional[int]): Maximum number of entries. Default is unlimited.
+            enabled (bool): With False every lookup misses and nothing is stored. Default is True.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, stage: str, files: Iterable[str] = (), config: Optional[Dict] = None,
+            code: Iterable[Any] = (), params: Optional[Dict] = None, inputs: Iterable[Any] = ()) -> str:
+        """
+        Key of a stage output.
+
+        Args:
+            stage (str): Stage name.
+            files (Iterable[str]): Source files read by the stage, hashed by content.
+            config (Optional[Dict]): Config sections the stage depends on.
+            code (Iterable[Any]): Modules (or files) whose code computes the stage.
+            params (Optional[Dict]): Other settings of the stage.
+            inputs (Iterable[Any]): Upstream stage keys (strings) or in-memory inputs (arrays, frames).
+
+        Returns:
+            str: Hex digest identifying the output.
+        """
+        parts = {"stage": stage,
+                 "files": [[path, file_digest(path)] for path in files],
+                 "config": digest(config),
+                 "code": [digest(c) if isinstance(c, types.ModuleType) else file_digest(c) for c in code],
+                 "params": digest(params),
+                 "inputs": [i if isinstance(i, str) else digest(i) for i in inputs]}
+        return f"{stage}-{digest(parts)}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.joblib")
+
+    def __contains__(self, key: str) -> bool:
+        return self.enabled and os.path.exists(self._path(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Load a cached output, or return `default` on a miss."""
+        path = self._path(key)
+        if not self.enabled or not os.path.exists(path):
+            self.misses += 1
+            return default
+        # Other processes evict concurrently, so the entry can vanish at any point below
+        try:
+            value = joblib.load(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except Exception:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)  # Unreadable entry, e.g. pickled by incompatible library versions
+            self.misses += 1
+            return default
+        size = 0
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)  # Most recently used
+            size = os.path.getsize(path)
+        self.hits += 1
+        record(cache_hit=True, bytes_read=size)
+        return value
+
+    def put(self, key: str, value: Any) -> Any:
+        """Store an output atomically, evict if over budget, and return the value."""
+        if not self.enabled:
+            return value
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(value, tmp_path)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        record(cache_hit=False, bytes_written=size)
+        self.evict()
+        return value
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached output of `key`, computing and storing it on a miss.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def entries(self) -> List[Dict]:
+        """Cache entries, least recently used first."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".joblib"):
+                try:
+                    stat = os.stat(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    continue  # Evicted concurrently by another process
+                entries.append({"key": name[:-len(".joblib")], "bytes": stat.st_size, "used": stat.st_mtime})
+        return sorted(entries, key=lambda entry: entry["used"])
+
+    def evict(self) -> List[str]:
+        """
+        Remove least recently used entries until the cache fits its budget.
+
+        Returns:
+            List[str]: Keys removed.
+        """
+        entries = self.entries()
+        total = sum(entry["bytes"] for entry in entries)
+        removed = []
+        while entries and ((self.max_bytes is not None and total > self.max_bytes) or
+                           (self.max_entries is not None and len(entries) > self.max_entries)):
+            entry = entries.pop(0)
+            try:
+                os.remove(self._path(entry["key"]))
+            except FileNotFoundError:
+                pass  # Evicted concurrently by another process
+            total -= entry["bytes"]
+            removed.append(entry["key"])
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for entry in self.entries():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._path(entry["key"]))
+
+
+if __name__ == '__main__':pass
@@ -0,0 +1,263 @@
+"""
+Command-line entry point of the pipeline and the bot.
+
+Only argparse and the YAML config are loaded at startup; every subcommand
+imports the libraries it needs (pandas, scikit-learn, yfinance, matplotlib,
+the exchange clients) when it runs, so `--help`, config checks and bot
+restarts do not pay for the whole stack.
+
+    alphaoracle fetch --end 2024-10-31 --incremental
+    alphaoracle compile --jobs 4
+    alphaoracle train --jobs -1
+    alphaoracle evaluate --jobs -1
+    alphaoracle bot simulate --speed 60
+    alphaoracle config
+"""
+import os
+import sys
+import argparse
+import importlib
+from typing import Dict, List, Optional
+
+from src.utils import load_config
+
+BOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "crpt-bot")
+BOT_MODES = {"run": "bot", "runtime": "runtime", "simulate": "simulator"}
+
+
+def _cache(args: argparse.Namespace, config: Dict):
+    """Stage cache from `cache_params`, or None with --no-cache."""
+    params = config.get("cache_params", {})
+    if args.no_cache or not params.get("enabled", True):
+        return None
+    from src.cache import StageCache
+    return StageCache(**params)
+
+
+def _prices(args: argparse.Namespace, config: Dict):
+    """Wide price panel from the price store (--store) or the compiled CSV of `data_params.data_path`."""
+    import pandas as pd
+    if args.store is not None:
+        from src.process_data.store import PriceStore
+        return PriceStore(f"data/{args.store}").frame()
+    return pd.read_csv(f"data/{config['data_params']['data_path']}", index_col=0, parse_dates=True)
+
+# -------------------------------------------------------------------------------------------------------------------
+# Subcommands
+def fetch(args: argparse.Namespace, config: Dict) -> None:
+    """Download (or extend) the per-ticker CSVs under data/stock_dfs."""
+    from src.process_data.fetcher import fetch_data
+    data = config["data_params"]
+    results = fetch_data(nifty_reload=args.reload, link=data.get("LINK"), end=args.end or data["end_date"],
+                         path=data["ticker_list_path"], max_workers=args.workers, retries=args.retries,
+                         rate=args.rate, incremental=args.incremental)
+    failed = {ticker: outcome for ticker, outcome in results.items() if outcome != "done"}
+    print(f"fetched {len(results) - len(failed)} tickers, {len(failed)} failed")
+    if failed:
+        raise SystemExit(1)
+
+
+def compile_(args: argparse.Namespace, config: Dict) -> None:
+    """Join the ticker CSVs into the wide CSV of `data_params.data_path` and/or a price store."""
+    from src.process_data.transformation import compile_data
+    data = config["data_params"]
+    if args.no_csv and args.store is None:
+        raise SystemExit("alphaoracle compile: --no-csv requires --store, otherwise nothing is written")
+    compile_data(data["ticker_list_path"], None if args.no_csv else data["data_path"], store_path=args.store,
+                 fields=args.fields, n_jobs=args.jobs, cache=_cache(args, config))
+
+
+def train(args: argparse.Namespace, config: Dict) -> None:
+    """Train one model per ticker with the batch orchestrator."""
+    from src.train.orchestrator import BatchOrchestrator
+    data = config["data_params"]
+    orchestrator = BatchOrchestrator(n_jobs=args.jobs, out_dir=args.models, window=data["window"],
+                                     horizon=args.horizon, label_threshold=args.label_threshold,
+                                     train_size=data["train_test_split"], threshold=data["threshold"],
+                                     cache=_cache(args, config))
+    summary = orchestrator.run(_prices(args, config), args.tickers)
+    print(summary[["ticker", "accuracy", "f1_score", "fit_time", "cached"]].to_string(index=False))
+    print(", ".join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                    for key, value in orchestrator.report.items()))
+
+
+def evaluate(args: argparse.Namespace, config: Dict) -> None:
+    """
+    Evaluate the trained models on their test split and write the consolidated report.
+
+    Each model's test predictions are also backtested as actions on the ticker's
+    prices over the test dates; the statistics, one row per ticker, are written
+    to `evaluation_params.backtesting_results_path`.
+    """
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from src.process_data.scaler import PreprocessingPipeline
+    from src.train.backtest import backtest
+    from src.train.evaluation import ReportGenerator
+    from src.train.orchestrator import BatchOrchestrator, ticker_split
+
+    data, params = config["data_params"], config.get("evaluation_params", {})
+    prices = _prices(args, config).astype("float64")
+    # Same stage cache keys as `train`, so the features and labels computed there are reused
+    orchestrator = BatchOrchestrator(window=data["window"], horizon=args.horizon,
+                                     label_threshold=args.label_threshold, cache=_cache(args, config))
+    panel = orchestrator.panel(prices)
+    values, features, labels = panel["prices"], panel["features"], panel["labels"]
+
+    generator = ReportGenerator(params.get("class_names"),
+                                out_dir=args.out_dir or params.get("report_dir", "figures/report"),
+                                n_jobs=args.jobs if args.jobs is not None else params.get("report_n_jobs", 1),
+                                plot=not args.no_plot)
+    results, backtests = {}, []
+    for ticker in args.tickers or list(prices.columns):
+        model_dir = os.path.join(args.models, ticker)
+        if not os.path.exists(os.path.join(model_dir, "model.pkl")):
+            print(f"No model for {ticker} in {args.models}, skipped")
+            continue
+        model = joblib.load(os.path.join(model_dir, "model.pkl"))
+        pipeline = PreprocessingPipeline.load(os.path.join(model_dir, "preprocessing.npz"))
+        _, _, X_test, y_test, rows = ticker_split(values, features, labels, prices.columns.get_loc(ticker),
+                                                  data["train_test_split"], return_rows=True, purge=args.horizon)
+        X_test = pipeline.transform(X_test)
+        unknown = np.setdiff1d(model.classes_, generator.labels)
+        if len(unknown):
+            raise SystemExit(f"alphaoracle evaluate: the model of {ticker} predicts classes {unknown.tolist()} "
+                             f"missing from evaluation_params.class_names {generator.labels.tolist()}")
+        scores = None
+        if hasattr(model, "predict_proba"):
+            # Scores in class-id order, zero for classes the model never saw
+            scores = np.zeros((len(X_test), len(generator.labels)))
+            scores[:, np.searchsorted(generator.labels, model.classes_)] = model.predict_proba(X_test)
+        results[ticker] = (y_test, model.predict(X_test), scores)
+        if not args.no_backtest:
+            backtests.append(backtest(prices[ticker].iloc[rows], results[ticker][1], cost=args.cost,
+                                      names=[ticker]).stats())
+    if not results:
+        raise SystemExit(f"No trained models found in {args.models}")
+
+    report = generator.run(results)
+    print(report[["samples", "accuracy", "f1_score", "precision", "recall"]].to_string())
+    print(f"report written to {generator.out_dir}")
+    if backtests:
+        path = params.get("backtesting_results_path", "data/backtesting.csv")
+        stats = pd.concat(backtests)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        stats.to_csv(path)
+        print(stats[["total_return", "sharpe", "max_drawdown", "trades"]].to_string())
+        print(f"backtest written to {path}")
+
+
+def bot(args: argparse.Namespace, config: Dict) -> None:
+    """Run the RSI bot (bot.py), the asyncio runtime or the offline replay, with their own arguments."""
+    if not os.path.isdir(BOT_DIR):
+        raise SystemExit(f"The bot sources are not available: {BOT_DIR} does not exist")
+    sys.path.insert(0, BOT_DIR)
+    module = importlib.import_module(BOT_MODES[args.mode])
+    if args.mode == "run":
+        module.main(trade=True)
+    else:
+        sys.argv = [args.mode, *args.bot_args]
+        module.main()
+
+
+def show_config(args: argparse.Namespace, config: Dict) -> None:
+    """Print the validated configuration."""
+    import yaml
+    print(yaml.safe_dump(config, sort_keys=False), end="")
+
+# -------------------------------------------------------------------------------------------------------------------
+# Parser
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser of every subcommand."""
+    parser = argparse.ArgumentParser(prog="alphaoracle", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config.yaml", help="pipeline configuration (default: config.yaml)")
+    parser.add_argument("--no-profile", action="store_true", help="do not save or log the stage profile")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("fetch", help="download the ticker CSVs")
+    p.add_argument("--end", default=None, help="last date, YYYY-MM-DD (default: data_params.end_date)")
+    p.add_argument("--reload", action="store_true", help="reload the ticker list from data_params.LINK")
+    p.add_argument("--incremental", action="store_true", help="extend existing CSVs up to --end")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--retries", type=int, default=3)
+    p.add_argument("--rate", type=float, default=None, help="requests per second")
+    p.set_defaults(handler=fetch)
+
+    p = commands.add_parser("compile", help="join the ticker CSVs into one panel")
+    p.add_argument("--store", default=None, help="also build a price store in data/STORE")
+    p.add_argument("--no-csv", action="store_true", help="skip the joined CSV (requires --store)")
+    p.add_argument("--fields", nargs="+", default=["Adj Close"])
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("--no-cache", action="store_true")
+    p.set_defaults(handler=compile_)
+
+    train_parser = commands.add_parser("train", help="train one model per ticker")
+    evaluate_parser = commands.add_parser("evaluate", help="evaluate the trained models and write the report")
+    for p in (train_parser, evaluate_parser):
+        p.add_argument("--store", default=None, help="read prices from data/STORE instead of the joined CSV")
+        p.add_argument("--tickers", nargs="+", default=None, help="default: every ticker of the panel")
+        p.add_argument("--models", default="models", help="model artifact directory (default: models)")
+        p.add_argument("--horizon", type=int, default=1, help="label horizon in bars")
+        p.add_argument("--label-threshold", type=float, default=0.01)
+        p.add_argument("--no-cache", action="store_true")
+    train_parser.add_argument("--jobs", type=int, default=1, help="worker processes, -1 for every core")
+    train_parser.set_defaults(handler=train)
+    evaluate_parser.add_argument("--jobs", type=int, default=None, help="rendering processes (default: report_n_jobs)")
+    evaluate_parser.add_argument("--out-dir", default=None,
+                                 help="report directory (default: evaluation_params.report_dir)")
+    evaluate_parser.add_argument("--no-plot", action="store_true")
+    evaluate_parser.add_argument("--cost", type=float, default=0.001, help="backtest fee per unit traded")
+    evaluate_parser.add_argument("--no-backtest", action="store_true")
+    evaluate_parser.set_defaults(handler=evaluate)
+
+    p = commands.add_parser("bot", help="run the crypto bot; arguments after MODE go to the bot")
+    p.add_argument("mode", choices=list(BOT_MODES), help="run: bot.py, runtime: asyncio runtime, "
+                                                          "simulate: offline replay")
+    p.add_argument("bot_args", nargs=argparse.REMAINDER)
+    p.set_defaults(handler=bot)
+
+    p = commands.add_parser("config", help="validate and print the configuration")
+    p.set_defaults(handler=show_config)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Parse the arguments, load the configuration once and run the subcommand.
+
+    Pipeline subcommands report their stages into the process-wide profiler
+    (`profiling_params`); the profile is saved and its summary logged when the
+    command ends.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"alphaoracle: {e}")
+
+    if args.command in ("bot", "config") or args.no_profile:
+        args.handler(args, config)
+        return
+
+    from src import profiling
+    from src.utils import Logger
+    params = config.get("profiling_params", {})
+    profiler = profiling.configure(**{**params, "run_name": f"{params.get('run_name', 'run')}_{args.command}"})
+    try:
+        args.handler(args, config)
+    finally:
+        if profiler.enabled and profiler.records:
+            path = profiler.save()
+            logger = Logger(log_file_name="cli", console=False)
+            profiler.log_summary(logger, args.command)
+            logger.log(f"Stage profile saved to {path}", "INFO", args.command)
+            logger.close()
+            print(profiler.summary())
+            print(f"profile: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import pandas as pd
+from typing import Dict, Optional, Sequence
+
+from src.profiling import profiled
+
+# Prefixes of the per-ticker feature columns listed in config.yaml `data_params.columns`
+FEATURE_PREFIXES = ("SMA_20_", "EMA_20_", "20_day_std_", "Momentum_", "MACD_", "rsi_")
+
+
+def sma(prices: pd.DataFrame, length: int) -> pd.DataFrame:
+    """
+    Simple moving average of every column.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        length (int): Window length.
+
+    Returns:
+        pd.DataFrame: Moving averages, NaN until `length` values fill the window.
+    """
+    return prices.rolling(length).mean()
+
+
+def rolling_std(prices: pd.DataFrame, length: int) -> pd.DataFrame:
+    """
+    Rolling sample standard deviation of every column.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        length (int): Window length.
+
+    Returns:
+        pd.DataFrame: Rolling standard deviations (ddof=1).
+    """
+    return prices.rolling(length).std()
+
+
+def ema(prices: pd.DataFrame, span: int) -> pd.DataFrame:
+    """
+    Exponential moving average of every column, seeded with the first value.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        span (int): EMA span.
+
+    Returns:
+        pd.DataFrame: EMAs, `ewm(span=span, adjust=False).mean()`.
+    """
+    return prices.ewm(span=span, adjust=False).mean()
+
+
+def momentum(prices: pd.DataFrame, length: int) -> pd.DataFrame:
+    """
+    Price change over `length` bars.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        length (int): Lookback in bars.
+
+    Returns:
+        pd.DataFrame: `close - close.shift(length)`.
+    """
+    return prices - prices.shift(length)
+
+
+def macd(prices: pd.DataFrame, fast: int = 12, slow: int = 26) -> pd.DataFrame:
+    """
+    MACD line, the fast EMA minus the slow EMA.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        fast (int): Span of the fast EMA. Default is 12.
+        slow (int): Span of the slow EMA. Default is 26.
+
+    Returns:
+        pd.DataFrame: MACD values.
+    """
+    return ema(prices, fast) - ema(prices, slow)
+
+
+def rsi(prices: pd.DataFrame, length: int = 14) -> pd.DataFrame:
+    """
+    Relative Strength Index with Wilder smoothing, matching `pandas_ta.rsi`.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        length (int): RSI period. Default is 14.
+
+    Returns:
+        pd.DataFrame: RSI values in [0, 100].
+    """
+    # Split the changes into gains and losses, keeping NaNs where the change is unknown
+    delta = prices.diff()
+    gains, losses = delta.clip(lower=0), delta.clip(upper=0)
+
+    avg_gain = gains.ewm(alpha=1.0 / length, min_periods=length).mean()
+    avg_loss = losses.ewm(alpha=1.0 / length, min_periods=length).mean().abs()
+    return 100.0 * avg_gain / (avg_gain + avg_loss)
+
+
+@profiled("extract features")
+def compute_features(prices: pd.DataFrame, window: int = 14,
+                     tickers: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Compute the technical indicators used in `data_params.columns` for every ticker at once.
+
+    Each indicator is a single rolling/ewm kernel call over the whole wide price
+    matrix, so the universe costs the same number of calls as a single ticker
+    and there is no Python loop over tickers.
+
+    Columns produced per ticker T:
+        SMA_20_T, EMA_20_T, 20_day_std_T   20-bar SMA, EMA and rolling std
+        Momentum_T                          `window`-bar price change
+        MACD_T                              EMA(12) - EMA(26)
+        rsi_T                               `window`-bar Wilder RSI
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers), e.g. the compiled Adj Close panel.
+        window (int): `data_params.window` from config.yaml. Default is 14.
+        tickers (Optional[Sequence[str]]): Tickers to compute. Default is every column.
+
+    Returns:
+        pd.DataFrame: Feature frame indexed like `prices`, grouped by indicator.
+    """
+    prices = prices if tickers is None else prices[list(tickers)]
+    prices = prices.astype("float64")
+
+    blocks: Dict[str, pd.DataFrame] = {
+        "SMA_20_": sma(prices, 20),
+        "EMA_20_": ema(prices, 20),
+        "20_day_std_": rolling_std(prices, 20),
+        "Momentum_": momentum(prices, window),
+        "MACD_": macd(prices),
+        "rsi_": rsi(prices, window),
+    }
+    return pd.concat([block.add_prefix(prefix) for prefix, block in blocks.items()], axis=1)
+
+
+@profiled("feature matrix")
+def build_feature_matrix(prices: pd.DataFrame, columns: Sequence[str], window: int = 14,
+                         features: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Assemble the model input columns from config.yaml out of prices and indicators.
+
+    Passing precomputed `features` (from `compute_features`) lets several tickers
+    share one indicator computation; switching ticker is then a column selection.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        columns (Sequence[str]): `data_params.columns` from config.yaml.
+        window (int): `data_params.window` from config.yaml. Default is 14.
+        features (Optional[pd.DataFrame]): Precomputed indicators for the universe.
+
+    Returns:
+        pd.DataFrame: Frame with exactly `columns`, in order.
+    """
+    if features is None:
+        needed = sorted({col[len(prefix):] for col in columns for prefix in FEATURE_PREFIXES
+                         if col.startswith(prefix)})
+        features = compute_features(prices, window=window, tickers=needed)
+    price_cols = [col for col in columns if col in prices.columns]
+    feature_cols = [col for col in columns if col not in prices.columns]
+    return pd.concat([prices[price_cols], features[feature_cols]], axis=1)[list(columns)]
+
+
+if __name__ == '__main__':pass
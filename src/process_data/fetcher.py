@@ -1,10 +1,22 @@
 import os
+import json
+import time
+import random
 import pickle
+import shutil
+import threading
 import requests
 import datetime as dt
 import bs4 as bs
+import pandas as pd
 import yfinance as yf
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from src.profiling import profiled
+
+T = TypeVar("T")
+
 
 def save_tickers(link: str, path: str) -> List[str]:
     """
@@ -46,16 +58,361 @@ def save_tickers(link: str, path: str) -> List[str]:
     return tickers
 
 
+
+class DataSource:
+    """
+    Interface for a historical price provider used by the fetch engine.
+
+    Subclasses return one OHLCV frame per ticker indexed by date. Swapping the
+    source (e.g. for a local fake provider) requires no change to the engine.
+    """
+    def download(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """
+        Download daily bars for a single ticker.
+
+        Args:
+            ticker (str): Ticker symbol, e.g. 'TRENT.NS'.
+            start (str): Start date in 'YYYY-MM-DD' format.
+            end (str): End date in 'YYYY-MM-DD' format.
+
+        Returns:
+            pd.DataFrame: Bars indexed by date with string column names.
+        """
+        raise NotImplementedError
+
+
+class YahooFinanceSource(DataSource):
+    """Data source backed by the Yahoo Finance API."""
+    def download(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        # Fetch data from Yahoo Finance
+        df = yf.download(ticker, start=start, end=end, progress=False)
+        # Ensure column names are strings
+        df.columns = [column[0] for column in [*df.columns]]
+        return df
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by all download workers.
+    """
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """
+        Args:
+            rate (float): Maximum sustained number of requests per second.
+            burst (int): Number of requests allowed back to back. Default is 1.
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request slot is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # Refill the bucket for the time elapsed since the last call
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchJournal:
+    """
+    Append-only JSON-lines journal of per-ticker fetch outcomes.
+
+    An interrupted run is resumed by skipping every ticker the journal has
+    already recorded as done for the same end date.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Location of the journal file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def entries(self) -> List[Dict]:
+        """
+        Read all journal entries, ignoring a torn trailing line.
+
+        Returns:
+            List[Dict]: Journal entries in the order they were written.
+        """
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def completed(self, end: str) -> Set[str]:
+        """
+        Tickers whose latest entry for the given end date is 'done'.
+
+        Args:
+            end (str): End date of the run being resumed.
+
+        Returns:
+            Set[str]: Completed tickers.
+        """
+        status = {}
+        for entry in self.entries():
+            if entry.get("end") == end:
+                status[entry["ticker"]] = entry["status"]
+        return {ticker for ticker, state in status.items() if state == "done"}
+
+    def record(self, ticker: str, status: str, end: str, **info) -> None:
+        """
+        Append one outcome to the journal and flush it to disk.
+
+        Args:
+            ticker (str): Ticker the entry refers to.
+            status (str): 'done' or 'failed'.
+            end (str): End date of the run.
+            **info: Extra fields stored with the entry (rows, error, ...).
+        """
+        entry = {"ticker": ticker, "status": status, "end": end,
+                 "ts": dt.datetime.now().isoformat(timespec="seconds"), **info}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def _write_csv_atomic(df: pd.DataFrame, path: str) -> None:
+    """Write a frame to a temporary file and move it into place."""
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _with_retry(fn: Callable[[], T], retries: int, backoff: float, limiter: Optional[RateLimiter]) -> T:
+    """Call `fn`, retrying with exponential backoff and jitter."""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+
+
+def _download(source: DataSource, ticker: str, start: str, end: str) -> pd.DataFrame:
+    """Download one ticker, treating an empty result as a failure."""
+    df = source.download(ticker, start, end)
+    if df is None or df.empty:
+        raise ValueError(f"No data returned for {ticker}")
+    return df
+
+
+def _read_tail(path: str, n_lines: int = 1) -> Tuple[List[str], List[List[str]]]:
+    """
+    Read the header and the last rows of a CSV file without parsing the rest.
+
+    Args:
+        path (str): CSV file to read.
+        n_lines (int): Number of trailing rows to return. Default is 1.
+
+    Returns:
+        Tuple[List[str], List[List[str]]]: Header fields and the trailing rows split into fields.
+    """
+    with open(path, "rb") as f:
+        header = f.readline().decode("utf-8").strip().split(",")
+        data_start = f.tell()
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        # Read backwards in blocks until enough complete lines are buffered
+        buf = b""
+        while pos > data_start and buf.count(b"\n") <= n_lines:
+            step = min(8192, pos - data_start)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = [line for line in buf.decode("utf-8").splitlines() if line.strip()]
+    return header, [line.split(",") for line in lines[-n_lines:]]
+
+
+def update_ticker_csv(source: DataSource, ticker: str, path: str, start: str, end: str,
+                      tolerance: float = 1e-6, overlap: int = 5,
+                      limiter: Optional[RateLimiter] = None) -> Tuple[str, int]:
+    """
+    Bring an existing ticker CSV up to `end` by fetching only the missing range.
+
+    The download starts `overlap` stored bars back, so the fresh bars overlap
+    the end of the stored history. If any overlapping `Adj Close` differs (a
+    dividend or split restated the adjusted series), the whole ticker is
+    backfilled from `start`. Both the append and the backfill replace the file
+    atomically. An empty download although bars are due is an error, not
+    'uptodate': the overlap alone should come back.
+
+    Args:
+        source (DataSource): Price provider.
+        ticker (str): Ticker to update.
+        path (str): Existing CSV file of the ticker.
+        start (str): Start date used for a full backfill.
+        end (str): End date in 'YYYY-MM-DD' format (exclusive, as in yfinance).
+        tolerance (float): Relative tolerance for the overlap comparison. Default is 1e-6.
+        overlap (int): Stored bars re-downloaded and compared. Default is 5.
+        limiter (Optional[RateLimiter]): Rate limiter; the backfill download takes its own token.
+            The first download's token is taken by the caller (`_with_retry`). Default is None.
+
+    Returns:
+        Tuple[str, int]: Action taken ('uptodate', 'appended' or 'backfilled') and rows written.
+    """
+    header, tail = _read_tail(path, max(1, overlap))
+    if not tail:
+        df = _download(source, ticker, start, end)
+        _write_csv_atomic(df, path)
+        return "backfilled", len(df)
+
+    last_date = pd.Timestamp(tail[-1][0])
+    if last_date + pd.Timedelta(days=1) >= pd.Timestamp(end):
+        return "uptodate", 0
+
+    # Fetch from the first overlapping bar; an empty answer is a provider failure
+    new = _download(source, ticker, pd.Timestamp(tail[0][0]).strftime("%Y-%m-%d"), end)
+    new.index = pd.to_datetime(new.index)
+
+    # Compare the overlap window to detect restated adjusted prices
+    column = "Adj Close" if "Adj Close" in header else "Close"
+    if column in new.columns:
+        position = header.index(column)
+        stored = pd.Series({pd.Timestamp(row[0]): float(row[position]) for row in tail if row[position]},
+                           dtype="float64")
+        common = stored.index.intersection(new.index)
+        fresh = new.loc[common, column].astype("float64")
+        if (abs(fresh - stored[common]) > tolerance * stored[common].abs().clip(lower=1e-12)).any():
+            if limiter is not None:
+                limiter.acquire()
+            df = _download(source, ticker, start, end)
+            _write_csv_atomic(df, path)
+            return "backfilled", len(df)
+
+    # Keep only unseen bars, in the stored column order
+    new = new[new.index > last_date]
+    if new.empty:
+        return "uptodate", 0
+    new = new.reindex(columns=header[1:])
+    new.index.name = header[0]
+
+    # Append to a copy of the file and swap it in, so readers never see a torn row
+    tmp_path = f"{path}.tmp"
+    shutil.copyfile(path, tmp_path)
+    new.to_csv(tmp_path, mode="a", header=False)
+    os.replace(tmp_path, path)
+    return "appended", len(new)
+
+
+def fetch_tickers(tickers: Iterable[str], start: str, end: str, out_dir: str = 'data/stock_dfs',
+                  source: Optional[DataSource] = None, max_workers: int = 8, retries: int = 3,
+                  backoff: float = 1.0, rate: Optional[float] = None,
+                  journal: Optional[FetchJournal] = None, incremental: bool = False) -> Dict[str, str]:
+    """
+    Download tickers concurrently and save each one as a CSV file.
+
+    In incremental mode tickers that already have a CSV are updated in place
+    with `update_ticker_csv`; all others are downloaded in full. With a
+    `journal`, tickers it records as done for the same `end` whose CSV exists
+    are skipped, so an interrupted run resumes where it stopped.
+
+    Args:
+        tickers (Iterable[str]): Tickers to download.
+        start (str): Start date in 'YYYY-MM-DD' format.
+        end (str): End date in 'YYYY-MM-DD' format.
+        out_dir (str): Directory the per-ticker CSV files are written to.
+        source (Optional[DataSource]): Price provider. Default is Yahoo Finance.
+        max_workers (int): Size of the download worker pool. Default is 8.
+        retries (int): Retries per ticker after the first attempt. Default is 3.
+        backoff (float): Base delay in seconds between retries. Default is 1.0.
+        rate (Optional[float]): Global limit on requests per second. Default is unlimited.
+        journal (Optional[FetchJournal]): Journal recording each outcome.
+        incremental (bool): If True, append missing bars to existing files. Default is False.
+
+    Returns:
+        Dict[str, str]: Outcome per fetched ticker, 'done' or the error message.
+    """
+    source = source or YahooFinanceSource()
+    limiter = RateLimiter(rate, burst=max_workers) if rate else None
+    os.makedirs(out_dir, exist_ok=True)
+
+    tickers = list(tickers)
+    if journal is not None:
+        done = journal.completed(end)
+        resumed = [t for t in tickers if t in done and os.path.exists(os.path.join(out_dir, f"{t}.csv"))]
+        for ticker in resumed:
+            print(f"Already fetched {ticker} up to {end} (journal)")
+        tickers = [t for t in tickers if t not in set(resumed)]
+
+    def task(ticker: str) -> Tuple[str, int]:
+        Tpath = os.path.join(out_dir, f"{ticker}.csv")
+        if incremental and os.path.exists(Tpath):
+            return _with_retry(lambda: update_ticker_csv(source, ticker, Tpath, start, end, limiter=limiter),
+                               retries, backoff, limiter)
+        df = _with_retry(lambda: _download(source, ticker, start, end), retries, backoff, limiter)
+        _write_csv_atomic(df, Tpath)
+        return "downloaded", len(df)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(task, ticker): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                action, rows = future.result()
+            except Exception as e:
+                results[ticker] = str(e)
+                if journal is not None:
+                    journal.record(ticker, "failed", end, error=str(e))
+                print(f"Failed to fetch {ticker}: {e}")
+            else:
+                results[ticker] = "done"
+                if journal is not None:
+                    journal.record(ticker, "done", end, action=action, rows=rows)
+                print(f"Saved {ticker} data at: {os.path.join(out_dir, f'{ticker}.csv')} ({action}, {rows} rows)")
+    return results
+
+
+@profiled("fetch")
 def fetch_data(nifty_reload: bool = False, link: str = None, end: str = '2023-12-31',
-               path: str = None) -> None:
+               path: str = None, max_workers: int = 8, retries: int = 3, rate: Optional[float] = None,
+               source: Optional[DataSource] = None, incremental: bool = False) -> Dict[str, str]:
     """
     Fetch historical stock data for NIFTY 50 tickers and save it as CSV files.
+
+    Downloads run concurrently through `fetch_tickers` and each CSV is written
+    atomically. Outcomes are journaled in `data/stock_dfs/fetch_journal.jsonl`,
+    and tickers the journal records as done for the same `end` are skipped, so
+    an interrupted run only refetches the tickers that are still missing.
+
+    With `incremental=True` existing files are not skipped but extended from
+    their last stored date up to `end`.
     
     Args:
         nifty_reload (bool): If True, reload tickers from the given link. Default is False.
         link (str): URL to fetch the tickers from if `nifty_reload` is True.
         end (str): End date for historical stock data in 'YYYY-MM-DD' format. Default is '2023-12-31'.
         path (str): Path to the pickle file storing the tickers.
+        max_workers (int): Number of concurrent downloads. Default is 8.
+        retries (int): Retries per ticker after the first attempt. Default is 3.
+        rate (Optional[float]): Global limit on requests per second. Default is unlimited.
+        source (Optional[DataSource]): Price provider. Default is Yahoo Finance.
+        incremental (bool): If True, update existing files instead of skipping them. Default is False.
+
+    Returns:
+        Dict[str, str]: Outcome per fetched ticker, 'done' or the error message.
     """
     if nifty_reload:
         # Reload tickers from the provided link
@@ -69,19 +426,21 @@ def fetch_data(nifty_reload: bool = False, link: str = None, end: str = '2023-12
     start_date = '2008-01-01'
     # Ensure the directory for stock data exists
     os.makedirs('data/stock_dfs', exist_ok=True)
+    journal = FetchJournal('data/stock_dfs/fetch_journal.jsonl')
 
-    # Download and save data for each ticker
+    # Files are written atomically, so any CSV on disk holds a completed download (of some end date);
+    # tickers completed for this end date are skipped by fetch_tickers from the journal
+    pending = []
     for ticker in tickers:
-        Tpath = f'data/stock_dfs/{ticker}.csv'
-        if not os.path.exists(Tpath):
-            # Fetch data from Yahoo Finance
-            df = yf.download(ticker, start=start_date, end=end)
-            # Ensure column names are strings
-            df.columns = [column[0] for column in [*df.columns]]
-            df.to_csv(Tpath)
-            print(f"Saved {ticker} data at: {Tpath}")
-        else:
+        if not incremental and os.path.exists(f'data/stock_dfs/{ticker}.csv'):
             print(f"Already have data for {ticker}")
+        else:
+            pending.append(ticker)
+
+    # Download (or extend) and save data for the remaining tickers
+    return fetch_tickers(pending, start=start_date, end=end, out_dir='data/stock_dfs', source=source,
+                         max_workers=max_workers, retries=retries, rate=rate, journal=journal,
+                         incremental=incremental)
 
 
 if __name__ == '__main__':pass
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Optional, Sequence
+
+from src.profiling import profiled
+
+# Class ids used in config.yaml `evaluation_params.class_names`
+HOLD, BUY, SELL = 0, 1, 2
+
+
+def forward_returns(prices: pd.DataFrame, horizon: int = 1) -> pd.DataFrame:
+    """
+    Return from each bar to the bar `horizon` steps ahead.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        horizon (int): Bars ahead. Default is 1.
+
+    Returns:
+        pd.DataFrame: Forward returns, NaN for the last `horizon` bars.
+    """
+    return prices.shift(-horizon) / prices - 1.0
+
+
+def _classify(returns: np.ndarray, upper: float, lower: Optional[float]) -> np.ndarray:
+    """BUY above `upper`, SELL below `-lower` (default `-upper`), HOLD otherwise, NaN where unknown."""
+    lower = upper if lower is None else lower
+    with np.errstate(invalid="ignore"):
+        labels = np.select([returns > upper, returns < -lower], [BUY, SELL], HOLD).astype(np.float64)
+    labels[np.isnan(returns)] = np.nan
+    return labels
+
+
+@profiled("labels")
+def make_labels(prices: pd.DataFrame, horizon: int = 1, threshold: float = 0.01,
+                lower: Optional[float] = None) -> pd.DataFrame:
+    """
+    Buy/sell/hold targets from forward returns for every ticker at once.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        horizon (int): Bars ahead. Default is 1.
+        threshold (float): Return needed for a buy. Default is 0.01.
+        lower (Optional[float]): Loss (positive) needed for a sell. Default is `threshold` (symmetric).
+
+    Returns:
+        pd.DataFrame: BUY (1) above `threshold`, SELL (2) below `-lower`,
+        HOLD (0) otherwise; NaN where the forward return is unknown.
+    """
+    returns = forward_returns(prices, horizon).to_numpy()
+    return pd.DataFrame(_classify(returns, threshold, lower), index=prices.index, columns=prices.columns)
+
+
+@profiled("labels")
+def multi_horizon_labels(prices: pd.DataFrame, horizons: Sequence[int] = (1, 5, 10, 20),
+                         threshold: float = 0.01, lower: Optional[float] = None) -> pd.DataFrame:
+    """
+    Forward-return labels of every ticker for several horizons in one pass.
+
+    The forward returns of all horizons are computed into one
+    (bars x horizons x tickers) array and classified together, so label
+    variants can be compared from the same compiled panel.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        horizons (Sequence[int]): Bars ahead. Default is (1, 5, 10, 20).
+        threshold (float): Return needed for a buy. Default is 0.01.
+        lower (Optional[float]): Loss (positive) needed for a sell. Default is `threshold`.
+
+    Returns:
+        pd.DataFrame: Labels with (horizon, ticker) MultiIndex columns; NaN where the future is unknown.
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    n_bars = len(values)
+    returns = np.full((n_bars, len(horizons), values.shape[1]), np.nan)
+    for k, horizon in enumerate(horizons):
+        if horizon < n_bars:
+            np.divide(values[horizon:], values[:-horizon], out=returns[:-horizon, k])
+    returns -= 1.0
+
+    labels = _classify(returns, threshold, lower).reshape(n_bars, -1)
+    columns = pd.MultiIndex.from_product([list(horizons), prices.columns], names=["horizon", "ticker"])
+    return pd.DataFrame(labels, index=prices.index, columns=columns)
+
+
+@profiled("labels")
+def triple_barrier_labels(prices: pd.DataFrame, horizon: int = 10, upper: float = 0.02,
+                          lower: Optional[float] = None, volatility_span: Optional[int] = None,
+                          vertical: str = "hold") -> pd.DataFrame:
+    """
+    Triple-barrier targets for every ticker at once.
+
+    From each bar, the path of the next `horizon` closes is checked against an
+    upper (take-profit) and a lower (stop-loss) barrier: BUY if the upper one is
+    touched first, SELL if the lower one is, and otherwise the vertical barrier
+    at `horizon` decides. The paths are a strided view over the price matrix
+    (no copies per bar), and the first touch of each barrier is found with one
+    argmax over the path axis.
+
+    Args:
+        prices (pd.DataFrame): Wide price frame (dates x tickers).
+        horizon (int): Vertical barrier, in bars. Default is 10.
+        upper (float): Return of the upper barrier. Default is 0.02.
+        lower (Optional[float]): Loss (positive) of the lower barrier. Default is `upper`.
+        volatility_span (Optional[int]): Scale both barriers by the EWM std of daily returns
+            with this span, making `upper`/`lower` multiples of volatility. Default is None (fixed returns).
+        vertical (str): At the vertical barrier, 'hold' labels HOLD and 'sign' labels by the
+            sign of the return at `horizon`. Default is 'hold'.
+
+    Returns:
+        pd.DataFrame: BUY (1), SELL (2) or HOLD (0); NaN for the last `horizon` bars,
+        whose path is incomplete, and where the barrier width is unknown.
+    """
+    if vertical not in ("hold", "sign"):
+        raise ValueError(f"Unknown vertical {vertical!r}; use 'hold' or 'sign'")
+    lower = upper if lower is None else lower
+    values = prices.to_numpy(dtype=np.float64)
+    n_bars, n_tickers = values.shape
+    labels = np.full((n_bars, n_tickers), np.nan)
+    if horizon >= n_bars:
+        return pd.DataFrame(labels, index=prices.index, columns=prices.columns)
+
+    up, down = np.full((n_bars, n_tickers), upper), np.full((n_bars, n_tickers), lower)
+    if volatility_span is not None:
+        volatility = prices.pct_change().ewm(span=volatility_span).std().to_numpy()
+        up, down = up * volatility, down * volatility
+
+    # paths[t, n, k] = return from bar t to bar t+1+k
+    n_start = n_bars - horizon
+    paths = sliding_window_view(values[1:], horizon, axis=0)[:n_start] / values[:n_start, :, None] - 1.0
+    with np.errstate(invalid="ignore"):
+        hit_up = paths >= up[:n_start, :, None]
+        hit_down = paths <= -down[:n_start, :, None]
+    # First touch of each barrier, `horizon` when never touched
+    first_up = np.where(hit_up.any(axis=2), hit_up.argmax(axis=2), horizon)
+    first_down = np.where(hit_down.any(axis=2), hit_down.argmax(axis=2), horizon)
+
+    if vertical == "hold":
+        at_vertical = np.full((n_start, n_tickers), float(HOLD))
+    else:
+        final = paths[:, :, -1]
+        at_vertical = np.where(final > 0, BUY, np.where(final < 0, SELL, HOLD)).astype(np.float64)
+    result = np.where(first_up < first_down, BUY, np.where(first_down < first_up, SELL, at_vertical))
+    unknown = np.isnan(paths).any(axis=2) | np.isnan(up[:n_start]) | np.isnan(down[:n_start])
+    result[unknown] = np.nan
+    labels[:n_start] = result
+    return pd.DataFrame(labels, index=prices.index, columns=prices.columns)
+
+
+if __name__ == '__main__':pass
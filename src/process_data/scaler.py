@@ -1,9 +1,14 @@
+import os
 import joblib
+import tempfile
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
 from sklearn.preprocessing import StandardScaler
 from sklearn.base import BaseEstimator
 
+from src.profiling import profiled
+
+@profiled("split")
 def split_data(X: np.ndarray, y: np.ndarray, size: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
     Split the dataset into training and testing sets based on the given size.
@@ -47,8 +52,17 @@ def scale_data(features: np.ndarray, Spath: str) -> Tuple[np.ndarray, BaseEstima
 
 class OutlierHandlers:
     """
-    A class to handle outliers in datasets by replacing them with the median.
+    A class to handle outliers in datasets using Z-scores against training statistics.
+
+    Strategies:
+        'row'  - replace every feature of a row that has any outlier with the median
+        'cell' - replace only the offending cells with the median
+        'clip' - clip values to mean +/- threshold standard deviations
     """
+    STRATEGIES = ("row", "cell", "clip")
+    # Rows per block for memory-mapped inputs when no `chunk_size` is given
+    MEMMAP_CHUNK = 65536
+
     def __init__(self, Xtrain: np.ndarray, threshold: float) -> None:
         """
         Initialize the handler with training data statistics and a threshold.
@@ -63,27 +77,276 @@ class OutlierHandlers:
         self.mean_ = np.mean(Xtrain, axis=0)
         self.std_ = np.std(Xtrain, axis=0)
 
-    def handle(self, data: np.ndarray) -> np.ndarray:
+    @classmethod
+    def from_stats(cls, median: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                   threshold: float) -> "OutlierHandlers":
         """
-        Replace outliers in the dataset with the median values.
+        Build a handler from precomputed training statistics.
+
+        Args:
+            median (np.ndarray): Per-feature training median.
+            mean (np.ndarray): Per-feature training mean.
+            std (np.ndarray): Per-feature training standard deviation.
+            threshold (float): Z-score threshold to identify outliers.
+
+        Returns:
+            OutlierHandlers: Handler using the given statistics.
+        """
+        handler = cls.__new__(cls)
+        handler.threshold = threshold
+        handler.median_, handler.mean_, handler.std_ = median, mean, std
+        return handler
+
+    def _handle_block(self, block: np.ndarray, strategy: str) -> None:
+        """Apply the strategy to a 2-D block in place."""
+        # Distance from the mean allowed before a value counts as an outlier
+        bound = self.threshold * np.where(self.std_ == 0, 1, self.std_)
+
+        if strategy == "clip":
+            np.clip(block, self.mean_ - bound, self.mean_ + bound, out=block)
+            return
+
+        mask = np.abs(block - self.mean_) > bound
+        if strategy == "row":
+            block[mask.any(axis=1)] = self.median_
+        else:
+            np.copyto(block, np.broadcast_to(self.median_, block.shape).astype(block.dtype, copy=False),
+                      where=mask)
+
+    def handle(self, data: np.ndarray, strategy: str = "row", copy: bool = True,
+               chunk_size: Optional[int] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Replace outliers in the dataset using the training statistics.
+
+        The work is fully vectorized. With `chunk_size` the rows are processed in
+        blocks, so only one block of temporaries is in memory at a time.
+
+        Memory: an in-memory input is copied into a new in-memory array (or into
+        `out`). An `np.memmap` input never gets a full copy in RAM: it is handled
+        in place with `copy=False` (open it with mode 'r+'), streamed into `out`,
+        or, with neither, streamed into a new memory-mapped array backed by an
+        anonymous temporary file next to the input (freed when the result is
+        garbage collected). Memory-mapped inputs are processed `MEMMAP_CHUNK`
+        rows at a time unless `chunk_size` is given.
 
         Args:
             data (np.ndarray): Data to process (training or inference data).
+            strategy (str): One of 'row', 'cell' or 'clip'. Default is 'row'.
+            copy (bool): If False, modify `data` in place. Default is True.
+            chunk_size (Optional[int]): Number of rows per block. Default is all rows at once
+                (`MEMMAP_CHUNK` for a memory-mapped input).
+            out (Optional[np.ndarray]): Array to write the result to when copying.
 
         Returns:
-            np.ndarray: Data with outliers replaced by median values.
+            np.ndarray: Data with outliers handled, an `np.memmap` when `data` is one and no `out` is given.
         """
-        # Compute Z-scores using training statistics
-        zscores = np.abs((data - self.mean_) / np.where(self.std_ == 0, 1, self.std_))
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {self.STRATEGIES}")
+
+        mapped = isinstance(data, np.memmap)
+        if not copy:
+            result = data
+        elif out is not None:
+            result = out
+        elif mapped:
+            directory = os.path.dirname(data.filename) if data.filename else None
+            result = np.memmap(tempfile.TemporaryFile(dir=directory), dtype=data.dtype, mode="w+",
+                               shape=data.shape)
+        else:
+            result = np.empty_like(data)
 
-        # Identify indices of outliers where Z-score exceeds the threshold
-        outlier_indices = np.where(zscores > self.threshold)
+        step = chunk_size or (self.MEMMAP_CHUNK if mapped else max(len(data), 1))
+        for start in range(0, len(data), step):
+            block = result[start:start + step]
+            if result is not data:
+                block[...] = data[start:start + step]
+            self._handle_block(block, strategy)
 
-        # Replace outlier values with the median
-        for i in outlier_indices[0]:  # Iterate over rows with outliers
-            for j in range(data.shape[1]):  # Iterate over columns
-                data[i, j] = self.median_[j]
+        return result
+
+def _moments(X: np.ndarray, chunk_size: Optional[int], transform=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-feature mean and population variance in one streaming pass.
 
-        return data
+    Chunk statistics are merged with the parallel Welford (Chan et al.) update,
+    so only one chunk is materialized at a time.
+    """
+    step = chunk_size or max(len(X), 1)
+    count, mean, m2 = 0, np.zeros(X.shape[1]), np.zeros(X.shape[1])
+    for start in range(0, len(X), step):
+        block = np.array(X[start:start + step], dtype=np.float64)
+        if transform is not None:
+            transform(block)
+        n = len(block)
+        block_mean = block.mean(axis=0)
+        block_m2 = ((block - block_mean) ** 2).sum(axis=0)
+        delta = block_mean - mean
+        total = count + n
+        mean = mean + delta * (n / total)
+        m2 = m2 + block_m2 + delta ** 2 * (count * n / total)
+        count = total
+    return mean, m2 / max(count, 1)
+
+
+def _npz_path(path: str) -> str:
+    """The file `np.savez_compressed` actually writes for `path`: it appends '.npz' when missing."""
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+class PreprocessingPipeline:
+    """
+    Fitted split -> outlier handling -> standard scaling in a single object.
+
+    `fit` collects every training statistic (median, mean and std for the
+    outlier handler, then the scaler moments of the handled data) with streaming
+    passes, and `transform` applies both steps in one fused, chunked pass that
+    writes straight into the output dtype. The whole state is saved to a single
+    `.npz` artifact, so live inference reuses exactly the training statistics.
+    """
+    def __init__(self, threshold: float = 3.0, strategy: str = "row", dtype: str = "float64",
+                 chunk_size: Optional[int] = None) -> None:
+        """
+        Args:
+            threshold (float): Z-score threshold to identify outliers. Default is 3.0.
+            strategy (str): Outlier strategy, see `OutlierHandlers`. Default is 'row'.
+            dtype (str): Output dtype, 'float64' or 'float32'. Default is 'float64'.
+            chunk_size (Optional[int]): Rows per block for fitting and transforming. Default is all rows.
+        """
+        if strategy not in OutlierHandlers.STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {OutlierHandlers.STRATEGIES}")
+        self.threshold = threshold
+        self.strategy = strategy
+        self.dtype = dtype
+        self.chunk_size = chunk_size
+        self.outliers_: Optional[OutlierHandlers] = None
+        self.scale_mean_: Optional[np.ndarray] = None
+        self.scale_: Optional[np.ndarray] = None
+
+    @profiled("preprocess")
+    def fit(self, X: np.ndarray) -> "PreprocessingPipeline":
+        """
+        Learn the outlier and scaling statistics from training data.
+
+        Args:
+            X (np.ndarray): Training features (may be a memory map).
+
+        Returns:
+            PreprocessingPipeline: The fitted pipeline.
+        """
+        # Outlier statistics of the raw training data
+        mean, var = _moments(X, self.chunk_size)
+        if self.chunk_size:
+            # Medians need every row, so bound memory by taking a few columns at a time
+            width = max(1, self.chunk_size * X.shape[1] // max(len(X), 1))
+            median = np.concatenate([np.median(X[:, j:j + width], axis=0) for j in range(0, X.shape[1], width)])
+        else:
+            median = np.median(X, axis=0)
+        self.outliers_ = OutlierHandlers.from_stats(median, mean, np.sqrt(var), self.threshold)
+
+        # Scaler moments of the outlier-handled training data
+        scale_mean, scale_var = _moments(X, self.chunk_size,
+                                         lambda block: self.outliers_._handle_block(block, self.strategy))
+        self.scale_mean_ = scale_mean
+        self.scale_ = np.where(scale_var == 0, 1.0, np.sqrt(scale_var))
+        return self
+
+    def transform(self, X: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Handle outliers and scale in one pass per block.
+
+        Args:
+            X (np.ndarray): Features to transform (train, test or live rows).
+            out (Optional[np.ndarray]): Preallocated output buffer. Default allocates one.
+
+        Returns:
+            np.ndarray: Transformed features in the pipeline dtype.
+        """
+        if self.scale_ is None:
+            raise RuntimeError("PreprocessingPipeline must be fitted before transform")
+        X = np.atleast_2d(X)
+        if out is None:
+            out = np.empty(X.shape, dtype=self.dtype)
+
+        handler = self.outliers_
+        bound = handler.threshold * np.where(handler.std_ == 0, 1, handler.std_)
+        scaled_median = (handler.median_ - self.scale_mean_) / self.scale_
+        step = self.chunk_size or max(len(X), 1)
+        for start in range(0, len(X), step):
+            block = X[start:start + step]
+            target = out[start:start + step]
+            if self.strategy == "clip":
+                block = np.clip(block, handler.mean_ - bound, handler.mean_ + bound)
+                np.divide(block - self.scale_mean_, self.scale_, out=target, casting="unsafe")
+                continue
+            mask = np.abs(block - handler.mean_) > bound
+            np.divide(block - self.scale_mean_, self.scale_, out=target, casting="unsafe")
+            if self.strategy == "row":
+                target[mask.any(axis=1)] = scaled_median
+            else:
+                np.copyto(target, np.broadcast_to(scaled_median, target.shape), where=mask, casting="unsafe")
+        return out
+
+    def fit_transform(self, X: np.ndarray) -> np.ndarray:
+        """
+        Fit on `X` and return it transformed.
+
+        Args:
+            X (np.ndarray): Training features.
+
+        Returns:
+            np.ndarray: Transformed training features.
+        """
+        return self.fit(X).transform(X)
+
+    def split_fit_transform(self, X: np.ndarray, y: np.ndarray,
+                            size: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Split chronologically, fit on the training part and transform both parts.
+
+        Args:
+            X (np.ndarray): Features dataset.
+            y (np.ndarray): Target dataset.
+            size (float): Fraction of data to use for training (0 < size < 1).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            Training features, training targets, testing features, testing targets.
+        """
+        X_train, y_train, X_test, y_test = split_data(X, y, size)
+        return self.fit_transform(X_train), y_train, self.transform(X_test), y_test
+
+    def save(self, path: str) -> None:
+        """
+        Save the fitted statistics as one compressed `.npz` artifact.
+
+        Args:
+            path (str): Destination file, e.g. 'models/preprocessing.npz'. A missing '.npz'
+                suffix is appended (as numpy does), and `load` resolves the same name.
+        """
+        handler = self.outliers_
+        np.savez_compressed(_npz_path(path), threshold=self.threshold, strategy=self.strategy, dtype=self.dtype,
+                            median=handler.median_, mean=handler.mean_, std=handler.std_,
+                            scale_mean=self.scale_mean_, scale=self.scale_)
+
+    @classmethod
+    def load(cls, path: str, chunk_size: Optional[int] = None) -> "PreprocessingPipeline":
+        """
+        Load a pipeline saved with `save`.
+
+        Args:
+            path (str): Artifact written by `save`, with or without the '.npz' suffix.
+            chunk_size (Optional[int]): Rows per block for transforming. Default is all rows.
+
+        Returns:
+            PreprocessingPipeline: The fitted pipeline.
+        """
+        with np.load(_npz_path(path), allow_pickle=False) as state:
+            pipeline = cls(threshold=float(state["threshold"]), strategy=str(state["strategy"]),
+                           dtype=str(state["dtype"]), chunk_size=chunk_size)
+            pipeline.outliers_ = OutlierHandlers.from_stats(state["median"], state["mean"], state["std"],
+                                                            pipeline.threshold)
+            pipeline.scale_mean_ = state["scale_mean"]
+            pipeline.scale_ = state["scale"]
+        return pipeline
 
 if __name__ == '__main__':pass
\ No newline at end of file
@@ -0,0 +1,214 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+STORE_VERSION = 1
+
+
+def _field_file(field: str) -> str:
+    """Map a field name such as 'Adj Close' to its array file name."""
+    return field.lower().replace(" ", "_") + ".npy"
+
+
+class PriceStore:
+    """
+    Columnar, memory-mapped price store with a shared date index.
+
+    Each field (Open, High, Low, Close, Adj Close, Volume) is one Fortran-ordered
+    `.npy` array of shape (n_dates, n_tickers), so a ticker's full history is a
+    contiguous block on disk. Arrays are opened with `mmap_mode='r'`: reading a
+    field, a ticker subset or a date range only touches the pages it needs and
+    contiguous selections are returned as zero-copy views.
+
+    Layout:
+        root/meta.json      tickers, fields, dtype and number of dates
+        root/dates.npy      sorted datetime64[ns] index
+        root/<field>.npy    one array per field, e.g. adj_close.npy
+    """
+    def __init__(self, root: str = "data/price_store") -> None:
+        """
+        Open an existing store.
+
+        Args:
+            root (str): Directory of the store. Default is 'data/price_store'.
+        """
+        self.root = root
+        with open(os.path.join(root, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self.tickers: List[str] = self.meta["tickers"]
+        self.fields: List[str] = self.meta["fields"]
+        self.dates: np.ndarray = np.load(os.path.join(root, "dates.npy"))
+        self._ticker_pos = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def write(cls, frames: Dict[str, pd.DataFrame], root: str = "data/price_store",
+              fields: Optional[Sequence[str]] = None, dtype: str = "float64") -> "PriceStore":
+        """
+        Write per-ticker OHLCV frames into a new store, replacing any existing one.
+
+        Args:
+            frames (Dict[str, pd.DataFrame]): Frame per ticker, indexed by date.
+            root (str): Directory of the store.
+            fields (Optional[Sequence[str]]): Fields to store. Default is every column of the first frame.
+            dtype (str): Storage dtype of the price arrays. Default is 'float64'.
+
+        Returns:
+            PriceStore: The newly written store.
+        """
+        tickers = list(frames)
+        if fields is None:
+            fields = list(frames[tickers[0]].columns) if tickers else []
+
+        # Build the union date index once
+        index = pd.DatetimeIndex([])
+        for frame in frames.values():
+            index = index.union(pd.DatetimeIndex(frame.index))
+        dates = index.values.astype("datetime64[ns]")
+
+        # Write everything into a temporary directory and swap it in at the end
+        tmp_root = f"{root}.tmp"
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        os.makedirs(tmp_root)
+        np.save(os.path.join(tmp_root, "dates.npy"), dates)
+
+        for field in fields:
+            out = np.lib.format.open_memmap(os.path.join(tmp_root, _field_file(field)), mode="w+",
+                                            dtype=dtype, shape=(len(dates), len(tickers)),
+                                            fortran_order=True)
+            out[:] = np.nan
+            for j, ticker in enumerate(tickers):
+                frame = frames[ticker]
+                if field not in frame.columns:
+                    continue
+                # Scatter the ticker's rows into its positions on the union index
+                pos = index.get_indexer(pd.DatetimeIndex(frame.index))
+                out[pos, j] = frame[field].to_numpy(dtype=dtype)
+            out.flush()
+            del out
+
+        meta = {"version": STORE_VERSION, "tickers": tickers, "fields": list(fields),
+                "dtype": dtype, "n_dates": len(dates)}
+        with open(os.path.join(tmp_root, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        old_root = f"{root}.old"
+        if os.path.exists(root):
+            os.replace(root, old_root)
+        os.replace(tmp_root, root)
+        shutil.rmtree(old_root, ignore_errors=True)
+        return cls(root)
+
+    @classmethod
+    def from_csvs(cls, tickers: Sequence[str], csv_dir: str = "data/stock_dfs",
+                  root: str = "data/price_store", fields: Optional[Sequence[str]] = None,
+                  dtype: str = "float64") -> "PriceStore":
+        """
+        Build a store from the per-ticker CSV files written by `fetch_data`.
+
+        Args:
+            tickers (Sequence[str]): Tickers to include, in column order.
+            csv_dir (str): Directory holding `{ticker}.csv` files.
+            root (str): Directory of the store.
+            fields (Optional[Sequence[str]]): Fields to store. Default is every CSV column.
+            dtype (str): Storage dtype of the price arrays. Default is 'float64'.
+
+        Returns:
+            PriceStore: The newly written store.
+        """
+        frames = {}
+        for ticker in tickers:
+            usecols = None if fields is None else ["Date", *fields]
+            frame = pd.read_csv(os.path.join(csv_dir, f"{ticker}.csv"), usecols=usecols,
+                                index_col="Date")
+            index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+            # Keep exchange-local wall time so daily bars stay on their trading day
+            frame.index = index.tz_localize(None) if index.tz is not None else index
+            frames[ticker] = frame
+        return cls.write(frames, root=root, fields=fields, dtype=dtype)
+
+    def array(self, field: str = "Adj Close") -> np.ndarray:
+        """
+        Memory-mapped array of one field, shape (n_dates, n_tickers).
+
+        Args:
+            field (str): Field to open. Default is 'Adj Close'.
+
+        Returns:
+            np.ndarray: Read-only memory map over the field file.
+        """
+        if field not in self._arrays:
+            if field not in self.fields:
+                raise KeyError(f"Field {field!r} is not in the store")
+            self._arrays[field] = np.load(os.path.join(self.root, _field_file(field)), mmap_mode="r")
+        return self._arrays[field]
+
+    def date_slice(self, start: Optional[str] = None, end: Optional[str] = None) -> slice:
+        """
+        Row slice covering dates in [start, end] via binary search on the index.
+
+        Args:
+            start (Optional[str]): First date to include. Default is the beginning.
+            end (Optional[str]): Last date to include. Default is the end.
+
+        Returns:
+            slice: Row slice into the field arrays.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, "ns"), side="left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, "ns"), side="right"))
+        return slice(lo, hi)
+
+    def _ticker_index(self, tickers: Optional[Sequence[str]]):
+        """Column selector for a ticker subset, a slice when the subset is contiguous."""
+        if tickers is None:
+            return slice(None)
+        pos = [self._ticker_pos[ticker] for ticker in tickers]
+        if pos and pos == list(range(pos[0], pos[0] + len(pos))):
+            return slice(pos[0], pos[0] + len(pos))
+        return pos
+
+    def read(self, field: str = "Adj Close", tickers: Optional[Sequence[str]] = None,
+             start: Optional[str] = None, end: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read one field for a ticker subset and date range.
+
+        Contiguous ticker selections (including all tickers) come back as views
+        of the memory map without copying; scattered selections copy only the
+        requested columns.
+
+        Args:
+            field (str): Field to read. Default is 'Adj Close'.
+            tickers (Optional[Sequence[str]]): Tickers to read. Default is all.
+            start (Optional[str]): First date to include.
+            end (Optional[str]): Last date to include.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Values of shape (n_dates, n_tickers) and their dates.
+        """
+        rows = self.date_slice(start, end)
+        values = self.array(field)[rows, self._ticker_index(tickers)]
+        return values, self.dates[rows]
+
+    def frame(self, field: str = "Adj Close", tickers: Optional[Sequence[str]] = None,
+              start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        Wide frame of one field, laid out like `nifty50_adsclose_joined.csv`.
+
+        Args:
+            field (str): Field to read. Default is 'Adj Close'.
+            tickers (Optional[Sequence[str]]): Tickers to read. Default is all.
+            start (Optional[str]): First date to include.
+            end (Optional[str]): Last date to include.
+
+        Returns:
+            pd.DataFrame: Date-indexed frame with one column per ticker.
+        """
+        values, dates = self.read(field, tickers, start, end)
+        columns = self.tickers if tickers is None else list(tickers)
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name="Date"), columns=columns, copy=False)
+
+
+if __name__ == '__main__':pass
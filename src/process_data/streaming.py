@@ -0,0 +1,422 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence, Union
+
+from src.process_data.features import FEATURE_PREFIXES
+
+Value = Union[float, np.ndarray]
+
+
+def _out(value: np.ndarray) -> Value:
+    """Return 0-d results as plain floats."""
+    return float(value) if np.ndim(value) == 0 else value
+
+
+def _has_nan(x: np.ndarray) -> bool:
+    """Whether a bar holds a NaN, without a reduction for scalar bars."""
+    return bool(np.isnan(x)) if x.ndim == 0 else bool(np.isnan(x).any())
+
+
+def _nan(shape) -> Value:
+    """NaN result of the given shape, used while an indicator warms up."""
+    return _out(np.full(shape, np.nan))
+
+
+class StreamingIndicator:
+    """
+    Base class of the O(1)-per-bar incremental indicators.
+
+    Every indicator keeps only the compact state its recursion needs, so the
+    cost of a new bar does not depend on how much history has been seen. Inputs
+    are either scalars (one instrument) or 1-d arrays (one value per ticker,
+    updated together). Values match the batch kernels in `features.py` on the
+    same history.
+
+    Subclasses implement `update`, which commits a closed bar, and `peek`,
+    which evaluates a provisional bar (e.g. the still-open candle) without
+    changing the state.
+    """
+    def seed(self, history: Union[Sequence[float], np.ndarray, pd.Series, pd.DataFrame]) -> Value:
+        """
+        Feed a block of historical bars, oldest first.
+
+        Args:
+            history: Bars of shape (n_bars,) or (n_bars, n_tickers).
+
+        Returns:
+            Value: Indicator value after the last bar.
+        """
+        value = np.nan
+        for row in np.asarray(history, dtype=np.float64):
+            value = self.update(row)
+        return value
+
+    def update(self, x: Value) -> Value:
+        """
+        Commit one closed bar and return the new indicator value.
+
+        Args:
+            x (Value): Closing price(s) of the bar.
+
+        Returns:
+            Value: Indicator value (NaN while warming up).
+        """
+        raise NotImplementedError
+
+    def peek(self, x: Value) -> Value:
+        """
+        Indicator value if `x` were the next bar, without committing it.
+
+        Args:
+            x (Value): Provisional closing price(s).
+
+        Returns:
+            Value: Indicator value (NaN while warming up).
+        """
+        raise NotImplementedError
+
+
+class StreamingSMA(StreamingIndicator):
+    """
+    Simple moving average over a ring buffer with a running sum.
+
+    Like `rolling(length).mean()`, a window holding a NaN is NaN. The sum is
+    rebuilt from the buffer whenever a NaN enters or leaves the window, so a
+    gap (e.g. the leading NaNs of a late listing) only affects the windows that
+    contain it.
+    """
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self._buf: Optional[np.ndarray] = None
+        self._sum = 0.0
+        self._count = 0
+
+    def _window(self, x: np.ndarray) -> None:
+        if self._buf is None:
+            self._buf = np.zeros((self.length, *np.shape(x)))
+            self._sum = np.zeros(np.shape(x))
+
+    def update(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        self._window(x)
+        slot = self._count % self.length
+        gap = np.isnan(x).any() or np.isnan(self._buf[slot]).any()
+        self._sum = self._sum + x - self._buf[slot]
+        self._buf[slot] = x
+        self._count += 1
+        if gap or self._count % self.length == 0:
+            # Re-add the window once per cycle so rounding errors cannot accumulate, and around NaNs
+            self._sum = self._buf.sum(axis=0)
+        return self.value
+
+    def peek(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        self._window(x)
+        if self._count + 1 < self.length:
+            return _nan(np.shape(x))
+        oldest = self._buf[self._count % self.length]
+        if np.isnan(oldest).any():
+            window = self._buf.copy()
+            window[self._count % self.length] = x
+            return _out(window.sum(axis=0) / self.length)
+        return _out((self._sum + x - oldest) / self.length)
+
+    @property
+    def value(self) -> Value:
+        if self._buf is None:
+            return np.nan
+        if self._count < self.length:
+            return _nan(self._buf.shape[1:])
+        return _out(self._sum / self.length)
+
+
+class StreamingStd(StreamingIndicator):
+    """
+    Rolling sample standard deviation with a sliding-window Welford update.
+
+    As with `rolling(length).std()`, a window holding a NaN is NaN; mean and M2
+    are recomputed from the buffer when a NaN enters or leaves the window.
+    """
+    def __init__(self, length: int, ddof: int = 1) -> None:
+        self.length = length
+        self.ddof = ddof
+        self._buf: Optional[np.ndarray] = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._count = 0
+
+    def _init(self, x: np.ndarray) -> None:
+        if self._buf is None:
+            self._buf = np.zeros((self.length, *np.shape(x)))
+            self._mean = np.zeros(np.shape(x))
+            self._m2 = np.zeros(np.shape(x))
+
+    def _step(self, x: np.ndarray):
+        """Mean and M2 after adding `x` (and dropping the oldest value once full)."""
+        n = min(self._count, self.length)
+        if self._count < self.length:
+            delta = x - self._mean
+            mean = self._mean + delta / (n + 1)
+            return mean, self._m2 + delta * (x - mean)
+        old = self._buf[self._count % self.length]
+        mean = self._mean + (x - old) / n
+        return mean, self._m2 + (x - old) * (x - mean + old - self._mean)
+
+    def _exact(self, window: np.ndarray):
+        """Mean and M2 of a window, computed directly."""
+        mean = window.mean(axis=0)
+        return mean, ((window - mean) ** 2).sum(axis=0)
+
+    def update(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        self._init(x)
+        slot = self._count % self.length
+        gap = np.isnan(x).any() or (self._count >= self.length and np.isnan(self._buf[slot]).any())
+        self._mean, self._m2 = self._step(x)
+        self._buf[slot] = x
+        self._count += 1
+        if gap or self._count % self.length == 0:
+            # Recompute exactly once per cycle to bound drift, and around NaNs
+            self._mean, self._m2 = self._exact(self._buf[:min(self._count, self.length)])
+        return self.value
+
+    def peek(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        self._init(x)
+        if self._count + 1 < self.length:
+            return _nan(np.shape(x))
+        if np.isnan(self._buf[self._count % self.length]).any():
+            window = self._buf.copy()
+            window[self._count % self.length] = x
+            _, m2 = self._exact(window)
+        else:
+            _, m2 = self._step(x)
+        return _out(np.sqrt(np.maximum(m2, 0.0) / (self.length - self.ddof)))
+
+    @property
+    def value(self) -> Value:
+        if self._buf is None:
+            return np.nan
+        if self._count < self.length:
+            return _nan(self._buf.shape[1:])
+        return _out(np.sqrt(np.maximum(self._m2, 0.0) / (self.length - self.ddof)))
+
+
+class StreamingEMA(StreamingIndicator):
+    """
+    Exponentially weighted mean, following pandas `ewm(..., ignore_na=False)`.
+
+    With `adjust=False` this is the EMA seeded by the first observation
+    (`ewm(adjust=False)`); with `adjust=True` the weight of the past decays
+    as a sum, as pandas does for Wilder smoothing. NaN inputs are not folded
+    into the state: each series starts at its first finite value, and a NaN bar
+    only decays the weight of the past (so the next observation counts more),
+    while the mean carries forward. `min_periods` counts finite observations.
+    """
+    def __init__(self, span: Optional[int] = None, alpha: Optional[float] = None,
+                 adjust: bool = False, min_periods: int = 0) -> None:
+        if alpha is None:
+            alpha = 2.0 / (span + 1)
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self._mean = None  # NaN until a series' first observation
+        self._weight = None  # Weight of the past in the next update
+        self._nobs = None
+        self._running = False  # Every series has had its first observation
+        self._warm = False  # Every series has `min_periods` observations
+
+    def _step(self, x: np.ndarray):
+        """Mean, weight and observation count after the bar `x`."""
+        if self._mean is None:
+            shape = np.shape(x)
+            self._mean, self._weight, self._nobs = np.full(shape, np.nan), np.ones(shape), np.zeros(shape, int)
+        elif self._running and not _has_nan(x):
+            # Every series started and the bar is complete: the plain recursion, as on the live path
+            weight = self._weight * (1.0 - self.alpha)
+            new_weight = 1.0 if self.adjust else self.alpha
+            mean = (weight * self._mean + new_weight * x) / (weight + new_weight)
+            return mean, weight + new_weight if self.adjust else np.ones_like(weight), self._nobs + 1
+        observed = ~np.isnan(x)
+        started = ~np.isnan(self._mean)
+        weight = np.where(started, self._weight * (1.0 - self.alpha), self._weight)
+        new_weight = 1.0 if self.adjust else self.alpha
+        step = started & observed
+        mean = np.where(step, (weight * self._mean + new_weight * x) / (weight + new_weight), self._mean)
+        weight = np.where(step, weight + new_weight if self.adjust else 1.0, weight)
+        first = ~started & observed
+        return np.where(first, x, mean), np.where(first, 1.0, weight), self._nobs + observed
+
+    def _value(self, mean: np.ndarray, nobs: np.ndarray) -> Value:
+        if self._warm or np.all(nobs >= self.min_periods):
+            return _out(mean)
+        return _out(np.where(nobs >= self.min_periods, mean, np.nan))
+
+    def update(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        self._mean, self._weight, self._nobs = self._step(x)
+        self._running = self._running or not _has_nan(self._mean)
+        self._warm = self._warm or bool(np.all(self._nobs >= self.min_periods))
+        return self.value
+
+    def peek(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        mean, _, nobs = self._step(x)
+        return self._value(mean, nobs)
+
+    @property
+    def value(self) -> Value:
+        if self._mean is None:
+            return np.nan
+        return self._value(self._mean, self._nobs)
+
+
+class StreamingMomentum(StreamingIndicator):
+    """Price change over `length` bars, from a ring buffer of the last `length` closes."""
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self._buf: Optional[np.ndarray] = None
+        self._last = None
+        self._count = 0
+
+    def update(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        if self._buf is None:
+            self._buf = np.zeros((self.length, *np.shape(x)))
+        value = self.peek(x)
+        self._buf[self._count % self.length] = x
+        self._count += 1
+        return value
+
+    def peek(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        if self._buf is None or self._count < self.length:
+            return _nan(np.shape(x))
+        return _out(x - self._buf[self._count % self.length])
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line from a fast and a slow streaming EMA."""
+    def __init__(self, fast: int = 12, slow: int = 26) -> None:
+        self.fast = StreamingEMA(span=fast)
+        self.slow = StreamingEMA(span=slow)
+
+    def update(self, x: Value) -> Value:
+        return _out(np.asarray(self.fast.update(x)) - np.asarray(self.slow.update(x)))
+
+    def peek(self, x: Value) -> Value:
+        return _out(np.asarray(self.fast.peek(x)) - np.asarray(self.slow.peek(x)))
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Wilder RSI, matching `pandas_ta.rsi` / `features.rsi` over the same history.
+
+    Only the previous close and the two smoothed gain/loss accumulators are kept.
+    """
+    def __init__(self, length: int = 14) -> None:
+        self.length = length
+        self.gains = StreamingEMA(alpha=1.0 / length, adjust=True, min_periods=length)
+        self.losses = StreamingEMA(alpha=1.0 / length, adjust=True, min_periods=length)
+        self._prev = None
+
+    @staticmethod
+    def _rsi(gain: Value, loss: Value) -> Value:
+        gain, loss = np.asarray(gain), np.abs(np.asarray(loss))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return _out(100.0 * gain / (gain + loss))
+
+    def update(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        if self._prev is None:
+            # The first bar has no change, so it only sets the reference close
+            self._prev = x
+            return _nan(np.shape(x))
+        delta = x - self._prev
+        self._prev = x
+        return self._rsi(self.gains.update(np.maximum(delta, 0.0)), self.losses.update(np.minimum(delta, 0.0)))
+
+    def peek(self, x: Value) -> Value:
+        x = np.asarray(x, dtype=np.float64)
+        if self._prev is None:
+            return _nan(np.shape(x))
+        delta = x - self._prev
+        return self._rsi(self.gains.peek(np.maximum(delta, 0.0)), self.losses.peek(np.minimum(delta, 0.0)))
+
+    @property
+    def value(self) -> Value:
+        if self._prev is None:
+            return np.nan
+        if self.gains._mean is None:
+            return _nan(np.shape(self._prev))
+        return self._rsi(self.gains.value, self.losses.value)
+
+
+class StreamingFeatures:
+    """
+    Live counterpart of `features.compute_features` for a fixed set of tickers.
+
+    Holds one vectorized streaming indicator per feature family and returns a
+    feature row laid out exactly like the batch columns (grouped by indicator,
+    then ticker), so a live bar costs O(n_tickers) regardless of lookback.
+    """
+    def __init__(self, tickers: Sequence[str], window: int = 14) -> None:
+        """
+        Args:
+            tickers (Sequence[str]): Tickers, in the column order of the price panel.
+            window (int): `data_params.window` from config.yaml. Default is 14.
+        """
+        self.tickers = list(tickers)
+        self.indicators: Dict[str, StreamingIndicator] = {
+            "SMA_20_": StreamingSMA(20),
+            "EMA_20_": StreamingEMA(span=20),
+            "20_day_std_": StreamingStd(20),
+            "Momentum_": StreamingMomentum(window),
+            "MACD_": StreamingMACD(),
+            "rsi_": StreamingRSI(window),
+        }
+        self.columns = [f"{prefix}{ticker}" for prefix in FEATURE_PREFIXES for ticker in self.tickers]
+
+    def seed(self, prices: pd.DataFrame) -> pd.Series:
+        """
+        Warm the state up from a historical price panel.
+
+        Args:
+            prices (pd.DataFrame): Wide price frame with the tracked tickers as columns.
+
+        Returns:
+            pd.Series: Feature row after the last bar.
+        """
+        row = None
+        for bar in prices[self.tickers].to_numpy(dtype=np.float64):
+            row = self.update(bar)
+        return row
+
+    def update(self, bar: np.ndarray) -> pd.Series:
+        """
+        Commit one bar of closes for all tickers.
+
+        Args:
+            bar (np.ndarray): Closing prices in ticker order.
+
+        Returns:
+            pd.Series: Feature row indexed by column name.
+        """
+        values = [np.asarray(self.indicators[prefix].update(bar)) for prefix in FEATURE_PREFIXES]
+        return pd.Series(np.concatenate(values), index=self.columns)
+
+    def peek(self, bar: np.ndarray) -> pd.Series:
+        """
+        Feature row for a provisional bar without committing it.
+
+        Args:
+            bar (np.ndarray): Provisional closing prices in ticker order.
+
+        Returns:
+            pd.Series: Feature row indexed by column name.
+        """
+        values = [np.asarray(self.indicators[prefix].peek(bar)) for prefix in FEATURE_PREFIXES]
+        return pd.Series(np.concatenate(values), index=self.columns)
+
+
+if __name__ == '__main__':pass
@@ -1,44 +1,143 @@
+import os
 import pickle
 import pandas as pd
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
 
-def compile_data(Tpath: str, Dpath: str) -> None:
+from src.cache import StageCache, file_digest
+from src.process_data.store import PriceStore
+from src.profiling import profiled, record
+
+def read_ticker(path: str, fields: Sequence[str] = ('Adj Close',)) -> pd.DataFrame:
+    """
+    Read only the date and the requested price fields from a ticker CSV.
+
+    Args:
+        path (str): Path to the ticker CSV file.
+        fields (Sequence[str]): OHLCV fields to read. Default is ('Adj Close',).
+
+    Returns:
+        pd.DataFrame: Frame indexed by the 'Date' strings with one float column per field.
+    """
+    return pd.read_csv(path, usecols=['Date', *fields], index_col='Date',
+                       dtype={field: 'float64' for field in fields})
+
+
+@profiled("compile frames")
+def compile_frames(tickers: Sequence[str], fields: Sequence[str] = ('Adj Close',), n_jobs: int = 1,
+                   csv_dir: str = "data/stock_dfs") -> pd.DataFrame:
+    """
+    Align the requested fields of every ticker into one wide, date-indexed frame.
+
+    All frames are aligned in a single outer concat over the union of dates
+    rather than one join per ticker. With a single field the columns are the
+    ticker names; with several fields they are named `{field}_{ticker}`.
+
+    Args:
+        tickers (Sequence[str]): Tickers to compile, in column order.
+        fields (Sequence[str]): OHLCV fields to include. Default is ('Adj Close',).
+        n_jobs (int): Number of processes used to parse the CSV files. Default is 1.
+        csv_dir (str): Directory holding `{ticker}.csv` files.
+
+    Returns:
+        pd.DataFrame: Wide frame with a sorted 'Date' index.
+    """
+    fields = list(fields)
+    paths = [f"{csv_dir}/{ticker}.csv" for ticker in tickers]
+    record(bytes_read=sum(os.path.getsize(path) for path in paths), files_read=len(paths))
+
+    # Parse the CSV files, optionally spread across worker processes
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            frames = list(tqdm(pool.map(read_ticker, paths, [fields] * len(paths), chunksize=8),
+                               total=len(paths), desc="Compiling Data"))
+    else:
+        frames = [read_ticker(path, fields) for path in tqdm(paths, desc="Compiling Data")]
+
+    # Name each column after its ticker (and field when there are several)
+    for ticker, frame in zip(tickers, frames):
+        frame.columns = [ticker] if len(fields) == 1 else [f"{field}_{ticker}" for field in fields]
+
+    # Align every frame on the union of dates in one step
+    main_frame = pd.concat(frames, axis=1, join='outer', sort=True)
+    main_frame.index.name = 'Date'
+    if len(fields) > 1:
+        # Group columns by field, matching the order of `fields`
+        main_frame = main_frame[[f"{field}_{ticker}" for field in fields for ticker in tickers]]
+    return main_frame
+
+
+@profiled("compile")
+def compile_data(Tpath: str, Dpath: Optional[str], store_path: Optional[str] = None,
+                 fields: Sequence[str] = ('Adj Close',), n_jobs: int = 1,
+                 cache: Optional[StageCache] = None) -> Optional[PriceStore]:
     """
     Compile adjusted closing prices from multiple stock CSV files into a single DataFrame.
 
+    Only the 'Date' column and the requested fields are parsed, and all tickers
+    are aligned in one concat step (see `compile_frames`).
+
+    If `store_path` is given, the per-ticker CSVs are converted once into a
+    columnar `PriceStore` under `data/{store_path}` and the wide frame is read
+    back from it. Downstream stages can then open the store instead of parsing
+    any CSV again; pass `Dpath=None` to skip writing the joined CSV entirely.
+
+    With a `cache`, the joined frame is keyed by the content of the ticker list
+    and of every ticker CSV, the fields and this module's code. When none of
+    them changed, the frame is loaded from the cache, and the CSV is only
+    rewritten if the file on disk is missing or differs from the cached one.
+
     Args:
         Tpath (str): Path to the pickle file containing the list of tickers.
-        Dpath (str): Path to save the compiled CSV file.
+        Dpath (Optional[str]): Path to save the compiled CSV file, or None to skip it.
+        store_path (Optional[str]): Directory of the price store to build. Default is None.
+        fields (Sequence[str]): OHLCV fields to put in the wide panel. Default is ('Adj Close',).
+        n_jobs (int): Number of processes used to parse the CSV files. Default is 1.
+        cache (Optional[StageCache]): Stage cache for the joined frame. Default is None.
 
     Returns:
-        None
+        Optional[PriceStore]: The built store if `store_path` is given, else None.
+
+    Raises:
+        ValueError: If neither `Dpath` nor `store_path` is given, as nothing would be written.
     """
+    if Dpath is None and store_path is None:
+        raise ValueError("compile_data needs an output: a CSV path (Dpath), a store_path, or both")
+
     # Load the list of tickers from the pickle file
     with open(f"data/{Tpath}", 'rb') as f:
-        tickers = pickle.load(f)
-
-    # Initialize an empty DataFrame to store the compiled data
-    main_frame = pd.DataFrame()
-
-    # Loop through each ticker and process its corresponding CSV file
-    for ticker in tqdm(tickers, desc="Compiling Data"):
-        # Read the CSV file for the current ticker
-        frame = pd.read_csv(f"data/stock_dfs/{ticker}.csv")
-        frame.set_index('Date', inplace=True)  # Set the 'Date' column as the index
-
-        # Rename 'Adj Close' column to the ticker name
-        frame.rename(columns={'Adj Close': f'{ticker}'}, inplace=True)
+        tickers: List[str] = pickle.load(f)
 
-        # Drop unnecessary columns (e.g., Open, High, Low, Close, Volume)
-        frame.drop(columns=['Open', 'High', 'Low', 'Close', 'Volume'], axis=1, inplace=True)
+    if store_path is not None:
+        # Convert every ticker once and read the wide frame straight from the store
+        store = PriceStore.from_csvs(tickers, csv_dir="data/stock_dfs", root=f"data/{store_path}")
+        if Dpath is not None:
+            frames = [store.frame(field).add_prefix('' if len(fields) == 1 else f"{field}_")
+                      for field in fields]
+            main_frame = pd.concat(frames, axis=1)
+            main_frame.index = main_frame.index.strftime("%Y-%m-%d")
+            main_frame.to_csv(f'data/{Dpath}')
+            record(bytes_written=os.path.getsize(f'data/{Dpath}'))
+        return store
 
-        # Merge the current frame with the main DataFrame
-        if main_frame.empty:
-            main_frame = frame  # Assign directly if it's the first frame
-        else:
-            main_frame = main_frame.join(frame, how='outer')  # Join on the index (Date)
+    if cache is None:
+        main_frame = compile_frames(tickers, fields=fields, n_jobs=n_jobs)
+        csv_digest = None
+    else:
+        key = cache.key("compile", files=[f"data/{Tpath}"] + [f"data/stock_dfs/{ticker}.csv" for ticker in tickers],
+                        code=[__file__], params={"fields": list(fields)})
+        compiled = cache.get(key)
+        if compiled is None:
+            compiled = {"frame": compile_frames(tickers, fields=fields, n_jobs=n_jobs), "csv_digest": None}
+        main_frame, csv_digest = compiled["frame"], compiled["csv_digest"]
 
-    # Save the compiled data as a CSV file
-    main_frame.to_csv(f'data/{Dpath}')
+    # Save the compiled data as a CSV file, unless the identical file is already there
+    if csv_digest is None or not os.path.exists(f'data/{Dpath}') or file_digest(f'data/{Dpath}') != csv_digest:
+        main_frame.to_csv(f'data/{Dpath}')
+        record(bytes_written=os.path.getsize(f'data/{Dpath}'))
+        if cache is not None:
+            cache.put(key, {"frame": main_frame, "csv_digest": file_digest(f'data/{Dpath}')})
+    return None
 
-if __name__ == '__main__':pass
\ No newline at end of file
+if __name__ == '__main__':pass
@@ -0,0 +1,324 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import datetime
+import functools
+import threading
+import collections
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """
+    Peak resident set size of this process (or of its finished children) in MB.
+
+    `ru_maxrss` is in bytes on macOS and in kilobytes on Linux and the BSDs;
+    `resource` is POSIX-only, so the peak is NaN on Windows.
+    """
+    if sys.platform == "win32":
+        return float("nan")
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    return usage.ru_maxrss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+def describe(value) -> List[Dict]:
+    """
+    Shapes and in-memory bytes of the arrays and frames in a value (or a tuple/list of values).
+
+    Args:
+        value: Any stage input or output.
+
+    Returns:
+        List[Dict]: One {"type", "shape", "bytes"} entry per array-like found, in order.
+    """
+    values = value if isinstance(value, (tuple, list)) else (value,)
+    described = []
+    for v in values:
+        if isinstance(v, np.ndarray):
+            described.append({"type": "ndarray", "shape": list(v.shape), "bytes": int(v.nbytes)})
+        elif isinstance(v, (pd.DataFrame, pd.Series)):
+            described.append({"type": type(v).__name__, "shape": list(v.shape),
+                              "bytes": int(v.memory_usage(index=False, deep=False).sum()
+                                           if isinstance(v, pd.DataFrame) else v.memory_usage(index=False))})
+    return described
+
+
+class _Sampler:
+    """
+    Statistical profiler: samples the stack of one thread every `interval` seconds.
+
+    Stacks are counted in collapsed form ("file:func;file:func ..."), the input
+    format of flamegraph tools.
+    """
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="StageSampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """
+    Per-run stage instrumentation: wall time, CPU time, peak RSS, shapes and bytes of every stage.
+
+    Stages nest (each record keeps its parent and depth) and cost two clock
+    reads and two getrusage calls when they start and end, so the profiler can
+    stay enabled in production. Stages named in `profile` are additionally run
+    under cProfile ('cprofile') or a stack sampler ('sample'), and their
+    profiles are written to `report_dir`.
+
+    Per-stage totals cover the whole run; only the latest `max_records` stage
+    records are kept, so stages called in long-running loops stay bounded.
+
+    Attributes:
+        records (Deque[Dict]): Latest finished stages, in completion order.
+    """
+    def __init__(self, run_name: str = "run", enabled: bool = True, profile: Iterable[str] = (),
+                 profile_mode: str = "cprofile", report_dir: str = "logs/profiles", max_records: int = 10000) -> None:
+        """
+        Args:
+            run_name (str): Name of the run, used in report file names. Default is 'run'.
+            enabled (bool): Record stages at all. Default is True.
+            profile (Iterable[str]): Stage names to profile; '*' profiles every stage. Default is none.
+            profile_mode (str): 'cprofile' or 'sample'. Default is 'cprofile'.
+            report_dir (str): Directory of the JSON report and profiles. Default is 'logs/profiles'.
+            max_records (int): Stage records kept for the report. Default is 10000.
+        """
+        if profile_mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profile_mode {profile_mode!r}; use 'cprofile' or 'sample'")
+        self.run_name = run_name
+        self.enabled = enabled
+        self.profile = set(profile)
+        self.profile_mode = profile_mode
+        self.report_dir = report_dir
+        self.records: Deque[Dict] = collections.deque(maxlen=max_records)
+        self._totals: Dict[str, Dict] = {}
+        self.started = datetime.datetime.now()
+        self._t0 = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Dict]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _profiling(self, name: str) -> bool:
+        return "*" in self.profile or name in self.profile
+
+    @contextmanager
+    def stage(self, name: str, inputs=None, **info):
+        """
+        Context manager timing one stage.
+
+        The yielded record can be extended inside the block, e.g. with
+        `record["outputs"] = describe(result)` or byte counts; `record` (the
+        module function) does the same for the innermost open stage.
+
+        Args:
+            name (str): Stage name, e.g. 'compile' or 'tune'.
+            inputs: Arrays/frames consumed by the stage, described into the record.
+            **info: Extra fields stored in the record (ticker, rows, ...).
+        """
+        if not self.enabled:
+            yield {}
+            return
+        stack = self._stack()
+        rec = {"stage": name, "parent": stack[-1]["stage"] if stack else None, "depth": len(stack), **info}
+        if inputs is not None:
+            rec["inputs"] = describe(inputs)
+        stack.append(rec)
+
+        cprof = sampler = None
+        if self._profiling(name):
+            if self.profile_mode == "cprofile":
+                cprof = cProfile.Profile()
+                cprof.enable()
+            else:
+                sampler = _Sampler(threading.get_ident())
+                sampler.start()
+
+        rss_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        except BaseException as e:
+            rec["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            rec["wall_s"] = time.perf_counter() - wall
+            rec["cpu_s"] = time.process_time() - cpu
+            rec["start_s"] = wall - self._t0
+            rec["peak_rss_mb"] = peak_rss_mb()
+            rec["rss_growth_mb"] = rec["peak_rss_mb"] - rss_before  # Rise of the process high-water mark
+            if cprof is not None or sampler is not None:
+                rec["profile"] = self._save_profile(name, cprof, sampler)
+            stack.pop()
+            with self._lock:
+                self.records.append(rec)
+                totals = self._totals.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "top_level": 0.0,
+                                                        "peak_rss_mb": 0.0})
+                totals["calls"] += 1
+                totals["wall_s"] += rec["wall_s"]
+                totals["cpu_s"] += rec["cpu_s"]
+                totals["top_level"] += rec["wall_s"] if rec["depth"] == 0 else 0.0
+                totals["peak_rss_mb"] = max(totals["peak_rss_mb"], rec["peak_rss_mb"])
+
+    def _save_profile(self, name: str, cprof: Optional[cProfile.Profile], sampler: Optional[_Sampler]) -> str:
+        os.makedirs(self.report_dir, exist_ok=True)
+        calls = self._totals.get(name, {}).get("calls", 0)
+        stem = os.path.join(self.report_dir, f"{self.run_name}_{name.replace(' ', '_')}_{calls}")
+        if cprof is not None:
+            cprof.disable()
+            cprof.dump_stats(f"{stem}.prof")
+            return f"{stem}.prof"
+        sampler.stop()
+        sampler.save(f"{stem}.folded")
+        return f"{stem}.folded"
+
+    def current(self) -> Optional[Dict]:
+        """Record of the innermost open stage of this thread, if any."""
+        stack = self._stack() if self.enabled else []
+        return stack[-1] if stack else None
+
+    # ---------------------------------------------------------------------------------------------------------------
+    # Reports
+    def totals(self) -> pd.DataFrame:
+        """
+        Per stage name: calls, total wall and CPU seconds, share of the run's top-level wall time and peak RSS.
+        """
+        columns = ["calls", "wall_s", "cpu_s", "wall_pct", "peak_rss_mb"]
+        with self._lock:
+            totals = pd.DataFrame.from_dict(self._totals, orient="index")
+        if totals.empty:
+            return pd.DataFrame(columns=columns)
+        top_level = totals.pop("top_level").sum()
+        totals["wall_pct"] = 100 * totals["wall_s"] / top_level if top_level > 0 else np.nan
+        totals.index.name = "stage"
+        return totals[columns].sort_values("wall_s", ascending=False)
+
+    def report(self) -> Dict:
+        """JSON-serialisable report of the run: every stage record plus the per-stage totals."""
+        totals = self.totals()
+        return {"run": self.run_name, "started": self.started.isoformat(timespec="seconds"),
+                "wall_s": time.perf_counter() - self._t0, "peak_rss_mb": peak_rss_mb(),
+                "stages": list(self.records),
+                "totals": json.loads(totals.to_json(orient="index")) if len(totals) else {}}
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Write the JSON report (default `{report_dir}/{run_name}_{timestamp}.json`) and return its path.
+        """
+        if path is None:
+            path = os.path.join(self.report_dir, f"{self.run_name}_{self.started.strftime('%Y%m%d-%H%M%S')}.json")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        return path
+
+    def summary(self) -> str:
+        """Per-stage totals as a fixed-width table."""
+        return self.totals().to_string(float_format=lambda v: f"{v:.3f}")
+
+    def log_summary(self, logger, pipeline_name: str = "profile") -> None:
+        """
+        Write the summary table line by line through a `utils.Logger`.
+        """
+        for line in self.summary().splitlines():
+            logger.log(line, "INFO", pipeline_name)
+
+    def reset(self) -> None:
+        """Drop the records and totals and restart the run clock."""
+        self.records.clear()
+        self._totals = {}
+        self.started = datetime.datetime.now()
+        self._t0 = time.perf_counter()
+
+
+# -------------------------------------------------------------------------------------------------------------------
+# Process-wide profiler the pipeline stages report into
+profiler = Profiler()
+
+
+def configure(**params) -> Profiler:
+    """
+    Replace the process-wide profiler, e.g. with `configure(**config["profiling_params"])`.
+
+    Stages decorated with `profiled` report into the new profiler from then on.
+    """
+    global profiler
+    profiler = Profiler(**params)
+    return profiler
+
+
+@contextmanager
+def stage(name: str, inputs=None, **info):
+    """Time a block as a stage of the process-wide profiler (see `Profiler.stage`)."""
+    with profiler.stage(name, inputs=inputs, **info) as rec:
+        yield rec
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """
+    Decorator reporting every call of a function as a stage of the process-wide profiler.
+
+    The profiler is looked up at call time, so `configure` also applies to
+    functions decorated at import.
+    """
+    def decorator(fn: Callable) -> Callable:
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            with profiler.stage(stage_name, inputs=(*args, *kwargs.values())) as rec:
+                result = fn(*args, **kwargs)
+                rec["outputs"] = describe(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def record(**fields) -> None:
+    """Add fields (e.g. bytes_read, bytes_written, rows) to the innermost open stage, if any."""
+    rec = profiler.current()
+    if rec is not None:
+        for key, value in fields.items():
+            if key.startswith("bytes_"):
+                rec[key] = rec.get(key, 0) + value  # Byte counts accumulate over the stage
+            else:
+                rec[key] = value
+
+
+if __name__ == '__main__':pass
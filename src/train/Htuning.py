@@ -1,21 +1,31 @@
-from sklearn.model_selection import RandomizedSearchCV
 from sklearn.ensemble import VotingClassifier
-from sklearn.base import BaseEstimator
+from sklearn.base import BaseEstimator, clone
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
+import copy
 import numpy as np
 from tqdm import tqdm
 
+from src.train.cv import WalkForwardCV, FoldCache
+from src.train.search import ParallelSearch, _fit
+from src.train.trials import TrialStore, fingerprint
+from src.process_data.scaler import PreprocessingPipeline
+from src.profiling import profiled
+
 
 class Htuner:
     """
-    A hyperparameter tuning utility for multiple classifiers using RandomizedSearchCV.
+    A hyperparameter tuning utility for multiple classifiers using a parallel, multi-fidelity search.
     
     Attributes:
         classifier_lists (List[BaseEstimator]): List of classifiers to be tuned.
         classifier_parms_lists (List[Dict]): List of parameter grids for the classifiers.
         best_params (Dict): Dictionary storing the best hyperparameters for each classifier.
         tuned_clf (Dict): Dictionary storing the best tuned classifiers.
+        cv_results (Dict): Per classifier, the evaluated candidates with their fold scores.
+        report (List[Dict]): Per classifier, wall-clock time, CPU time, evaluations and best score.
+        preprocessing (Optional[PreprocessingPipeline]): Pipeline fitted on the full data when
+            tuning was run with preprocessing; the tuned classifiers expect its output.
     """
     def __init__(self, clf_l: List[BaseEstimator], Pcls_l: List[Dict]) -> None:
         """
@@ -29,32 +39,70 @@ class Htuner:
         self.classifier_parms_lists = Pcls_l
         self.best_params = {}
         self.tuned_clf = {}
+        self.cv_results = {}
+        self.report = []
+        self.preprocessing = None
 
-    def tune(self, price: np.ndarray, action: np.ndarray, cv: int = 5, scoring: str = "accuracy", 
-             n_iter: int = 10, random_state: int = 42) -> None:
+    @profiled("tune")
+    def tune(self, price: np.ndarray, action: np.ndarray, cv: Union[int, WalkForwardCV] = 5,
+             scoring: str = "accuracy", n_iter: Optional[int] = 10, random_state: int = 42,
+             preprocessing: Optional[PreprocessingPipeline] = None, n_jobs: int = 1,
+             resource: Optional[str] = None, factor: int = 3,
+             early_stopping_rounds: Optional[int] = None, store: Optional[TrialStore] = None,
+             warm_start: int = 5) -> None:
         """
-        Perform hyperparameter tuning for each classifier using RandomizedSearchCV.
-        
+        Perform hyperparameter tuning for all classifiers with walk-forward cross-validation.
+
+        The folds are built once (`FoldCache`); with `preprocessing`, `price` holds
+        raw features and the pipeline is fitted per fold on that fold's training
+        rows. Candidates of every classifier are then scored by `ParallelSearch`
+        on `n_jobs` worker processes, optionally with successive halving over
+        `resource`, and the best candidates are refitted on all rows (with the
+        same native early stopping and held-out tail as in the search).
+
+        With a `store`, trials already run on the same data (fingerprinted with
+        the preprocessing settings), CV scheme and scoring are reused instead of
+        refitted, and the best parameter sets of earlier runs, e.g. of other
+        tickers, lead the sampled candidates.
+
         Args:
-            price (np.ndarray): Feature dataset.
+            price (np.ndarray): Feature dataset, in chronological order.
             action (np.ndarray): Target labels.
-            cv (int): Number of cross-validation folds. Default is 5.
+            cv (Union[int, WalkForwardCV]): Splitter, or a number of expanding walk-forward folds. Default is 5.
             scoring (str): Scoring metric for evaluation. Default is "accuracy".
-            n_iter (int): Number of parameter settings sampled. Default is 10.
+            n_iter (Optional[int]): Parameter settings sampled per classifier; None searches the full grid. Default is 10.
             random_state (int): Random seed for reproducibility. Default is 42.
+            preprocessing (Optional[PreprocessingPipeline]): Unfitted pipeline applied per fold.
+            n_jobs (int): Core budget of the search; -1 uses every core. Default is 1.
+            resource (Optional[str]): Successive-halving resource, 'n_estimators' or 'n_samples'. Default is None.
+            factor (int): Halving factor between rungs. Default is 3.
+            early_stopping_rounds (Optional[int]): Native early stopping patience for boosted models.
+            store (Optional[TrialStore]): Persistent trial store. Default is None.
+            warm_start (int): Previous best parameter sets seeding each classifier when a store is given. Default is 5.
         """
-        # Iterate over classifiers and their parameter grids
-        for clf, params in tqdm(zip(self.classifier_lists, self.classifier_parms_lists), 
-                                total=len(self.classifier_lists), 
-                                desc="Tuning classifiers"):
-            # Perform RandomizedSearchCV for each classifier
-            rscv = RandomizedSearchCV(clf, params, cv=cv, scoring=scoring,
-                                      n_iter=n_iter, random_state=random_state)
-            rscv.fit(price, action)
-            
-            # Store the best parameters and the tuned classifier
-            self.best_params[f'{clf.__class__.__name__}'] = rscv.best_params_
-            self.tuned_clf[f'{clf.__class__.__name__}'] = rscv.best_estimator_
+        # A plain integer would mean KFold-style splits that train on the future
+        if isinstance(cv, int):
+            cv = WalkForwardCV(n_splits=cv)
+
+        cache = FoldCache(price, action, cv, preprocessing)
+        search = ParallelSearch(n_jobs=n_jobs, resource=resource, factor=factor,
+                                early_stopping_rounds=early_stopping_rounds)
+        classifiers = [(f'{clf.__class__.__name__}', clf, params)
+                       for clf, params in zip(self.classifier_lists, self.classifier_parms_lists)]
+        data_fp = fingerprint(price, action, preprocessing) if store is not None else None
+        self.cv_results = search.run(classifiers, cache, scoring=scoring, n_iter=n_iter, random_state=random_state,
+                                     store=store, data_fp=data_fp, warm_start=warm_start)
+        self.report = search.report
+
+        # Refit the pipeline and the best candidates on all rows, with the early stopping they were scored with
+        features = price
+        if preprocessing is not None:
+            self.preprocessing = copy.deepcopy(preprocessing).fit(price)
+            features = self.preprocessing.transform(price)
+        for name, clf, _ in tqdm(classifiers, desc="Refitting classifiers"):
+            self.best_params[name] = ParallelSearch.best(self.cv_results[name])
+            self.tuned_clf[name] = _fit(clone(clf).set_params(**self.best_params[name]), features, action,
+                                        early_stopping_rounds)
 
     def get_params(self) -> Dict:
         """
@@ -0,0 +1,244 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence, Union
+
+from src.process_data.labels import BUY, SELL
+from src.profiling import profiled
+
+Array = Union[np.ndarray, pd.DataFrame, pd.Series]
+
+
+def _values(x: Array) -> np.ndarray:
+    """Plain float array of a price/action input (time on axis 0)."""
+    return np.asarray(x.to_numpy() if isinstance(x, (pd.DataFrame, pd.Series)) else x, dtype=np.float64)
+
+
+def positions_from_actions(actions: Array, allow_short: bool = False) -> np.ndarray:
+    """
+    Positions implied by a buy/sell/hold action series, without path-dependent rules.
+
+    Like the bot's `is_buying` state machine, a buy (1) opens a long position
+    that is kept through holds (0) until a sell (2). A sell closes the position,
+    or opens a short one with `allow_short`. Works on any array with time on
+    axis 0, e.g. (n_bars, n_tickers, n_param_sets), with one forward fill.
+
+    Args:
+        actions (Array): Action codes, time on axis 0.
+        allow_short (bool): Sell goes short (-1) instead of flat (0). Default is False.
+
+    Returns:
+        np.ndarray: Position after each bar's close, in {-1, 0, 1}.
+    """
+    actions = _values(actions)
+    target = np.where(actions == BUY, 1.0, np.where(actions == SELL, -1.0 if allow_short else 0.0, np.nan))
+
+    # Forward-fill the last signal along time: index of the latest bar that set a target
+    index = np.where(np.isnan(target), 0, np.arange(len(target)).reshape(-1, *([1] * (target.ndim - 1))))
+    np.maximum.accumulate(index, axis=0, out=index)
+    positions = np.take_along_axis(target, index, axis=0)
+    return np.nan_to_num(positions, nan=0.0)
+
+
+def event_positions(prices: Array, actions: Array, allow_short: bool = False, min_hold: int = 0,
+                    stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> np.ndarray:
+    """
+    Positions under path-dependent rules, stepping through the bars once.
+
+    Each step is vectorized across every ticker and parameter set, so the loop
+    runs over bars only.
+
+    Rules:
+        min_hold    - an open position cannot be closed or flipped by a signal before `min_hold` bars
+        stop_loss   - close when the position's return since entry falls to -stop_loss
+        take_profit - close when the position's return since entry reaches take_profit
+
+    Args:
+        prices (Array): Closing prices, time on axis 0.
+        actions (Array): Action codes, broadcastable against `prices`.
+        allow_short (bool): Sell goes short (-1) instead of flat (0). Default is False.
+        min_hold (int): Minimum bars in a position. Default is 0.
+        stop_loss (Optional[float]): Stop-loss return, e.g. 0.05. Default is None.
+        take_profit (Optional[float]): Take-profit return, e.g. 0.1. Default is None.
+
+    Returns:
+        np.ndarray: Position after each bar's close, in {-1, 0, 1}.
+    """
+    prices, actions = np.broadcast_arrays(_values(prices), _values(actions))
+    positions = np.empty(prices.shape)
+    position = np.zeros(prices.shape[1:])
+    entry = np.full(prices.shape[1:], np.nan)
+    held = np.zeros(prices.shape[1:], dtype=np.int64)
+    short = -1.0 if allow_short else 0.0
+
+    for t in range(len(prices)):
+        price, action = prices[t], actions[t]
+        held += position != 0
+        with np.errstate(invalid="ignore"):
+            pnl = position * (price / entry - 1.0)
+        forced = np.zeros(position.shape, dtype=bool)
+        if stop_loss is not None:
+            forced |= pnl <= -stop_loss
+        if take_profit is not None:
+            forced |= pnl >= take_profit
+
+        target = np.where(action == BUY, 1.0, np.where(action == SELL, short, position))
+        allowed = (position == 0) | (held >= min_hold)
+        new = np.where(forced, 0.0, np.where(allowed, target, position))
+
+        changed = new != position
+        entry = np.where(changed, np.where(new != 0, price, np.nan), entry)
+        held = np.where(changed, 0, held)
+        position = new
+        positions[t] = position
+    return positions
+
+
+class BacktestResult:
+    """
+    Per-bar returns and positions of a backtest, with equity, drawdown and summary statistics.
+
+    Arrays have time on axis 0; the remaining axes are the backtested series
+    (tickers, parameter sets, ...), which `stats` flattens into rows.
+    """
+    def __init__(self, returns: np.ndarray, positions: np.ndarray, index: Optional[pd.Index] = None,
+                 names: Optional[Sequence] = None, periods_per_year: int = 252) -> None:
+        """
+        Args:
+            returns (np.ndarray): Net strategy return of each bar.
+            positions (np.ndarray): Position after each bar's close.
+            index (Optional[pd.Index]): Bar dates. Default is a range.
+            names (Optional[Sequence]): One label per series (flattened trailing axes). Default is the position.
+            periods_per_year (int): Bars per year for annualisation. Default is 252.
+        """
+        self.returns = returns
+        self.positions = positions
+        self.index = index if index is not None else pd.RangeIndex(len(returns))
+        self.names = list(names) if names is not None else None
+        self.periods_per_year = periods_per_year
+
+    @property
+    def equity(self) -> np.ndarray:
+        """Compounded equity curve, starting from 1."""
+        return np.cumprod(1.0 + self.returns, axis=0)
+
+    @property
+    def drawdown(self) -> np.ndarray:
+        """Fractional drawdown from the running equity peak (<= 0)."""
+        equity = self.equity
+        return equity / np.maximum.accumulate(equity, axis=0) - 1.0
+
+    def stats(self) -> pd.DataFrame:
+        """
+        Summary statistics per series.
+
+        Returns:
+            pd.DataFrame: total_return, cagr, sharpe, max_drawdown, turnover (annualised
+            position change), trades and exposure, one row per series.
+        """
+        n_bars = len(self.returns)
+        returns = self.returns.reshape(n_bars, -1)
+        positions = self.positions.reshape(n_bars, -1)
+        equity = np.cumprod(1.0 + returns, axis=0)
+        drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1.0
+        changes = np.abs(np.diff(positions, axis=0, prepend=0.0))
+        years = n_bars / self.periods_per_year
+
+        std = returns.std(axis=0, ddof=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = np.where(std > 0, returns.mean(axis=0) / std * np.sqrt(self.periods_per_year), np.nan)
+            cagr = equity[-1] ** (1.0 / years) - 1.0
+        return pd.DataFrame({
+            "total_return": equity[-1] - 1.0,
+            "cagr": cagr,
+            "sharpe": sharpe,
+            "max_drawdown": drawdown.min(axis=0),
+            "turnover": changes.sum(axis=0) / years,
+            "trades": (changes > 0).sum(axis=0),
+            "exposure": (positions != 0).mean(axis=0),
+        }, index=self._series_index())
+
+    def _series_index(self) -> pd.Index:
+        """Labels of the flattened series: the given names, else their positions on the trailing axes."""
+        names = self.names if self.names is not None else [
+            "_".join(map(str, idx)) for idx in np.ndindex(*self.returns.shape[1:])] or ["series"]
+        return pd.Index(names, name="series")
+
+    def equity_frame(self) -> pd.DataFrame:
+        """Equity curves as a date-indexed frame, one column per series."""
+        return pd.DataFrame(self.equity.reshape(len(self.returns), -1), index=self.index,
+                            columns=self._series_index())
+
+    def save(self, path: str) -> None:
+        """
+        Write the summary statistics, e.g. to `evaluation_params.backtesting_results_path`.
+
+        Args:
+            path (str): Destination CSV file.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.stats().to_csv(path)
+
+
+@profiled("backtest")
+def backtest(prices: Array, actions: Array, cost: Union[float, np.ndarray] = 0.001,
+             slippage: Union[float, np.ndarray] = 0.0, allow_short: bool = False, min_hold: int = 0,
+             stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+             periods_per_year: int = 252, names: Optional[Sequence] = None) -> BacktestResult:
+    """
+    Backtest buy/sell/hold actions on prices for many tickers and parameter sets at once.
+
+    A position set at bar t's close earns the return from t to t+1; every change
+    of position pays `cost + slippage` per unit traded. Prices and actions
+    broadcast against each other with time on axis 0, and array costs broadcast
+    against their trailing axes, e.g. prices (n_bars, n_tickers, 1) with
+    actions (n_bars, n_tickers, 1) and cost of shape (n_costs,) backtests every
+    ticker at every cost level in one pass. Without path-dependent
+    rules the positions are a single forward fill; with `min_hold`,
+    `stop_loss` or `take_profit` they come from `event_positions`.
+
+    Args:
+        prices (Array): Closing prices, time on axis 0 (DataFrame columns name the series).
+        actions (Array): Action codes 0 (hold), 1 (buy), 2 (sell).
+        cost (Union[float, np.ndarray]): Fee per unit of position traded. Default is 0.001 (10 bps).
+        slippage (Union[float, np.ndarray]): Slippage per unit of position traded. Default is 0.0.
+        allow_short (bool): Sell goes short instead of flat. Default is False.
+        min_hold (int): Minimum bars in a position. Default is 0.
+        stop_loss (Optional[float]): Stop-loss return. Default is None.
+        take_profit (Optional[float]): Take-profit return. Default is None.
+        periods_per_year (int): Bars per year for annualisation. Default is 252.
+        names (Optional[Sequence]): Labels of the flattened series. Default is the DataFrame columns when they match.
+
+    Returns:
+        BacktestResult: Returns, positions, equity, drawdown and statistics.
+    """
+    index = prices.index if isinstance(prices, (pd.DataFrame, pd.Series)) else None
+    if names is None and isinstance(actions, pd.DataFrame):
+        names = list(actions.columns)
+    elif names is None and isinstance(prices, pd.DataFrame):
+        names = list(prices.columns)
+    price_values = _values(prices)
+
+    if min_hold or stop_loss is not None or take_profit is not None:
+        positions = event_positions(price_values, actions, allow_short, min_hold, stop_loss, take_profit)
+    else:
+        positions = positions_from_actions(actions, allow_short)
+
+    # Bar returns, zero where the price is missing (e.g. before listing)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bar_returns = np.diff(price_values, axis=0, prepend=np.nan) / np.roll(price_values, 1, axis=0)
+    bar_returns = np.nan_to_num(bar_returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    held = np.concatenate([np.zeros_like(positions[:1]), positions[:-1]], axis=0)
+    traded = np.abs(positions - held)
+    costs = np.asarray(cost, dtype=np.float64) + np.asarray(slippage, dtype=np.float64)
+    returns = held * bar_returns - costs * traded
+    positions = np.broadcast_to(positions, returns.shape)
+
+    if names is not None and len(names) != int(np.prod(returns.shape[1:])):
+        names = None
+    return BacktestResult(returns, positions, index=index, names=names, periods_per_year=periods_per_year)
+
+
+if __name__ == '__main__':pass
@@ -0,0 +1,122 @@
+import copy
+import numpy as np
+from typing import Iterator, List, Optional, Tuple
+
+from src.process_data.scaler import PreprocessingPipeline
+
+
+class WalkForwardCV:
+    """
+    Walk-forward cross-validation splitter for time-ordered samples.
+
+    The last `n_splits * test_size` samples are cut into consecutive test
+    blocks, and every fold trains only on samples that come before its test
+    block, so no fold ever sees the future. Works anywhere sklearn accepts a
+    `cv` splitter.
+
+    Modes:
+        'expanding' - train on everything before the test block
+        'rolling'   - train on the last `train_size` samples before the test block
+
+    Gaps:
+        purge   - samples dropped from the end of the training window, e.g. the
+                  label horizon, so training labels never overlap the test block
+        embargo - samples skipped at the start of each test block, so the
+                  scores are not inflated by serial correlation with the end of
+                  training
+    """
+    def __init__(self, n_splits: int = 5, mode: str = "expanding", train_size: Optional[int] = None,
+                 test_size: Optional[int] = None, purge: int = 0, embargo: int = 0) -> None:
+        """
+        Args:
+            n_splits (int): Number of folds. Default is 5.
+            mode (str): 'expanding' or 'rolling'. Default is 'expanding'.
+            train_size (Optional[int]): Training window length in 'rolling' mode.
+            test_size (Optional[int]): Samples per test block. Default is n_samples // (n_splits + 1).
+            purge (int): Samples removed between the training window and the test block. Default is 0.
+            embargo (int): Samples skipped at the start of each test block. Default is 0.
+        """
+        if mode not in ("expanding", "rolling"):
+            raise ValueError(f"Unknown mode {mode!r}, expected 'expanding' or 'rolling'")
+        if mode == "rolling" and not train_size:
+            raise ValueError("train_size is required in 'rolling' mode")
+        self.n_splits = n_splits
+        self.mode = mode
+        self.train_size = train_size
+        self.test_size = test_size
+        self.purge = purge
+        self.embargo = embargo
+
+    def __repr__(self) -> str:
+        return (f"WalkForwardCV(n_splits={self.n_splits}, mode={self.mode!r}, train_size={self.train_size}, "
+                f"test_size={self.test_size}, purge={self.purge}, embargo={self.embargo})")
+
+    def get_n_splits(self, X=None, y=None, groups=None) -> int:
+        """Number of folds."""
+        return self.n_splits
+
+    def split(self, X, y=None, groups=None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Generate train/test indices for each fold, oldest fold first.
+
+        Args:
+            X: Samples in chronological order.
+            y: Ignored, present for sklearn compatibility.
+            groups: Ignored, present for sklearn compatibility.
+
+        Yields:
+            Tuple[np.ndarray, np.ndarray]: Training and test indices.
+        """
+        n_samples = len(X)
+        test_size = self.test_size or n_samples // (self.n_splits + 1)
+        first_test = n_samples - self.n_splits * test_size
+        if test_size <= self.embargo or first_test - self.purge <= 0:
+            raise ValueError(f"Not enough samples ({n_samples}) for {self!r}")
+
+        for fold in range(self.n_splits):
+            test_start = first_test + fold * test_size
+            train_end = test_start - self.purge
+            train_start = 0 if self.mode == "expanding" else max(0, train_end - self.train_size)
+            yield (np.arange(train_start, train_end),
+                   np.arange(test_start + self.embargo, test_start + test_size))
+
+
+class FoldCache:
+    """
+    Preprocessed train/test arrays of every CV fold, computed once.
+
+    Each fold fits its own copy of the preprocessing pipeline on the fold's
+    training rows only, so there is no leakage. The transformed folds are then
+    reused by every hyperparameter candidate instead of being recomputed per
+    candidate.
+    """
+    def __init__(self, X: np.ndarray, y: np.ndarray, cv: WalkForwardCV,
+                 preprocessing: Optional[PreprocessingPipeline] = None) -> None:
+        """
+        Args:
+            X (np.ndarray): Raw features in chronological order.
+            y (np.ndarray): Targets.
+            cv (WalkForwardCV): Splitter defining the folds.
+            preprocessing (Optional[PreprocessingPipeline]): Unfitted template, copied per fold.
+        """
+        self.cv = cv
+        self.preprocessing = preprocessing
+        self.folds: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        self.pipelines: List[PreprocessingPipeline] = []
+        for train_idx, test_idx in cv.split(X, y):
+            X_train, X_test = X[train_idx], X[test_idx]
+            if preprocessing is not None:
+                pipeline = copy.deepcopy(preprocessing)
+                X_train = pipeline.fit_transform(X_train)
+                X_test = pipeline.transform(X_test)
+                self.pipelines.append(pipeline)
+            self.folds.append((X_train, y[train_idx], X_test, y[test_idx]))
+
+    def __len__(self) -> int:
+        return len(self.folds)
+
+    def __iter__(self):
+        return iter(self.folds)
+
+
+if __name__ == '__main__':pass
@@ -1,71 +1,354 @@
+import os
+import re
+import html
+import json
 import numpy as np
-from typing import Dict
-import matplotlib.pyplot as plt
-from sklearn.metrics import confusion_matrix, roc_curve, auc
-from sklearn.metrics import f1_score, precision_score, recall_score
-import seaborn as sns
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.profiling import profiled
+
+_LOGGER = None  # Module logger, created on first use
+
+
+def _logger():
+    """The evaluation `utils.Logger` (logs/evaluation_{date}.log)."""
+    global _LOGGER
+    if _LOGGER is None:
+        from src.utils import Logger
+        _LOGGER = Logger(log_file_name="evaluation")
+    return _LOGGER
+
+
+def _use_agg() -> None:
+    """Select the non-interactive Agg backend in a ReportGenerator rendering worker."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def confusion(y_true: np.ndarray, y_pred: np.ndarray,
+              labels: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Confusion matrix from a single bincount over the (true, predicted) pairs.
+
+    Parameters:
+    - y_true: Array-like of integer class ids
+    - y_pred: Array-like of predicted class ids
+    - labels: Class ids in matrix order; default is every id seen in either array
+
+    Returns:
+    - (cm, labels): cm[i, j] counts samples of class labels[i] predicted as labels[j]
+    """
+    y_true, y_pred = np.asarray(y_true).astype(np.int64), np.asarray(y_pred).astype(np.int64)
+    if labels is None:
+        n = int(max(y_true.max(initial=0), y_pred.max(initial=0))) + 1
+        cm = np.bincount(y_true * n + y_pred, minlength=n * n).reshape(n, n)
+        present = (cm.sum(axis=0) + cm.sum(axis=1)) > 0
+        return cm[np.ix_(present, present)], np.flatnonzero(present)
+    labels = np.asarray(labels)
+    lookup = np.full(int(max(labels.max(), y_true.max(initial=0), y_pred.max(initial=0))) + 1, len(labels))
+    lookup[labels] = np.arange(len(labels))
+    n = len(labels) + 1  # Last row/column collects ids outside `labels`
+    cm = np.bincount(lookup[y_true] * n + lookup[y_pred], minlength=n * n).reshape(n, n)
+    return cm[:-1, :-1], labels
+
+
+def metrics_from_confusion(cm: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Accuracy plus per-class and support-weighted precision, recall and F1 of a confusion matrix.
+
+    Undefined ratios (no predictions or no samples of a class) count as 0,
+    like sklearn's default `zero_division`.
+    """
+    cm = cm.astype(np.float64)
+    tp, predicted, support = np.diag(cm), cm.sum(axis=0), cm.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    weights = support / support.sum() if support.sum() > 0 else support
+    return {
+        "accuracy": tp.sum() / cm.sum() if cm.sum() > 0 else 0.0,
+        "f1_score": float(weights @ f1),
+        "precision": float(weights @ precision),
+        "recall": float(weights @ recall),
+        "class_precision": precision, "class_recall": recall, "class_f1": f1, "support": support,
+    }
+
+
+def roc_ovr(y_true: np.ndarray, scores: np.ndarray, labels: Sequence[int]) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    One-vs-rest ROC curve and AUC for every class.
+
+    All class columns are sorted in one argsort; each curve then comes from
+    cumulative true/false positive counts at the distinct score thresholds.
+
+    Parameters:
+    - y_true: Array-like of class ids
+    - scores: (n_samples, n_classes) class probabilities or decision scores, columns in `labels` order
+    - labels: Class ids of the score columns
+
+    Returns:
+    - Dict of class id -> {"fpr", "tpr", "auc"}; auc is NaN when the class is absent or always present
+    """
+    y_true, scores = np.asarray(y_true), np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, axis=0, kind="stable")
+    curves = {}
+    for k, label in enumerate(labels):
+        sorted_scores = scores[order[:, k], k]
+        positives = (y_true[order[:, k]] == label)
+        # Last index of each run of equal scores
+        ends = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+        tps = np.cumsum(positives)[ends]
+        fps = (ends + 1) - tps
+        n_pos, n_neg = tps[-1], fps[-1]
+        if n_pos == 0 or n_neg == 0:
+            curves[label] = {"fpr": np.array([0.0, 1.0]), "tpr": np.array([0.0, 1.0]), "auc": np.nan}
+            continue
+        fpr, tpr = np.r_[0.0, fps / n_neg], np.r_[0.0, tps / n_pos]
+        curves[label] = {"fpr": fpr, "tpr": tpr, "auc": float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)}
+    return curves
+
 
 def plot_confusion_matrix(y_true:np.ndarray, y_pred:np.ndarray, class_names:Dict, Cpath:str) -> None:
     """
     Plots a confusion matrix using the true labels and predicted labels.
-    
+
     Parameters:
     - y_true: Array-like, true labels
     - y_pred: Array-like, predicted labels
     - class_names: List of class names for labeling the axes
-    
+    - Cpath: Path to save the figure
+
     Returns:
     - None
     """
+    from matplotlib.figure import Figure
+    import seaborn as sns
+
     # Generate confusion matrix
-    cm = confusion_matrix(y_true, y_pred)
-    
-    # Plot confusion matrix using seaborn heatmap
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(cm, annot=True, fmt="d", cmap="Blues", xticklabels=class_names, yticklabels=class_names)
-    
-    plt.xlabel('Predicted')
-    plt.ylabel('True')
-    plt.title('Confusion Matrix')
-    plt.savefig(Cpath)
-    plt.show()
-
-def plot_roc_curve(y_true:np.ndarray, y_pred_prob:np.ndarray, Rpath:str) -> None:
+    cm, _ = confusion(y_true, y_pred)
+
+    # Plot confusion matrix using seaborn heatmap on a bare Figure (no pyplot state or backend switch)
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    sns.heatmap(cm, annot=True, fmt="d", cmap="Blues", xticklabels=class_names, yticklabels=class_names, ax=ax)
+
+    ax.set_xlabel('Predicted')
+    ax.set_ylabel('True')
+    ax.set_title('Confusion Matrix')
+    fig.savefig(Cpath)
+
+def plot_roc_curve(y_true:np.ndarray, y_pred_prob:np.ndarray, Rpath:str,
+                   labels: Optional[Sequence[int]] = None) -> None:
     """
-    Plots the ROC curve and saves the figure to the specified path.
-    
+    Plots the ROC curve(s) and saves the figure to the specified path.
+
     Parameters:
     y_true (array-like): True labels.
-    y_pred_prob (array-like): Predicted probabilities (e.g., from a classifier's predict_proba method).
-    save_path (str): Path to save the ROC curve plot.
+    y_pred_prob (array-like): Predicted probabilities (e.g., from a classifier's predict_proba method);
+        a single score vector for a binary problem, or one column per class for one-vs-rest curves.
+    Rpath (str): Path to save the ROC curve plot.
+    labels (Sequence[int]): Class ids of the probability columns. Default is the sorted ids in y_true.
     """
-    # Compute the ROC curve and AUC
-    fpr, tpr, thresholds = roc_curve(y_true, y_pred_prob)
-    roc_auc = auc(fpr, tpr)
-
-    # Plotting the ROC curve
-    plt.figure()
-    plt.plot(fpr, tpr, color='blue', lw=2, label=f'ROC curve (area = {roc_auc:.2f})')
-    plt.plot([0, 1], [0, 1], color='gray', linestyle='--')  # Diagonal line
-    plt.xlabel('False Positive Rate')
-    plt.ylabel('True Positive Rate')
-    plt.title('Receiver Operating Characteristic')
-    plt.legend(loc='lower right')
-    
+    from matplotlib.figure import Figure
+
+    y_pred_prob = np.asarray(y_pred_prob)
+    if y_pred_prob.ndim == 1:
+        # Binary: the scores are for the larger class id
+        positive = np.max(y_true)
+        curves = roc_ovr(np.asarray(y_true) == positive, y_pred_prob[:, None], [True])
+        curves = {positive: curves[True]}
+    else:
+        labels = np.unique(y_true) if labels is None else labels
+        curves = roc_ovr(y_true, y_pred_prob, labels)
+
+    # Plotting the ROC curve on a bare Figure, freed with it (no pyplot figure to close)
+    fig = Figure()
+    ax = fig.subplots()
+    for label, curve in curves.items():
+        ax.plot(curve["fpr"], curve["tpr"], lw=2, label=f'class {label} (area = {curve["auc"]:.2f})')
+    ax.plot([0, 1], [0, 1], color='gray', linestyle='--')  # Diagonal line
+    ax.set_xlabel('False Positive Rate')
+    ax.set_ylabel('True Positive Rate')
+    ax.set_title('Receiver Operating Characteristic')
+    ax.legend(loc='lower right')
+
     # Save the plot to the specified path
-    plt.savefig(Rpath)
-    plt.close()  # Close the plot to avoid displaying it inline
-    print(f"ROC curve saved to {Rpath}")
+    fig.savefig(Rpath)
+    _logger().log(f"ROC curve saved to {Rpath}", "INFO", "evaluation")
 
+@profiled("evaluate")
 def evaluate_model(y_true, y_pred) -> Dict[str, float]:
-    """Evaluate the model using multiple metrics."""
-    return {
-        "accuracy": np.mean(y_true == y_pred),
-        "f1_score": f1_score(y_true, y_pred, average="weighted"),
-        "precision": precision_score(y_true, y_pred, average="weighted"),
-        "recall": recall_score(y_true, y_pred, average="weighted"),
-    }
+    """Evaluate the model using multiple metrics, all from one confusion matrix."""
+    metrics = metrics_from_confusion(confusion(y_true, y_pred)[0])
+    return {key: metrics[key] for key in ("accuracy", "f1_score", "precision", "recall")}
+
+# -------------------------------------------------------------------------------------------------------------------
+# Batched report over many tickers/models
+def _render(task: Dict, max_points: int = 200) -> str:
+    """
+    Draw the confusion matrix and one-vs-rest ROC curves of one model into a single PNG.
+
+    Uses a bare `Figure` (Agg canvas, no pyplot figure manager) with a fixed
+    layout, and thins each ROC curve to `max_points` vertices: tight_layout and
+    drawing thousands of ROC vertices dominated the render time.
+    """
+    from matplotlib.figure import Figure
+
+    names = task["class_names"]
+    fig = Figure(figsize=(11 if task["curves"] else 5.5, 4.5))
+    fig.subplots_adjust(left=0.08 if task["curves"] else 0.16, right=0.97, bottom=0.12, top=0.92, wspace=0.3)
+    axes = fig.subplots(1, 2 if task["curves"] else 1, squeeze=False)
+    ax = axes[0, 0]
+    cm = task["cm"]
+    ax.imshow(cm, cmap="Blues")
+    for (i, j), count in np.ndenumerate(cm):
+        ax.text(j, i, str(count), ha="center", va="center", color="white" if count > cm.max() / 2 else "black")
+    ax.set_xticks(range(len(names)), names)
+    ax.set_yticks(range(len(names)), names)
+    ax.set_xlabel("Predicted")
+    ax.set_ylabel("True")
+    ax.set_title(f"{task['name']}: confusion matrix")
+
+    if task["curves"]:
+        ax = axes[0, 1]
+        for name, curve in zip(names, task["curves"]):
+            keep = np.unique(np.linspace(0, len(curve["fpr"]) - 1, max_points).astype(int))
+            ax.plot(curve["fpr"][keep], curve["tpr"][keep], lw=2, label=f"{name} (AUC = {curve['auc']:.2f})")
+        ax.plot([0, 1], [0, 1], color="gray", linestyle="--")
+        ax.set_xlabel("False Positive Rate")
+        ax.set_ylabel("True Positive Rate")
+        ax.set_title(f"{task['name']}: one-vs-rest ROC")
+        ax.legend(loc="lower right")
+
+    fig.savefig(task["path"], dpi=task["dpi"])
+    return task["path"]
+
+
+class ReportGenerator:
+    """
+    Evaluates many tickers/models in one call and writes one consolidated report.
+
+    Metrics come from one confusion matrix per model (a single bincount) and
+    one-vs-rest ROC/AUC from the class scores; figures are bare `Figure`s
+    rendered headless, in a process pool whose workers are forced onto Agg.
+    The caller's matplotlib backend is never changed.
+
+    Outputs in `out_dir`:
+        report.csv        one row per model: accuracy, weighted and per-class precision/recall/F1, AUCs
+        report.json       the same plus confusion matrices
+        report.html       metrics table with every model's figure
+        figures/{name}.png  (characters other than letters, digits, '.', '-' replaced by '_')
+    """
+    def __init__(self, class_names: Optional[Dict[str, int]] = None, out_dir: str = "figures/report",
+                 n_jobs: int = 1, plot: bool = True, dpi: int = 80) -> None:
+        """
+        Parameters:
+        - class_names: name -> class id, as in config.yaml `evaluation_params.class_names`
+        - out_dir: Report directory
+        - n_jobs: Processes rendering figures; -1 uses every core
+        - plot: Render figures at all
+        - dpi: Figure resolution
+        """
+        class_names = class_names or {"hold": 0, "buy": 1, "sell": 2}
+        self.labels = np.array(sorted(class_names.values()))
+        self.names = [name for name, _ in sorted(class_names.items(), key=lambda item: item[1])]
+        self.out_dir = out_dir
+        self.n_jobs = n_jobs
+        self.plot = plot
+        self.dpi = dpi
+
+    def evaluate(self, name: str, y_true: np.ndarray, y_pred: np.ndarray,
+                 y_score: Optional[np.ndarray] = None) -> Tuple[Dict, Dict]:
+        """
+        Metrics row and plotting payload of one model.
+
+        Parameters:
+        - name: Ticker or model name
+        - y_true, y_pred: Class ids
+        - y_score: Optional (n_samples, n_classes) scores in class-id order, e.g. predict_proba
+
+        Returns:
+        - (row, task): flat metrics row, and the data `_render` needs
+        """
+        cm, _ = confusion(y_true, y_pred, self.labels)
+        metrics = metrics_from_confusion(cm)
+        row = {"name": name, "samples": int(cm.sum()),
+               **{key: float(metrics[key]) for key in ("accuracy", "f1_score", "precision", "recall")}}
+        for k, label in enumerate(self.names):
+            row[f"precision_{label}"] = float(metrics["class_precision"][k])
+            row[f"recall_{label}"] = float(metrics["class_recall"][k])
+            row[f"f1_{label}"] = float(metrics["class_f1"][k])
+            row[f"support_{label}"] = int(metrics["support"][k])
+
+        curves = []
+        if y_score is not None:
+            by_class = roc_ovr(y_true, y_score, self.labels)
+            curves = [by_class[label] for label in self.labels]
+            for label, curve in zip(self.names, curves):
+                row[f"auc_{label}"] = curve["auc"]
+            aucs = np.array([curve["auc"] for curve in curves])
+            row["auc_macro"] = float(np.nanmean(aucs)) if not np.isnan(aucs).all() else np.nan
+        task = {"name": name, "cm": cm, "curves": curves, "class_names": self.names, "dpi": self.dpi,
+                "path": os.path.join(self.out_dir, "figures", re.sub(r"[^\w.-]", "_", str(name)) + ".png")}
+        return row, task
+
+    @profiled("evaluation report")
+    def run(self, results: Dict[str, Tuple]) -> pd.DataFrame:
+        """
+        Evaluate every model and write the consolidated report.
+
+        Parameters:
+        - results: name -> (y_true, y_pred) or (y_true, y_pred, y_score)
+
+        Returns:
+        - pd.DataFrame: One metrics row per model, indexed by name
+
+        Raises:
+        - ValueError: If `results` is empty
+        """
+        if not results:
+            raise ValueError("ReportGenerator.run needs at least one model: results is empty")
+        rows, tasks = [], []
+        for name, arrays in results.items():
+            row, task = self.evaluate(name, *arrays)
+            rows.append(row)
+            tasks.append(task)
+
+        os.makedirs(os.path.join(self.out_dir, "figures"), exist_ok=True)
+        if self.plot and self.n_jobs == 1:
+            figures = [_render(task) for task in tasks]
+        elif self.plot:
+            with ProcessPoolExecutor(max_workers=None if self.n_jobs == -1 else self.n_jobs,
+                                     initializer=_use_agg) as pool:
+                figures = list(pool.map(_render, tasks, chunksize=max(1, len(tasks) // 32)))
+        else:
+            figures = [None] * len(tasks)
+
+        report = pd.DataFrame(rows).set_index("name")
+        report.to_csv(os.path.join(self.out_dir, "report.csv"))
+        with open(os.path.join(self.out_dir, "report.json"), "w") as f:
+            json.dump([{**row, "confusion_matrix": task["cm"].tolist(), "labels": self.names}
+                       for row, task in zip(rows, tasks)], f, indent=2, default=float)
+        self._write_html(report, figures)
+        return report
+
+    def _write_html(self, report: pd.DataFrame, figures: List[Optional[str]]) -> None:
+        summary = report.describe().loc[["mean", "std", "min", "max"]]
+        # Names are tickers or user-given model names: escape them like to_html escapes the tables
+        sections = [f"<h2>{html.escape(str(name))}</h2>"
+                    f"<img src='{html.escape(os.path.relpath(path, self.out_dir), quote=True)}'>"
+                    for name, path in zip(report.index, figures) if path is not None]
+        page = ("<html><head><meta charset='utf-8'><title>Evaluation report</title></head><body>"
+                f"<h1>Evaluation report ({len(report)} models)</h1>"
+                f"<h2>Summary</h2>{summary.to_html(float_format=lambda v: f'{v:.4f}')}"
+                f"<h2>Models</h2>{report.to_html(float_format=lambda v: f'{v:.4f}')}"
+                + "".join(sections) + "</body></html>")
+        with open(os.path.join(self.out_dir, "report.html"), "w") as f:
+            f.write(page)
 
 
 if __name__ == '__main__':
-    pass
\ No newline at end of file
+    pass
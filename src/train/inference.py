@@ -0,0 +1,400 @@
+import os
+import time
+import joblib
+import numpy as np
+from collections import deque
+from sklearn import config_context
+from sklearn.base import BaseEstimator
+from sklearn.ensemble import VotingClassifier
+from sklearn.linear_model import (LogisticRegression, LogisticRegressionCV, Perceptron, RidgeClassifier,
+                                  RidgeClassifierCV, SGDClassifier)
+from sklearn.svm import LinearSVC
+from typing import Callable, Dict, Optional, Sequence
+
+from src.process_data.scaler import PreprocessingPipeline
+
+# Public classifiers whose `predict` is the argmax (or sign) of `X @ coef_.T + intercept_`
+LINEAR_CLASSIFIERS = (LogisticRegression, LogisticRegressionCV, Perceptron, RidgeClassifier, RidgeClassifierCV,
+                      SGDClassifier, LinearSVC)
+
+
+class _FlatForest:
+    """
+    All trees of a fitted forest packed into flat node arrays.
+
+    Small batches descend every tree at once, one vectorized step per depth
+    level, instead of one `tree_.apply` call per tree; large batches use
+    `tree_.apply`, which is cheaper per row. Leaf probabilities are normalised
+    once at load time.
+    """
+    # Largest batch for which the level-by-level descent beats per-tree apply
+    SMALL_BATCH = 8
+
+    def __init__(self, forest: BaseEstimator) -> None:
+        self.trees = [tree.tree_ for tree in forest.estimators_]
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for tree in self.trees:
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left < 0
+            # Leaves point at themselves, so extra descent steps leave them in place
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(np.stack([np.where(leaf, nodes, tree.children_left),
+                                      np.where(leaf, nodes, tree.children_right)], axis=1) + offset)
+            value = tree.value[:, 0, :forest.n_classes_].astype(np.float64)
+            total = value.sum(axis=1, keepdims=True)
+            values.append(value / np.where(total == 0, 1.0, total))
+            roots.append(offset)
+            offset += tree.node_count
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        # children[2 * node + go_right] is the next node
+        self.children = np.concatenate(children).ravel()
+        self.values = values
+        self.value = np.concatenate(values)
+        self.roots = np.asarray(roots)
+        self.depth = max(tree.max_depth for tree in self.trees)
+
+    def proba(self, X32: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Mean leaf probabilities over the trees, written into `out`."""
+        out.fill(0.0)
+        if len(X32) <= self.SMALL_BATCH:
+            node = np.repeat(self.roots[None, :], len(X32), axis=0)
+            rows = np.arange(len(X32))[:, None]
+            for _ in range(self.depth):
+                node = self.children[2 * node + (X32[rows, self.feature[node]] > self.threshold[node])]
+            np.sum(self.value[node], axis=1, out=out)
+        else:
+            for tree, values in zip(self.trees, self.values):
+                out += values[tree.apply(X32)]
+        out /= len(self.trees)
+        return out
+
+
+def _flat_forest(estimator: BaseEstimator) -> Optional[_FlatForest]:
+    """Packed forest for random/extra-trees classifiers, None for every other estimator."""
+    if estimator.__class__.__name__ not in ("RandomForestClassifier", "ExtraTreesClassifier") or \
+            estimator.n_outputs_ != 1:
+        return None
+    return _FlatForest(estimator)
+
+
+class _FlatBoosting:
+    """
+    Regression trees of a fitted gradient boosting classifier packed into flat node arrays.
+
+    Only the public fitted attributes are read (`estimators_`, `learning_rate`
+    and each tree's `tree_` structure), so the path does not depend on
+    sklearn's private boosting kernels. Boosted trees are shallow, so every
+    tree is descended at once, one vectorized step per depth level. The
+    (rows x trees) node matrix grows with the batch, so batches above
+    `SMALL_BATCH` rows are left to the estimator's `decision_function`.
+    Leaf values are pre-multiplied by the learning rate.
+    """
+    # Largest batch for which the packed descent beats `decision_function`
+    SMALL_BATCH = 64
+
+    def __init__(self, estimator: BaseEstimator) -> None:
+        stages = estimator.estimators_  # (n_stages, K) regression trees
+        self.n_stages, self.n_columns = stages.shape
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for tree in (regressor.tree_ for stage in stages for regressor in stage):  # Stage-major, column-minor
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left < 0
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(np.stack([np.where(leaf, nodes, tree.children_left),
+                                      np.where(leaf, nodes, tree.children_right)], axis=1) + offset)
+            values.append(tree.value[:, 0, 0] * estimator.learning_rate)
+            roots.append(offset)
+            offset += tree.node_count
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.children = np.concatenate(children).ravel()
+        self.value = np.concatenate(values)
+        self.roots = np.asarray(roots)
+        self.depth = max(regressor.tree_.max_depth for stage in stages for regressor in stage)
+        self.init = np.zeros((1, self.n_columns))
+
+    def raw(self, X32: np.ndarray) -> np.ndarray:
+        """Raw scores (log-odds), shape (n_rows, K), as `decision_function` computes them."""
+        node = np.repeat(self.roots[None, :], len(X32), axis=0)
+        rows = np.arange(len(X32))[:, None]
+        for _ in range(self.depth):
+            node = self.children[2 * node + (X32[rows, self.feature[node]] > self.threshold[node])]
+        return self.value[node].reshape(len(X32), self.n_stages, self.n_columns).sum(axis=1) + self.init
+
+
+def _gbm_predictor(estimator: BaseEstimator) -> Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]]:
+    """
+    Packed-tree label path of a gradient boosting classifier, None when it is unavailable.
+
+    The zero or prior (`DummyClassifier`) init adds the same raw score to every
+    row, so it is read once from `decision_function` of one row minus the
+    trees' sum. The path is only used when the raw scores of a probe batch
+    match the estimator's own `decision_function`; otherwise the estimator goes
+    through its public `predict`/`predict_proba`.
+    """
+    if not (estimator.init_ == "zero" or estimator.init_.__class__.__name__ == "DummyClassifier"):
+        return None
+    try:
+        trees = _FlatBoosting(estimator)
+        probe = np.random.default_rng(0).normal(size=(16, estimator.n_features_in_))
+        decision = estimator.decision_function(probe).reshape(len(probe), -1)
+        if decision.shape[1] != trees.n_columns:
+            return None
+        trees.init = decision[:1] - trees.raw(probe[:1].astype(np.float32))
+        if not np.allclose(trees.raw(probe.astype(np.float32)), decision):
+            return None
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+
+    def predict(X, X32):
+        if len(X32) <= trees.SMALL_BATCH:
+            raw = trees.raw(X32)
+        else:
+            raw = estimator.decision_function(X32).reshape(len(X32), -1)
+        return (raw[:, 0] >= 0).astype(np.intp) if raw.shape[1] == 1 else raw.argmax(axis=1)
+    return predict
+
+
+def _label_predictor(estimator: BaseEstimator) -> Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]]:
+    """
+    Validation-free label path for hard voting, None when the estimator has none.
+
+    The returned function maps (X, X32) to indices into `estimator.classes_`,
+    with the same decision rule as the estimator's own `predict`.
+    """
+    if isinstance(estimator, LINEAR_CLASSIFIERS):
+        coef, intercept = estimator.coef_.T, np.atleast_1d(estimator.intercept_)
+        if coef.shape[1] == 1:
+            return lambda X, X32: (X @ coef[:, 0] + intercept[0] > 0).astype(np.intp)
+        return lambda X, X32: (X @ coef + intercept).argmax(axis=1)
+
+    if estimator.__class__.__name__ == "GradientBoostingClassifier":
+        return _gbm_predictor(estimator)
+    return None
+
+
+class InferenceEngine:
+    """
+    Warm, vectorized scoring path for the tuned voting ensemble.
+
+    Loads the fitted estimators and the preprocessing pipeline once and scores
+    a batch of raw feature rows in one call. Preprocessing writes into a
+    preallocated buffer, every estimator votes into a shared score matrix
+    (hard: weighted one-hot votes, soft: weighted probabilities), and the label
+    is a single argmax. This replaces `VotingClassifier.predict`'s per-row
+    `apply_along_axis` and label re-encoding. Forests are scored straight from
+    their packed trees (`_FlatForest`), and for hard voting gradient boosting
+    and linear models predict from their fitted arrays (`_label_predictor`),
+    skipping sklearn's input validation and joblib dispatch. Any other
+    estimator runs through its own `predict` under `assume_finite`.
+
+    Per-call latencies are kept in a ring buffer for `latency()`.
+    """
+    def __init__(self, estimators: Sequence[BaseEstimator], pipeline: Optional[PreprocessingPipeline] = None,
+                 voting: str = "hard", weights: Optional[Sequence[float]] = None, dtype: str = "float64",
+                 max_batch: int = 5000, latency_window: int = 10000) -> None:
+        """
+        Args:
+            estimators (Sequence[BaseEstimator]): Fitted classifiers.
+            pipeline (Optional[PreprocessingPipeline]): Fitted pipeline applied to raw rows. Default is None.
+            voting (str): "hard" or "soft". Default is "hard".
+            weights (Optional[Sequence[float]]): Vote weight per estimator. Default is equal weights.
+            dtype (str): Feature dtype fed to the estimators, 'float64' or 'float32'. Default is 'float64'.
+            max_batch (int): Rows per call scored in the preallocated buffers; larger batches are split. Default is 5000.
+            latency_window (int): Number of recent calls kept for latency percentiles. Default is 10000.
+        """
+        if voting not in ("hard", "soft"):
+            raise ValueError(f"Unknown voting {voting!r}, expected 'hard' or 'soft'")
+        self.estimators = list(estimators)
+        self.pipeline = pipeline
+        self.voting = voting
+        self.weights = np.ones(len(self.estimators)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.dtype = np.dtype(dtype)
+        self.max_batch = max_batch
+
+        # Map every estimator's class order onto the ensemble's sorted classes
+        self.classes_ = np.unique(np.concatenate([est.classes_ for est in self.estimators]))
+        self._columns = [np.searchsorted(self.classes_, est.classes_) for est in self.estimators]
+        self._forests = [_flat_forest(est) for est in self.estimators]
+        self._labels = [_label_predictor(est) if voting == "hard" else None for est in self.estimators]
+
+        n_features = self.estimators[0].n_features_in_
+        self._X = np.empty((max_batch, n_features), dtype=self.dtype)
+        self._X32 = np.empty((max_batch, n_features), dtype=np.float32)
+        self._scores = np.empty((max_batch, len(self.classes_)))
+        self._proba = np.empty((max_batch, len(self.classes_)))
+        self._latency = deque(maxlen=latency_window)
+
+    @classmethod
+    def from_votingclf(cls, voting_clf: VotingClassifier, pipeline: Optional[PreprocessingPipeline] = None,
+                       **kwargs) -> "InferenceEngine":
+        """
+        Build an engine from a VotingClassifier, e.g. `Htuner.build_votingclf()`.
+
+        Uses the fitted `estimators_` when the ensemble was fitted, otherwise the
+        (already tuned and fitted) estimators it was built from.
+
+        Args:
+            voting_clf (VotingClassifier): The ensemble.
+            pipeline (Optional[PreprocessingPipeline]): Fitted pipeline applied to raw rows.
+
+        Returns:
+            InferenceEngine: Engine with the ensemble's voting and weights.
+        """
+        estimators = getattr(voting_clf, "estimators_", None) or [est for _, est in voting_clf.estimators]
+        kwargs.setdefault("voting", voting_clf.voting)
+        kwargs.setdefault("weights", voting_clf.weights)
+        return cls(estimators, pipeline, **kwargs)
+
+    @classmethod
+    def load(cls, model_dir: str, **kwargs) -> "InferenceEngine":
+        """
+        Load the artifacts written by `BatchOrchestrator` for one ticker.
+
+        Args:
+            model_dir (str): Directory holding `model.pkl` and `preprocessing.npz`.
+
+        Returns:
+            InferenceEngine: Engine over the saved model (or VotingClassifier) and pipeline.
+        """
+        model = joblib.load(os.path.join(model_dir, "model.pkl"))
+        pipeline_path = os.path.join(model_dir, "preprocessing.npz")
+        pipeline = PreprocessingPipeline.load(pipeline_path) if os.path.exists(pipeline_path) else None
+        if isinstance(model, VotingClassifier):
+            return cls.from_votingclf(model, pipeline, **kwargs)
+        return cls([model], pipeline, **kwargs)
+
+    def _score_block(self, X: np.ndarray) -> np.ndarray:
+        """Accumulate the weighted votes of one block (at most `max_batch` rows) into the score buffer."""
+        n = len(X)
+        if self.pipeline is not None:
+            X = self.pipeline.transform(X, out=self._X[:n])
+        elif X.dtype != self.dtype:
+            np.copyto(self._X[:n], X, casting="unsafe")
+            X = self._X[:n]
+        scores = self._scores[:n]
+        scores.fill(0.0)
+        rows = np.arange(n)
+        # Trees split on float32 features, so convert once for every tree model
+        X32 = self._X32[:n]
+        np.copyto(X32, X, casting="unsafe")
+
+        for est, columns, forest, labels, weight in zip(self.estimators, self._columns, self._forests,
+                                                         self._labels, self.weights):
+            if forest is not None:
+                proba = forest.proba(X32, self._proba[:n, :len(columns)])
+                if self.voting == "soft":
+                    scores[:, columns] += weight * proba
+                else:
+                    scores[rows, columns[proba.argmax(axis=1)]] += weight
+            elif labels is not None:
+                scores[rows, columns[labels(X, X32)]] += weight
+            else:
+                with config_context(assume_finite=True):
+                    if self.voting == "soft":
+                        scores[:, columns] += weight * est.predict_proba(X)
+                    else:
+                        scores[rows, np.searchsorted(self.classes_, est.predict(X))] += weight
+        return scores
+
+    def predict_scores(self, X: np.ndarray) -> np.ndarray:
+        """
+        Weighted vote counts (hard) or summed probabilities (soft) per class.
+
+        Args:
+            X (np.ndarray): Raw feature rows, shape (n_rows, n_features) or (n_features,).
+
+        Returns:
+            np.ndarray: Scores of shape (n_rows, n_classes), columns ordered as `classes_`.
+        """
+        start = time.perf_counter_ns()
+        X = np.atleast_2d(X)
+        out = np.empty((len(X), len(self.classes_)))
+        for lo in range(0, len(X), self.max_batch):
+            block = X[lo:lo + self.max_batch]
+            out[lo:lo + len(block)] = self._score_block(block)
+        self._latency.append(time.perf_counter_ns() - start)
+        return out
+
+    def predict(self, X: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Predicted labels, identical to the VotingClassifier's.
+
+        Ties between classes go to the lowest class, as in the VotingClassifier.
+
+        Args:
+            X (np.ndarray): Raw feature rows, shape (n_rows, n_features) or (n_features,).
+            out (Optional[np.ndarray]): Preallocated label buffer of length n_rows. Default allocates one.
+
+        Returns:
+            np.ndarray: Predicted class labels.
+        """
+        start = time.perf_counter_ns()
+        X = np.atleast_2d(X)
+        if out is None:
+            out = np.empty(len(X), dtype=self.classes_.dtype)
+        for lo in range(0, len(X), self.max_batch):
+            block = X[lo:lo + self.max_batch]
+            out[lo:lo + len(block)] = self.classes_[self._score_block(block).argmax(axis=1)]
+        self._latency.append(time.perf_counter_ns() - start)
+        return out
+
+    def latency(self) -> Dict[str, float]:
+        """
+        Latency of the recent `predict`/`predict_scores` calls.
+
+        Returns:
+            Dict[str, float]: Number of calls and p50, p99 and mean latency in microseconds.
+        """
+        if not self._latency:
+            return {"calls": 0, "p50_us": float("nan"), "p99_us": float("nan"), "mean_us": float("nan")}
+        samples = np.fromiter(self._latency, dtype=np.float64, count=len(self._latency)) / 1e3
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {"calls": len(samples), "p50_us": float(p50), "p99_us": float(p99), "mean_us": float(samples.mean())}
+
+
+class EnginePool:
+    """
+    One warm `InferenceEngine` per ticker, loaded from the orchestrator's model directory.
+
+    `predict` scores the feature rows of many tickers in one call, each through
+    its own engine and buffers. The tickers are not stacked into one batch:
+    every ticker has its own fitted models and preprocessing, so there is no
+    shared matrix product or tree pass to batch them into, and the per-ticker
+    loop only costs one engine call per ticker.
+    """
+    def __init__(self, out_dir: str = "models", tickers: Optional[Sequence[str]] = None, **kwargs) -> None:
+        """
+        Args:
+            out_dir (str): Directory holding `{ticker}/model.pkl` and `{ticker}/preprocessing.npz`. Default is 'models'.
+            tickers (Optional[Sequence[str]]): Tickers to load. Default is every model directory.
+            **kwargs: Passed on to `InferenceEngine`.
+        """
+        if tickers is None:
+            tickers = sorted(d for d in os.listdir(out_dir) if os.path.exists(os.path.join(out_dir, d, "model.pkl")))
+        self.engines: Dict[str, InferenceEngine] = {
+            ticker: InferenceEngine.load(os.path.join(out_dir, ticker), **kwargs) for ticker in tickers}
+
+    def predict(self, rows: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Predicted labels per ticker.
+
+        Args:
+            rows (Dict[str, np.ndarray]): Raw feature rows per ticker.
+
+        Returns:
+            Dict[str, np.ndarray]: Labels per ticker.
+        """
+        return {ticker: self.engines[ticker].predict(X) for ticker, X in rows.items()}
+
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        """Latency metrics per ticker."""
+        return {ticker: engine.latency() for ticker, engine in self.engines.items()}
+
+
+if __name__ == '__main__':pass
@@ -0,0 +1,332 @@
+import os
+import json
+import time
+import joblib
+import sklearn
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from sklearn.base import BaseEstimator, clone
+from sklearn.ensemble import RandomForestClassifier
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.process_data import features as features_module, labels as labels_module, scaler as scaler_module
+from src.process_data.features import compute_features
+from src.process_data.labels import make_labels
+from src.process_data.scaler import PreprocessingPipeline
+from src.train import Htuning, cv as cv_module, evaluation, search, trials
+from src.train.Htuning import Htuner
+from src.train.cv import WalkForwardCV
+from src.train.evaluation import evaluate_model
+from src.train.trials import TrialStore
+from src.cache import StageCache, digest
+from src.profiling import peak_rss_mb, profiled
+
+# Panel arrays of the current run, attached once per worker process
+_PANEL: Dict[str, np.ndarray] = {}
+_SEGMENTS: List[shared_memory.SharedMemory] = []
+
+
+def _attach(specs: Dict[str, Tuple[str, Tuple[int, ...], str]]) -> None:
+    """Map the shared panel segments into this worker without copying them."""
+    for key, (name, shape, dtype) in specs.items():
+        segment = shared_memory.SharedMemory(name=name)
+        _SEGMENTS.append(segment)
+        _PANEL[key] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+
+class SharedPanel:
+    """
+    Price, feature and label matrices in POSIX shared memory.
+
+    The parent process fills one segment per matrix; workers attach to them by
+    name, so every worker reads the same physical pages instead of receiving a
+    pickled copy of the panel.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Args:
+            arrays (Dict[str, np.ndarray]): Matrices to share, copied into shared memory once.
+        """
+        self.segments: Dict[str, shared_memory.SharedMemory] = {}
+        self.specs: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+            self.segments[key] = segment
+            self.specs[key] = (segment.name, array.shape, array.dtype.str)
+
+    def close(self) -> None:
+        """Release and remove the segments."""
+        for segment in self.segments.values():
+            segment.close()
+            segment.unlink()
+        self.segments = {}
+
+
+def ticker_split(prices: np.ndarray, features: np.ndarray, labels: np.ndarray, position: int,
+                 train_size: float, return_rows: bool = False, purge: int = 0,
+                 embargo: int = 0) -> Tuple[np.ndarray, ...]:
+    """
+    Chronological train/test split of one ticker's inputs from the panel arrays.
+
+    The inputs follow `data_params.columns`: every ticker's price, then the
+    ticker's own indicators. Rows without a label or with missing inputs are dropped.
+    As in `WalkForwardCV`, the last `purge` panel rows before the test set are
+    removed from training (with `purge` = label horizon, no training label looks
+    into the test period) and the first `embargo` panel rows of the test set are skipped.
+
+    Args:
+        prices (np.ndarray): (dates, tickers) price panel.
+        features (np.ndarray): `compute_features` of the panel, grouped by indicator, then ticker.
+        labels (np.ndarray): (dates, tickers) labels, NaN where undefined.
+        position (int): Column of the ticker in the panel.
+        train_size (float): Fraction of rows used for training.
+        return_rows (bool): Also return the panel rows of the test set, e.g. to backtest it. Default is False.
+        purge (int): Panel rows removed between the training rows and the test set. Default is 0.
+        embargo (int): Panel rows skipped at the start of the test set. Default is 0.
+
+    Returns:
+        Tuple: X_train, y_train, X_test, y_test (and the test rows with `return_rows`).
+    """
+    n_tickers = prices.shape[1]
+    # Features are grouped by indicator, then ticker, so the ticker's indicators are strided columns
+    X = np.concatenate([prices, features[:, position::n_tickers]], axis=1)
+    y = labels[:, position]
+    rows = np.flatnonzero(~np.isnan(y) & np.isfinite(X).all(axis=1))
+    split = int(len(rows) * train_size)
+    test_start = rows[split] if split < len(rows) else len(y)
+    train = rows[:split][rows[:split] < test_start - purge]
+    test = rows[split:][rows[split:] >= test_start + embargo]
+    X_train, y_train, X_test, y_test = X[train], y[train].astype(np.int64), X[test], y[test].astype(np.int64)
+    if return_rows:
+        return X_train, y_train, X_test, y_test, test
+    return X_train, y_train, X_test, y_test
+
+
+def _train_ticker(job: Dict) -> Dict:
+    """
+    Train, evaluate and save the model of one ticker from the shared panel.
+
+    Args:
+        job (Dict): Ticker, its column position and the training settings.
+
+    Returns:
+        Dict: Summary row with data sizes, metrics, fit time and worker peak RSS.
+    """
+    start = time.perf_counter()
+    X_train, y_train, X_test, y_test = ticker_split(_PANEL["prices"], _PANEL["features"], _PANEL["labels"],
+                                                    job["position"], job["train_size"], purge=job["purge"])
+
+    if job["param_grid"] is not None:
+        store = TrialStore(job["trial_store"]) if job["trial_store"] else None
+        tuner = Htuner([job["estimator"]], [job["param_grid"]])
+        # Purge the label horizon inside the tuning folds too
+        cv = WalkForwardCV(n_splits=job["cv"], purge=job["purge"])
+        tuner.tune(X_train, y_train, cv=cv, n_iter=job["n_iter"],
+                   preprocessing=PreprocessingPipeline(job["threshold"]), store=store)
+        model, pipeline = next(iter(tuner.tuned_clf.values())), tuner.preprocessing
+        if store is not None:
+            store.close()
+    else:
+        pipeline = PreprocessingPipeline(job["threshold"]).fit(X_train)
+        model = clone(job["estimator"]).fit(pipeline.transform(X_train), y_train)
+    metrics = {k: float(v) for k, v in evaluate_model(y_test, model.predict(pipeline.transform(X_test))).items()}
+
+    row = {"ticker": job["ticker"], "rows": int(len(X_train) + len(X_test)), "train_rows": int(len(X_train)),
+           "test_rows": int(len(X_test)), **metrics, "fit_time": time.perf_counter() - start,
+           "worker_peak_rss_mb": peak_rss_mb(), "pid": os.getpid(), "cached": False}
+    if job["cache"] is not None:
+        job["cache"].put(job["cache_key"], {"model": model, "pipeline": pipeline, "row": row})
+    _save_artifacts(job["out_dir"], model, pipeline, row)
+    return row
+
+
+def _save_artifacts(out_dir: str, model: BaseEstimator, pipeline: PreprocessingPipeline, row: Dict) -> None:
+    """Write a ticker's model, preprocessing pipeline and summary row under `out_dir/{ticker}`."""
+    out_dir = os.path.join(out_dir, row["ticker"])
+    os.makedirs(out_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(out_dir, "model.pkl"))
+    pipeline.save(os.path.join(out_dir, "preprocessing.npz"))
+    with open(os.path.join(out_dir, "metrics.json"), "w") as f:
+        json.dump(row, f, indent=2)
+
+
+class BatchOrchestrator:
+    """
+    Trains and evaluates one model per ticker across the universe in a single run.
+
+    Indicators and labels are computed once for the whole price panel with the
+    vectorized kernels, placed in shared memory, and each ticker's job runs in
+    a process pool that reads the shared panel. There is no per-ticker config
+    rewrite (`utils.update_ticker`) or recomputation.
+
+    With a `cache`, the features, labels and each ticker's fitted model are
+    stored under content keys (price panel, settings and the code of the modules
+    involved); a rerun with nothing changed upstream restores the artifacts from
+    the cache instead of refitting.
+
+    Artifacts:
+        out_dir/{ticker}/model.pkl          fitted classifier
+        out_dir/{ticker}/preprocessing.npz  fitted PreprocessingPipeline
+        out_dir/{ticker}/metrics.json       the ticker's summary row
+        out_dir/summary.csv                 one row per ticker
+
+    Attributes:
+        summary (pd.DataFrame): Summary table of the last run.
+        report (Dict): Wall time, throughput and peak memory of the last run.
+    """
+    def __init__(self, estimator: Optional[BaseEstimator] = None, param_grid: Optional[Dict] = None,
+                 n_jobs: int = 1, out_dir: str = "models", window: int = 14, horizon: int = 1,
+                 label_threshold: float = 0.01, train_size: float = 0.75, threshold: float = 3.0,
+                 cv: int = 5, n_iter: Optional[int] = 10, trial_store: Optional[str] = None,
+                 cache: Optional[StageCache] = None) -> None:
+        """
+        Args:
+            estimator (Optional[BaseEstimator]): Classifier template. Default is a RandomForestClassifier.
+            param_grid (Optional[Dict]): Tune the estimator per ticker with `Htuner` over this grid. Default is None.
+            n_jobs (int): Worker processes; -1 uses every core. Default is 1 (in-process).
+            out_dir (str): Artifact directory. Default is 'models'.
+            window (int): `data_params.window` from config.yaml. Default is 14.
+            horizon (int): Label horizon in bars. Default is 1.
+            label_threshold (float): Forward return needed for a buy/sell label. Default is 0.01.
+            train_size (float): `data_params.train_test_split` from config.yaml. Default is 0.75.
+            threshold (float): `data_params.threshold`, the outlier z-score. Default is 3.0.
+            cv (int): Walk-forward folds when tuning. Default is 5.
+            n_iter (Optional[int]): Candidates per ticker when tuning. Default is 10.
+            trial_store (Optional[str]): SQLite trial store shared by the tickers' tuning. Default is None.
+            cache (Optional[StageCache]): Stage cache for features, labels and fitted models. Default is None.
+        """
+        self.estimator = estimator if estimator is not None else RandomForestClassifier(random_state=42)
+        self.param_grid = param_grid
+        self.n_jobs = n_jobs
+        self.out_dir = out_dir
+        self.window = window
+        self.horizon = horizon
+        self.label_threshold = label_threshold
+        self.train_size = train_size
+        self.threshold = threshold
+        self.cv = cv
+        self.n_iter = n_iter
+        self.trial_store = trial_store
+        self.cache = cache
+        self.summary: Optional[pd.DataFrame] = None
+        self.report: Dict = {}
+
+    @profiled("batch train")
+    def run(self, prices: pd.DataFrame, tickers: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Train every selected ticker against the shared panel.
+
+        Args:
+            prices (pd.DataFrame): Wide price panel (dates x tickers), e.g. `PriceStore.frame()`.
+            tickers (Optional[Sequence[str]]): Tickers to train. Default is every column.
+
+        Returns:
+            pd.DataFrame: Summary table, also written to `out_dir/summary.csv`.
+        """
+        start = time.perf_counter()
+        prices = prices.astype("float64")
+        tickers = list(prices.columns) if tickers is None else list(tickers)
+        positions = {ticker: i for i, ticker in enumerate(prices.columns)}
+
+        keys = self._keys(prices, tickers)
+        arrays = self.panel(prices, keys)
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        # Tickers whose model is cached only need their artifacts restored
+        cached_rows, jobs = [], []
+        for ticker in tickers:
+            hit = self.cache.get(keys[ticker]) if self.cache is not None else None
+            if hit is not None:
+                row = {**hit["row"], "cached": True}
+                _save_artifacts(self.out_dir, hit["model"], hit["pipeline"], row)
+                cached_rows.append(row)
+                continue
+            jobs.append({"ticker": ticker, "position": positions[ticker], "estimator": self.estimator,
+                         "param_grid": self.param_grid, "train_size": self.train_size, "threshold": self.threshold,
+                         "purge": self.horizon, "cv": self.cv, "n_iter": self.n_iter, "trial_store": self.trial_store,
+                         "out_dir": self.out_dir, "cache": self.cache, "cache_key": keys.get(ticker)})
+
+        if not jobs:
+            rows = []
+        elif self.n_jobs == 1:
+            _PANEL.update(arrays)
+            try:
+                rows = [_train_ticker(job) for job in jobs]
+            finally:
+                _PANEL.clear()
+        else:
+            panel = SharedPanel(arrays)
+            del arrays
+            try:
+                workers = None if self.n_jobs == -1 else self.n_jobs
+                with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                         initargs=(panel.specs,)) as pool:
+                    rows = list(pool.map(_train_ticker, jobs))
+            finally:
+                panel.close()
+
+        by_ticker = {row["ticker"]: row for row in cached_rows + rows}
+        rows = [by_ticker[ticker] for ticker in tickers]
+        self.summary = pd.DataFrame(rows)
+        self.summary.to_csv(os.path.join(self.out_dir, "summary.csv"), index=False)
+        wall = time.perf_counter() - start
+        self.report = {"tickers": len(rows), "cached": len(cached_rows), "wall_time": wall,
+                       "tickers_per_sec": len(rows) / wall,
+                       "parent_peak_rss_mb": peak_rss_mb(),
+                       "worker_peak_rss_mb": float(self.summary["worker_peak_rss_mb"].max()) if rows else 0.0}
+        return self.summary
+
+    def panel(self, prices: pd.DataFrame, keys: Optional[Dict[str, str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Price, feature and label matrices of the panel, through the stage cache.
+
+        `evaluate` uses this to read the same cached features and labels as `run`.
+
+        Args:
+            prices (pd.DataFrame): float64 price panel (dates x tickers).
+            keys (Optional[Dict[str, str]]): Stage keys from `_keys`. Default computes them.
+
+        Returns:
+            Dict[str, np.ndarray]: 'prices', 'features' and 'labels' arrays.
+        """
+        keys = self._keys(prices, []) if keys is None else keys
+        return {"prices": prices.to_numpy(),
+                "features": self._cached(keys.get("features"),
+                                         lambda: compute_features(prices, window=self.window).to_numpy()),
+                "labels": self._cached(keys.get("labels"),
+                                       lambda: make_labels(prices, self.horizon, self.label_threshold).to_numpy())}
+
+    def _cached(self, key: Optional[str], compute):
+        """Output of a stage from the cache, or computed directly without a cache (`key` None)."""
+        return compute() if self.cache is None or key is None else self.cache.get_or_compute(key, compute)
+
+    def _keys(self, prices: pd.DataFrame, tickers: Sequence[str]) -> Dict[str, str]:
+        """
+        Cache keys of the run's stages: features and labels from the price panel,
+        and one model key per ticker on top of them.
+        """
+        if self.cache is None:
+            return {}
+        prices_key = digest(prices)
+        keys = {"features": self.cache.key("features", code=[features_module], params={"window": self.window},
+                                           inputs=[prices_key]),
+                "labels": self.cache.key("labels", code=[labels_module],
+                                         params={"horizon": self.horizon, "threshold": self.label_threshold},
+                                         inputs=[prices_key])}
+        code = [features_module, labels_module, scaler_module, Htuning, cv_module, search, trials, evaluation,
+                __file__]
+        settings = {"estimator": type(self.estimator).__name__, "estimator_params": self.estimator.get_params(),
+                    "param_grid": self.param_grid, "train_size": self.train_size, "threshold": self.threshold,
+                    "cv": self.cv, "n_iter": self.n_iter, "trial_store": self.trial_store,
+                    "sklearn": sklearn.__version__}
+        for ticker in tickers:
+            keys[ticker] = self.cache.key("model", code=code, params={"ticker": ticker, **settings},
+                                          inputs=[prices_key, keys["features"], keys["labels"]])
+        return keys
+
+
+if __name__ == '__main__':pass
@@ -0,0 +1,295 @@
+import math
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.train.cv import FoldCache
+from src.train.trials import TrialStore, classifier_key
+
+# Folds and scorer of the current search, installed once per worker process
+_FOLDS: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+_SCORING: str = "accuracy"
+
+
+def _init_worker(folds: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]], scoring: str) -> None:
+    """Install the fold data in a worker so tasks only carry estimator and parameters."""
+    global _FOLDS, _SCORING
+    _FOLDS, _SCORING = folds, scoring
+
+
+def _fit(estimator: BaseEstimator, X: np.ndarray, y: np.ndarray, early_stopping_rounds: Optional[int]) -> BaseEstimator:
+    """
+    Fit an estimator, using its native early stopping when requested.
+
+    XGBoost and LightGBM monitor the most recent 10% of the training rows;
+    sklearn's gradient boosting models use their built-in validation split.
+    """
+    name = estimator.__class__.__name__
+    if not early_stopping_rounds:
+        return estimator.fit(X, y)
+
+    if name in ("XGBClassifier", "LGBMClassifier"):
+        split = int(len(X) * 0.9)
+        eval_set = [(X[split:], y[split:])]
+        if name == "XGBClassifier":
+            estimator.set_params(early_stopping_rounds=early_stopping_rounds)
+            return estimator.fit(X[:split], y[:split], eval_set=eval_set, verbose=False)
+        import lightgbm
+        return estimator.fit(X[:split], y[:split], eval_set=eval_set,
+                             callbacks=[lightgbm.early_stopping(early_stopping_rounds, verbose=False)])
+    if name == "GradientBoostingClassifier":
+        estimator.set_params(n_iter_no_change=early_stopping_rounds)
+    elif name == "HistGradientBoostingClassifier":
+        estimator.set_params(early_stopping=True, n_iter_no_change=early_stopping_rounds)
+    return estimator.fit(X, y)
+
+
+def _evaluate(task: Dict) -> Dict:
+    """
+    Score one candidate at one resource level on every fold.
+
+    Args:
+        task (Dict): Classifier name, estimator, parameters, resource kind and level.
+
+    Returns:
+        Dict: The task with its mean and fold scores, wall time and CPU time added.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    scorer = get_scorer(_SCORING)
+    params = dict(task["params"])
+    if task["resource"] == "n_estimators":
+        params["n_estimators"] = int(task["budget"])
+
+    fold_scores = []
+    for X_train, y_train, X_test, y_test in _FOLDS:
+        if task["resource"] == "n_samples":
+            # Train on the most recent fraction of the fold's training window
+            keep = max(1, int(math.ceil(len(X_train) * task["budget"])))
+            X_train, y_train = X_train[-keep:], y_train[-keep:]
+        estimator = clone(task["estimator"]).set_params(**params)
+        estimator = _fit(estimator, X_train, y_train, task["early_stopping_rounds"])
+        fold_scores.append(float(scorer(estimator, X_test, y_test)))
+
+    return {**task, "estimator": None, "mean_score": float(np.mean(fold_scores)), "fold_scores": fold_scores,
+            "wall_time": time.perf_counter() - wall, "cpu_time": time.process_time() - cpu}
+
+
+class ParallelSearch:
+    """
+    Parallel, multi-fidelity hyperparameter search over cached CV folds.
+
+    Candidates of every classifier are scored in one process pool, so
+    classifiers and candidates run concurrently within the `n_jobs` core budget.
+    With a `resource`, each classifier runs successive halving: all candidates
+    start on a small budget, and only the best 1/`factor` move to the next rung
+    with `factor` times more budget, up to the full budget.
+
+    Resources:
+        None           - plain random (or exhaustive) search at full budget
+        'n_estimators' - number of boosting rounds / trees, up to `max_resource`
+        'n_samples'    - most recent fraction of each fold's training rows, up to 1.0
+
+    Attributes:
+        report (List[Dict]): Per classifier: wall-clock time until its last rung
+            finished, summed worker CPU time, number of evaluations (and how
+            many came from the trial store) and best full-budget score, filled by `run`.
+    """
+    def __init__(self, n_jobs: int = 1, resource: Optional[str] = None, factor: int = 3,
+                 min_resource: Optional[float] = None, max_resource: Optional[float] = None,
+                 early_stopping_rounds: Optional[int] = None) -> None:
+        """
+        Args:
+            n_jobs (int): Number of worker processes; -1 uses every core. Default is 1 (in-process).
+            resource (Optional[str]): None, 'n_estimators' or 'n_samples'. Default is None.
+            factor (int): Halving factor between rungs. Default is 3.
+            min_resource (Optional[float]): Budget of the first rung. Default is derived from the rungs.
+            max_resource (Optional[float]): Full budget. Default is the largest n_estimators in the grid
+                (or 300) for 'n_estimators' and 1.0 for 'n_samples'.
+            early_stopping_rounds (Optional[int]): Patience for native early stopping of boosted models.
+        """
+        if resource not in (None, "n_estimators", "n_samples"):
+            raise ValueError(f"Unknown resource {resource!r}")
+        self.n_jobs = n_jobs
+        self.resource = resource
+        self.factor = factor
+        self.min_resource = min_resource
+        self.max_resource = max_resource
+        self.early_stopping_rounds = early_stopping_rounds
+        self.report: List[Dict] = []
+
+    def _budgets(self, params: Dict, n_candidates: int) -> List[float]:
+        """Resource level of every rung, smallest first."""
+        if self.resource is None:
+            return [None]
+        if self.resource == "n_estimators":
+            grid = params.get("n_estimators", [])
+            max_r = self.max_resource or (max(grid) if grid else 300)
+            min_r = self.min_resource or 10
+        else:
+            max_r = self.max_resource or 1.0
+            min_r = self.min_resource or 0.05
+        n_rungs = 1 + min(int(math.log(max(n_candidates, 1), self.factor)),
+                          int(math.log(max_r / min_r, self.factor)))
+        return [max_r / self.factor ** (n_rungs - 1 - i) for i in range(n_rungs)]
+
+    def _budget_key(self, resource: Optional[str], budget: Optional[float]) -> str:
+        """Store key of a budget: resource level and early stopping."""
+        return f"{resource if budget is not None else None}={budget}|early_stopping={self.early_stopping_rounds}"
+
+    def _candidates(self, space: Dict, n_iter: Optional[int], random_state: int, seeds: List[Dict]) -> List[Dict]:
+        """Sampled candidates, led by the warm-start seeds that still lie in the search space."""
+        grid = ParameterGrid(space)
+        if n_iter is None:
+            return list(grid)
+        candidates = []
+        for params in seeds:
+            params = {k: v for k, v in params.items() if k in space}
+            if params not in candidates and len(params) == len(space) and all(
+                    v in list(space[k]) for k, v in params.items()):
+                candidates.append(params)
+        # Fill up with random samples, skipping the seeds already included
+        n_iter = min(n_iter, len(grid))
+        for params in ParameterSampler(space, n_iter=n_iter, random_state=random_state):
+            if len(candidates) >= n_iter:
+                break
+            if params not in candidates:
+                candidates.append(params)
+        return candidates[:n_iter]
+
+    def run(self, classifiers: Sequence[Tuple[str, BaseEstimator, Dict]], cache: FoldCache,
+            scoring: str = "accuracy", n_iter: Optional[int] = 10, random_state: int = 42,
+            store: Optional[TrialStore] = None, data_fp: Optional[str] = None,
+            warm_start: int = 0) -> Dict[str, List[Dict]]:
+        """
+        Search every classifier's parameter space on the cached folds.
+
+        With a `store`, every (candidate, budget) pair already evaluated on the
+        same data fingerprint, CV scheme and scoring is taken from the store
+        instead of being refitted, and new evaluations are written back. With
+        `warm_start`, the best parameter sets of earlier runs lead the sampled
+        candidates.
+
+        Args:
+            classifiers (Sequence[Tuple[str, BaseEstimator, Dict]]): Name, estimator and parameter grid.
+            cache (FoldCache): Preprocessed folds shared by all candidates.
+            scoring (str): Scoring metric for evaluation. Default is "accuracy".
+            n_iter (Optional[int]): Candidates sampled per classifier; None evaluates the full grid. Default is 10.
+            random_state (int): Random seed for the candidate sampling. Default is 42.
+            store (Optional[TrialStore]): Persistent trial store. Default is None.
+            data_fp (Optional[str]): Fingerprint of the tuning data, required with a store.
+            warm_start (int): Number of previous best parameter sets seeding each classifier. Default is 0.
+
+        Returns:
+            Dict[str, List[Dict]]: Every evaluation per classifier (params, budget, scores, timings).
+        """
+        cv_key = repr(cache.cv)
+
+        # Sample the candidates and set up each classifier's halving schedule
+        state = {}
+        for name, estimator, params in classifiers:
+            space = {k: v for k, v in params.items() if not (self.resource == "n_estimators" and k == "n_estimators")}
+            resource = self.resource
+            if resource == "n_estimators" and "n_estimators" not in estimator.get_params():
+                resource = "n_samples"
+            budget_grid = params if resource == "n_estimators" else {}
+            # Trials are stored per classifier and fixed settings; only full-budget scores seed the search
+            key = classifier_key(name, estimator, [*space, *(["n_estimators"] if resource == "n_estimators" else [])])
+            seeds = store.best(key, cv=cv_key, scoring=scoring, k=warm_start,
+                               budget=self._budget_key(resource, self._budgets(budget_grid, 1)[-1])) \
+                if store and warm_start else []
+            candidates = self._candidates(space, n_iter, random_state, seeds)
+            state[name] = {"estimator": estimator, "candidates": candidates, "rung": 0, "resource": resource,
+                           "budgets": self._budgets(budget_grid, len(candidates)), "key": key,
+                           "results": [], "start": time.perf_counter(), "end": None}
+
+        folds = list(cache)
+        pool = None
+        if self.n_jobs != 1:
+            workers = None if self.n_jobs == -1 else self.n_jobs
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(folds, scoring))
+        else:
+            _init_worker(folds, scoring)
+
+        try:
+            while any(s["end"] is None for s in state.values()):
+                # Submit the current rung of every classifier that is still searching
+                tasks, rung_results = [], {}
+                for name, s in state.items():
+                    if s["end"] is not None:
+                        continue
+                    budget = s["budgets"][s["rung"]]
+                    resource = s["resource"] if budget is not None else None
+                    budget_key = self._budget_key(resource, budget)
+                    rung_results[name] = []
+                    for order, params in enumerate(s["candidates"]):
+                        task = {"name": name, "estimator": s["estimator"], "params": params, "resource": resource,
+                                "budget": budget, "budget_key": budget_key, "rung": s["rung"], "order": order,
+                                "early_stopping_rounds": self.early_stopping_rounds}
+                        stored = store.get(s["key"], params, data_fp, cv_key, scoring, budget_key) if store else None
+                        if stored is None:
+                            tasks.append(task)
+                        else:
+                            rung_results[name].append({**task, **stored, "estimator": None, "cached": True})
+                done = pool.map(_evaluate, tasks) if pool is not None else map(_evaluate, tasks)
+
+                fresh: Dict[str, List[Dict]] = {}
+                for result in done:
+                    fresh.setdefault(result["name"], []).append({**result, "cached": False})
+                for name, results in fresh.items():
+                    rung_results[name] += results
+                    if store is not None:
+                        store.put_many(state[name]["key"], data_fp, cv_key, scoring, results)
+
+                # Promote the best 1/factor of each classifier to the next rung
+                for name, results in rung_results.items():
+                    # Candidate order keeps ties deterministic between cached and fresh runs
+                    results.sort(key=lambda r: r["order"])
+                    s = state[name]
+                    s["results"] += results
+                    s["rung"] += 1
+                    if s["rung"] >= len(s["budgets"]):
+                        s["end"] = time.perf_counter()
+                        continue
+                    keep = max(1, len(results) // self.factor)
+                    ranked = sorted(results, key=lambda r: r["mean_score"], reverse=True)
+                    s["candidates"] = [r["params"] for r in ranked[:keep]]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            else:
+                _init_worker([], "accuracy")  # Do not keep the fold arrays alive in this process
+
+        self.report = []
+        for name, s in state.items():
+            final = [r for r in s["results"] if r["rung"] == len(s["budgets"]) - 1]
+            best = max(final, key=lambda r: r["mean_score"])
+            self.report.append({"classifier": name, "wall_time": s["end"] - s["start"],
+                                "cpu_time": sum(r["cpu_time"] for r in s["results"] if not r["cached"]),
+                                "evaluations": len(s["results"]),
+                                "cached": sum(r["cached"] for r in s["results"]), "best_score": best["mean_score"]})
+        return {name: s["results"] for name, s in state.items()}
+
+    @staticmethod
+    def best(results: List[Dict]) -> Dict:
+        """
+        Best candidate among the evaluations of the final (full-budget) rung.
+
+        Args:
+            results (List[Dict]): Evaluations of one classifier returned by `run`.
+
+        Returns:
+            Dict: Parameters of the best candidate, including the resource when it is n_estimators.
+        """
+        last_rung = max(r["rung"] for r in results)
+        best = max((r for r in results if r["rung"] == last_rung), key=lambda r: r["mean_score"])
+        params = dict(best["params"])
+        if best["resource"] == "n_estimators":
+            params["n_estimators"] = int(best["budget"])
+        return params
+
+
+if __name__ == '__main__':pass
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from src.cache import digest
+from src.process_data.scaler import PreprocessingPipeline
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    classifier  TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    data_fp     TEXT NOT NULL,
+    cv          TEXT NOT NULL,
+    scoring     TEXT NOT NULL,
+    budget      TEXT NOT NULL,
+    mean_score  REAL NOT NULL,
+    fold_scores TEXT NOT NULL,
+    wall_time   REAL,
+    cpu_time    REAL,
+    created     REAL NOT NULL,
+    PRIMARY KEY (classifier, params, data_fp, cv, scoring, budget)
+);
+CREATE INDEX IF NOT EXISTS trials_best ON trials (classifier, cv, scoring, mean_score);
+"""
+
+
+def _params_key(params: Dict) -> str:
+    """Canonical JSON of a parameter set, so equal sets always map to the same key."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def classifier_key(name: str, estimator, tuned: Iterable[str]) -> str:
+    """
+    Store key of a classifier: its name and a digest of its fixed settings.
+
+    The fixed settings are the estimator's parameters that the search does not
+    tune (e.g. `objective`, `num_class`, `random_state`), so changing any of
+    them starts a fresh set of trials instead of reusing scores of another model.
+
+    Args:
+        name (str): Classifier name.
+        estimator (BaseEstimator): Estimator template of the search.
+        tuned (Iterable[str]): Parameters sampled or set by the search.
+
+    Returns:
+        str: 'name|digest'.
+    """
+    tuned = set(tuned)
+    fixed = {k: v for k, v in estimator.get_params(deep=False).items() if k not in tuned}
+    return f"{name}|{digest(fixed)}"
+
+
+def fingerprint(X: np.ndarray, y: np.ndarray, preprocessing: Optional[PreprocessingPipeline] = None) -> str:
+    """
+    Fingerprint of a tuning dataset, used to recognise trials run on the same data.
+
+    Args:
+        X (np.ndarray): Feature dataset.
+        y (np.ndarray): Target labels.
+        preprocessing (Optional[PreprocessingPipeline]): Pipeline applied per fold, part of the data definition.
+
+    Returns:
+        str: Hex blake2b digest of the arrays and the pipeline settings.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(array.data)
+    if preprocessing is not None:
+        h.update(f"{preprocessing.threshold}|{preprocessing.strategy}|{preprocessing.dtype}".encode())
+    return h.hexdigest()
+
+
+class TrialStore:
+    """
+    Persistent SQLite store of hyperparameter trials.
+
+    A trial is keyed by classifier (`classifier_key`: name and fixed settings), hyperparameters, dataset fingerprint, CV
+    scheme (`repr` of the splitter), scoring and budget (resource level and
+    early stopping), and keeps its mean and fold scores and timings. The search
+    looks trials up before scoring them, so re-running a tuning skips every
+    candidate that was already evaluated, and the best trials of earlier runs
+    seed the next search.
+    """
+    def __init__(self, path: str = "data/trials.sqlite") -> None:
+        """
+        Args:
+            path (str): SQLite database file, created if missing. Default is 'data/trials.sqlite'.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get(self, classifier: str, params: Dict, data_fp: str, cv: str, scoring: str, budget: str) -> Optional[Dict]:
+        """
+        Look up one trial.
+
+        Returns:
+            Optional[Dict]: Mean score, fold scores and timings, or None if the trial was never run.
+        """
+        row = self.conn.execute(
+            "SELECT mean_score, fold_scores, wall_time, cpu_time FROM trials WHERE classifier=? AND params=? "
+            "AND data_fp=? AND cv=? AND scoring=? AND budget=?",
+            (classifier, _params_key(params), data_fp, cv, scoring, budget)).fetchone()
+        if row is None:
+            return None
+        return {"mean_score": row[0], "fold_scores": json.loads(row[1]), "wall_time": row[2], "cpu_time": row[3]}
+
+    def put_many(self, classifier: str, data_fp: str, cv: str, scoring: str, trials: List[Dict]) -> None:
+        """
+        Record evaluated trials in one transaction.
+
+        Args:
+            classifier (str): Classifier name.
+            data_fp (str): Dataset fingerprint.
+            cv (str): CV scheme.
+            scoring (str): Scoring metric.
+            trials (List[Dict]): Evaluations with params, budget, mean_score, fold_scores and timings.
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(classifier, _params_key(t["params"]), data_fp, cv, scoring, t["budget_key"], t["mean_score"],
+                  json.dumps(t["fold_scores"]), t.get("wall_time"), t.get("cpu_time"), now) for t in trials])
+
+    def best(self, classifier: str, cv: Optional[str] = None, scoring: Optional[str] = None,
+             k: int = 5, budget: Optional[str] = None) -> List[Dict]:
+        """
+        Best distinct parameter sets of a classifier across all stored datasets.
+
+        Scores of different budgets are not comparable (a low-fidelity rung can
+        score above the full budget), so searches pass their full-budget key.
+
+        Args:
+            classifier (str): Classifier key.
+            cv (Optional[str]): Only trials run with this CV scheme. Default is any.
+            scoring (Optional[str]): Only trials scored with this metric. Default is any.
+            k (int): Number of parameter sets. Default is 5.
+            budget (Optional[str]): Only trials run at this budget key. Default is any.
+
+        Returns:
+            List[Dict]: Parameter sets, best first.
+        """
+        query = "SELECT params, MAX(mean_score) AS score FROM trials WHERE classifier=?"
+        args = [classifier]
+        if cv is not None:
+            query += " AND cv=?"
+            args.append(cv)
+        if scoring is not None:
+            query += " AND scoring=?"
+            args.append(scoring)
+        if budget is not None:
+            query += " AND budget=?"
+            args.append(budget)
+        query += " GROUP BY params ORDER BY score DESC LIMIT ?"
+        return [json.loads(params) for params, _ in self.conn.execute(query, (*args, k))]
+
+    def query(self, classifier: Optional[str] = None, data_fp: Optional[str] = None) -> pd.DataFrame:
+        """
+        Stored trials as a frame, best first.
+
+        Args:
+            classifier (Optional[str]): Only this classifier. Default is all.
+            data_fp (Optional[str]): Only this dataset fingerprint. Default is all.
+
+        Returns:
+            pd.DataFrame: One row per trial with decoded params and fold scores.
+        """
+        query, args = "SELECT * FROM trials WHERE 1=1", []
+        if classifier is not None:
+            query += " AND classifier=?"
+            args.append(classifier)
+        if data_fp is not None:
+            query += " AND data_fp=?"
+            args.append(data_fp)
+        frame = pd.read_sql_query(query + " ORDER BY mean_score DESC", self.conn, params=args)
+        frame["params"] = frame["params"].map(json.loads)
+        frame["fold_scores"] = frame["fold_scores"].map(json.loads)
+        return frame
+
+
+if __name__ == '__main__':pass
@@ -1,32 +1,225 @@
 import yaml
 import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import weakref
 import datetime
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+_WRITERS = weakref.WeakSet()  # Open writers, drained at interpreter exit
+_CONFIGS: Dict[Tuple[str, int, int], Tuple[dict, List[str]]] = {}  # Parsed configs and problems by (path, size, mtime)
+
+
+class LogWriter:
+    """
+    Appends lines to date-stamped files from a background thread.
+
+    Callers only put lines on a bounded queue; the writer thread drains it in
+    batches, so each batch costs one write and one flush instead of an
+    open/append/close per line. Files rotate on the date of each line and are
+    kept open between batches. Pending lines are flushed at interpreter exit.
+    """
+
+    def __init__(self, directory: str, pattern: str = "{date}.log", header: Optional[str] = None,
+                 max_queue: int = 10000, batch_size: int = 1024, flush_interval: float = 0.5,
+                 block: bool = True):
+        """
+        Parameters:
+        - directory: Directory of the log files (resolved against the current directory now).
+        - pattern: File name pattern, formatted with the line's date (YYYY-MM-DD).
+        - header: Line written first to a new or empty file (e.g. a CSV header).
+        - max_queue: Lines buffered before `write` blocks (or drops, with block=False).
+        - batch_size: Maximum lines per write.
+        - flush_interval: Seconds the writer waits for more lines before flushing a partial batch.
+        - block: Block callers when the queue is full; otherwise drop the line and count it in `dropped`.
+        """
+        self.directory = os.path.abspath(directory)
+        self.pattern = pattern
+        self.header = header
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block = block
+        self.dropped = 0
+        self.errors = 0  # Batches that failed to write (e.g. unwritable directory); their lines are lost
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._files = {}  # date -> open file of that date
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()  # Serialises (re)starts and close
+        _WRITERS.add(self)
+
+    def _start(self):
+        # (Re)start the writer thread, e.g. in a forked worker that inherited the writer without it.
+        # Called with the lock held; the pid is set last, so threads that skip the lock see the new queue.
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._files = {}
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+        self._pid = os.getpid()
+
+    def write(self, line: str, date: Optional[str] = None):
+        """
+        Queues one line (without newline) for the file of `date` (default today).
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                # Double-checked: only the first of several racing threads starts the writer
+                if self._pid != os.getpid():
+                    self._start()
+        item = (date or datetime.date.today().isoformat(), line)
+        if not self._put(item, self.block):
+            self.dropped += 1
+
+    def _put(self, item, block: bool = True) -> bool:
+        """Queue `item`; False if the queue is full and cannot drain (non-blocking, or the writer died)."""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        while True:
+            try:
+                self._queue.put(item, block=block, timeout=self.flush_interval if block else None)
+                return True
+            except queue.Full:
+                if not block or not self._thread.is_alive():
+                    return False
+
+    def _open(self, date: str):
+        handle = self._files.get(date)
+        if handle is None:
+            # Rotate: lines of a new date go to a new file
+            for old in self._files.values():
+                old.close()
+            os.makedirs(self.directory, exist_ok=True)
+            handle = open(os.path.join(self.directory, self.pattern.format(date=date)), "a", encoding="utf-8")
+            if self.header is not None and handle.tell() == 0:
+                handle.write(self.header + "\n")
+            self._files = {date: handle}
+        return handle
+
+    def _run(self):
+        items = self._queue
+        while True:
+            try:
+                batch = [items.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(items.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            lines_by_date = {}
+            for item in batch:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    continue
+                else:
+                    lines_by_date.setdefault(item[0], []).append(item[1])
+            for date, lines in lines_by_date.items():
+                try:
+                    handle = self._open(date)
+                    handle.write("\n".join(lines) + "\n")
+                    handle.flush()
+                except OSError as e:
+                    # Keep draining: a dead writer thread would block every caller on the full queue
+                    self.errors += 1
+                    self._files.pop(date, None)  # reopen on the next batch
+                    print(f"LogWriter: could not write {len(lines)} lines to {self.directory}: {e}", file=sys.stderr)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()  # Everything queued before this marker is written
+                items.task_done()
+            if stop:
+                for handle in self._files.values():
+                    handle.close()
+                self._files = {}
+                return
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until every line queued so far is written; returns False on timeout.
+        """
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        if not self._put(done):
+            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Wait in slices, so a writer thread that dies meanwhile does not block the caller
+        while not done.wait(self.flush_interval if deadline is None
+                            else max(0.0, min(self.flush_interval, deadline - time.monotonic()))):
+            if not self._thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                return False
+        return True
+
+    def close(self):
+        """
+        Writes the pending lines, closes the files and stops the writer thread.
+        """
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                if self._put(None):
+                    self._thread.join()
+            self._thread = None
+            self._pid = None
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_WRITERS):
+        writer.close()
+
+
+def _reset_writer_locks():
+    # A lock held by another thread at fork time would stay locked forever in the child
+    for writer in list(_WRITERS):
+        writer._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writer_locks)
+
 
 class Logger:
-    """Custom logger to log messages to the console and save them to a single log file."""
+    """Custom logger to log messages to the console and save them to a daily log file."""
     
-    def __init__(self, log_dir: str = "logs", log_file_name: str = "run"):
+    def __init__(self, log_dir: str = "logs", log_file_name: str = "run", structured: bool = False,
+                 console: bool = True, **writer_kwargs):
         """
-        Initializes the logger, setting up the log file path.
+        Initializes the logger and its background file writer.
         
         Parameters:
         - log_dir: Directory where log files will be saved.
         - log_file_name: Base name for the log file (it will be appended with date).
+        - structured: Write JSON lines (time, level, pipeline, msg) instead of text lines.
+        - console: Also print every message.
+        - writer_kwargs: LogWriter settings (max_queue, batch_size, flush_interval, block).
         """
         self.log_dir = log_dir
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
+        self.log_file_name = log_file_name
+        self.structured = structured
+        self.console = console
+        self.writer = LogWriter(log_dir, pattern=f"{log_file_name}_{{date}}.log", **writer_kwargs)
 
-        now = datetime.datetime.now()
-        today = now.strftime("%Y-%m-%d")
-        
-        # Define a log file path for the entire run, based on the date
-        log_file_name = f"{log_file_name}_{today}.log"
-        self.log_file_path = os.path.join(self.log_dir, log_file_name)
+    @property
+    def log_file_path(self) -> str:
+        """Log file of the current date."""
+        today = datetime.date.today().isoformat()
+        return os.path.join(self.log_dir, f"{self.log_file_name}_{today}.log")
     
     def log(self, msg: str, level: str = "INFO", pipeline_name: str = "general"):
         """
-        Logs a message to the console and appends it to the log file for the current run.
+        Logs a message to the console and queues it for the log file of the current date.
         
         Parameters:
         - msg: The message to log.
@@ -39,17 +232,80 @@ class Logger:
         log_message = f"[{time}] [{level}] [{pipeline_name}] {msg}"
         
         # Log to console
-        print(log_message)
+        if self.console:
+            print(log_message)
         
-        # Write log to the log file
-        with open(self.log_file_path, "a+", encoding="utf-8") as log_file:
-            log_file.write(log_message + "\n")
+        # Queue the line for the background writer
+        if self.structured:
+            log_message = json.dumps({"time": now.isoformat(timespec="milliseconds"), "level": level,
+                                      "pipeline": pipeline_name, "msg": str(msg)})
+        self.writer.write(log_message, now.date().isoformat())
 
+    def flush(self):
+        """Blocks until all queued messages are in the log file."""
+        self.writer.flush()
 
-def load_config(config_path: str = "config.yaml") -> dict:
-    """Load configuration from a YAML file."""
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+    def close(self):
+        self.writer.close()
+
+
+def validate_config(config: dict) -> List[str]:
+    """
+    Check the sections and settings the pipeline reads from config.yaml.
+
+    Parameters:
+    - config: Parsed configuration.
+
+    Returns:
+    - List of problems, empty if the configuration is valid.
+    """
+    if not isinstance(config, dict):
+        return ["the configuration must be a mapping of sections"]
+    problems = []
+    data = config.get("data_params")
+    if not isinstance(data, dict):
+        return problems + ["missing section 'data_params'"]
+    for key in ("ticker_list_path", "data_path", "end_date"):
+        if not isinstance(data.get(key), str):
+            problems.append(f"data_params.{key} must be a string")
+    if not isinstance(data.get("window"), int) or data["window"] < 2:
+        problems.append("data_params.window must be an integer >= 2")
+    if not isinstance(data.get("train_test_split"), (int, float)) or not 0 < data["train_test_split"] < 1:
+        problems.append("data_params.train_test_split must be between 0 and 1")
+    if not isinstance(data.get("threshold"), (int, float)) or data["threshold"] <= 0:
+        problems.append("data_params.threshold must be a positive number")
+
+    class_names = config.get("evaluation_params", {}).get("class_names")
+    if class_names is not None and (not isinstance(class_names, dict) or
+                                    sorted(class_names.values()) != list(range(len(class_names)))):
+        problems.append("evaluation_params.class_names must map names to the class ids 0..n-1")
+    for section in ("evaluation_params", "profiling_params", "cache_params", "classifiers"):
+        if section in config and not isinstance(config[section], dict):
+            problems.append(f"section '{section}' must be a mapping")
+    return problems
+
+
+def load_config(config_path: str = "config.yaml", validate: bool = True) -> dict:
+    """
+    Load configuration from a YAML file.
+
+    The file is parsed (and validated) once per process and cached until it
+    changes on disk; each call returns a private copy.
+
+    Parameters:
+    - config_path: Path of the YAML file.
+    - validate: Raise ValueError if `validate_config` reports problems.
+    """
+    stat = os.stat(config_path)
+    key = (os.path.abspath(config_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _CONFIGS:
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f)
+        _CONFIGS[key] = (config, validate_config(config))
+    config, problems = _CONFIGS[key]
+    if validate and problems:
+        raise ValueError(f"Invalid config {config_path}: " + "; ".join(problems))
+    return copy.deepcopy(config)
 
 
 def update_ticker(config_path, new_ticker):
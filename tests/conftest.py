@@ -0,0 +1,18 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    """Small random-walk panel; the last ticker lists late, so its first rows are NaN."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", periods=400, name="Date")
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), 3)), axis=0))
+    values[:50, 2] = np.nan
+    return pd.DataFrame(values, index=dates, columns=["AAA.NS", "BBB.NS", "LATE.NS"])
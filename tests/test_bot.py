@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crpt-bot")
+sys.path.insert(0, BOT_DIR)
+
+import bot  # noqa: E402
+from simulator import SimulatedClient, load_bars  # noqa: E402
+from src.process_data.features import rsi as batch_rsi  # noqa: E402
+from src.process_data.streaming import StreamingRSI  # noqa: E402
+
+
+def _rsi(closes):
+    """Last value of the batch RSI (the pandas_ta.rsi formula) over `closes`."""
+    return batch_rsi(pd.DataFrame({"close": closes}), 14)["close"].iloc[-1]
+
+
+def _closes(klines):
+    return [float(k[4]) for k in klines]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = SimulatedClient(load_bars(os.path.join(BOT_DIR, "BTC-USD_data.csv")).iloc[:400])
+    monkeypatch.setattr(bot, "client", client)
+    monkeypatch.setattr(bot, "rsi_state", StreamingRSI(length=14))
+    monkeypatch.setattr(bot, "last_closed", None)
+    monkeypatch.setattr(bot, "last_rsi", float("nan"))
+    return client
+
+
+def test_get_rsi_against_the_old_hour_window(client):
+    seed = client.get_historical_klines(client.symbol, "1m", "1 hour ago UTC")
+    # The first call sees the same hour of klines the old pandas_ta version did
+    assert bot.get_rsi(bot.asset) == pytest.approx(_rsi(_closes(seed)), abs=1e-9)
+
+    streamed, window = [], []
+    while client.advance():
+        streamed.append(bot.get_rsi(bot.asset))
+        hour = client.get_historical_klines(client.symbol, "1m", "1 hour ago UTC")
+        window.append(_rsi(_closes(hour)))
+        # Streaming equals the batch RSI over every bar since the seed, forming bar included
+        since_seed = client.get_historical_klines(client.symbol, "1m", seed[0][0])
+        assert streamed[-1] == pytest.approx(_rsi(_closes(since_seed)), abs=1e-9)
+
+    # ...and only drifts from the old 60-bar window by the smoothing the window used to cut off
+    drift = np.abs(np.array(streamed) - np.array(window))
+    assert drift.max() > 0
+    assert np.median(drift) < 1.0 and drift.max() < 5.0
+
+
+def test_get_rsi_keeps_the_last_value_without_klines(client, monkeypatch):
+    client.advance(20)
+    value = bot.get_rsi(bot.asset)
+    monkeypatch.setattr(client, "get_historical_klines", lambda *args, **kwargs: [])
+    assert bot.get_rsi(bot.asset) == value
@@ -0,0 +1,43 @@
+import os
+
+import joblib
+
+from src import cache as cache_module
+from src.cache import StageCache
+
+
+def test_get_tolerates_entry_evicted_before_load(tmp_path, monkeypatch):
+    cache = StageCache(str(tmp_path))
+    cache.put("k", [1, 2, 3])
+
+    def evicted(path, *args, **kwargs):
+        os.remove(path)  # another process evicts between the exists check and the load
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(cache_module.joblib, "load", evicted)
+    assert cache.get("k", "miss") == "miss"
+    assert cache.misses == 1
+
+
+def test_get_tolerates_corrupt_entry_evicted_concurrently(tmp_path, monkeypatch):
+    cache = StageCache(str(tmp_path))
+    cache.put("k", [1, 2, 3])
+
+    def corrupt(path, *args, **kwargs):
+        os.remove(path)
+        raise EOFError("truncated pickle")
+    monkeypatch.setattr(cache_module.joblib, "load", corrupt)
+    assert cache.get("k", "miss") == "miss"
+
+
+def test_get_tolerates_entry_evicted_after_load(tmp_path, monkeypatch):
+    cache = StageCache(str(tmp_path))
+    cache.put("k", [1, 2, 3])
+    load = joblib.load
+
+    def load_then_evict(path, *args, **kwargs):
+        value = load(path, *args, **kwargs)
+        os.remove(path)
+        return value
+    monkeypatch.setattr(cache_module.joblib, "load", load_then_evict)
+    assert cache.get("k") == [1, 2, 3]
+    assert cache.hits == 1
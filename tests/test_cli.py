@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+import pytest
+import yaml
+
+from src import cli
+from src.utils import load_config
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+@pytest.fixture
+def workdir(prices, tmp_path, monkeypatch):
+    """Working directory with the panel as the joined CSV and a config pointing at it."""
+    config = load_config(os.path.join(ROOT, "config.yaml"))
+    config["data_params"]["data_path"] = "panel.csv"
+    config["evaluation_params"]["backtesting_results_path"] = "results/backtest.csv"
+    (tmp_path / "data").mkdir()
+    prices.to_csv(tmp_path / "data" / "panel.csv")
+    (tmp_path / "config.yaml").write_text(yaml.safe_dump(config))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_evaluate_saves_backtest(prices, workdir):
+    cli.main(["--no-profile", "train", "--no-cache"])
+    cli.main(["--no-profile", "evaluate", "--no-plot", "--out-dir", "report"])
+    stats = pd.read_csv(workdir / "results" / "backtest.csv", index_col=0)
+    assert list(stats.index) == list(prices.columns)
+    assert {"total_return", "sharpe", "max_drawdown", "trades"} <= set(stats.columns)
+
+
+def test_evaluate_without_backtest(workdir):
+    cli.main(["--no-profile", "train", "--no-cache"])
+    cli.main(["--no-profile", "evaluate", "--no-plot", "--no-backtest", "--out-dir", "report"])
+    assert not os.path.exists(workdir / "results" / "backtest.csv")
+
+
+def test_evaluate_reuses_the_train_stages(workdir, monkeypatch):
+    cli.main(["--no-profile", "train"])
+
+    def recompute(*args, **kwargs):
+        raise AssertionError("evaluate recomputed a stage cached by train")
+    monkeypatch.setattr("src.train.orchestrator.compute_features", recompute)
+    monkeypatch.setattr("src.train.orchestrator.make_labels", recompute)
+    cli.main(["--no-profile", "evaluate", "--no-plot", "--out-dir", "report"])
+    assert os.path.exists(workdir / "results" / "backtest.csv")
+
+
+def test_evaluate_rejects_classes_missing_from_class_names(workdir):
+    cli.main(["--no-profile", "train", "--no-cache"])
+    config = yaml.safe_load((workdir / "config.yaml").read_text())
+    config["evaluation_params"]["class_names"] = {"hold": 0, "buy": 1}
+    (workdir / "config.yaml").write_text(yaml.safe_dump(config))
+    with pytest.raises(SystemExit, match="missing from evaluation_params.class_names"):
+        cli.main(["--no-profile", "evaluate", "--no-plot", "--out-dir", "report"])
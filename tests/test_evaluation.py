@@ -0,0 +1,47 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from src.train import evaluation
+
+
+class _Recorder:
+    def __init__(self):
+        self.messages = []
+
+    def log(self, msg, level="INFO", pipeline_name="general"):
+        self.messages.append(msg)
+
+
+def test_legacy_plots_keep_backend_and_pyplot_state(tmp_path, monkeypatch):
+    logger = _Recorder()
+    monkeypatch.setattr(evaluation, "_LOGGER", logger)
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 3, 200)
+    scores = rng.dirichlet([1, 1, 1], 200)
+    backend = matplotlib.get_backend()
+    evaluation.plot_confusion_matrix(y_true, scores.argmax(axis=1), ["hold", "buy", "sell"], str(tmp_path / "cm.png"))
+    evaluation.plot_roc_curve(y_true, scores, str(tmp_path / "roc.png"))
+    assert matplotlib.get_backend() == backend
+    assert plt.get_fignums() == []
+    assert (tmp_path / "cm.png").exists() and (tmp_path / "roc.png").exists()
+    assert logger.messages == [f"ROC curve saved to {tmp_path / 'roc.png'}"]
+
+
+def test_report_rejects_empty_results(tmp_path):
+    generator = evaluation.ReportGenerator(out_dir=str(tmp_path / "report"), plot=False)
+    with pytest.raises(ValueError, match="results is empty"):
+        generator.run({})
+
+
+def test_report_escapes_model_names(tmp_path):
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 3, 50)
+    name = "<script>alert('x')</script>"
+    generator = evaluation.ReportGenerator(out_dir=str(tmp_path / "report"))
+    report = generator.run({name: (y_true, y_true)})
+    assert list(report.index) == [name]
+    page = (tmp_path / "report" / "report.html").read_text()
+    assert "<script>" not in page
+    assert "&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt;" in page
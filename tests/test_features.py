@@ -0,0 +1,60 @@
+import math
+import statistics
+
+import numpy as np
+import pandas as pd
+
+from src.process_data.features import compute_features
+
+
+def _ewm(values, alpha, adjust, min_periods=0):
+    """Exponentially weighted mean from the weights' definition, one bar at a time."""
+    out, seen = [], []
+    for x in values:
+        seen.append(x)
+        n = len(seen)
+        if adjust:
+            weights = [(1 - alpha) ** k for k in range(n)]
+        else:
+            # adjust=False: alpha (1-alpha)^k for the k-th latest value, (1-alpha)^(n-1) for the first one
+            weights = [alpha * (1 - alpha) ** k for k in range(n - 1)] + [(1 - alpha) ** (n - 1)]
+        mean = sum(w * v for w, v in zip(weights, reversed(seen))) / sum(weights)
+        out.append(mean if n >= max(min_periods, 1) else math.nan)
+    return out
+
+
+def _reference(close, window):
+    """Textbook indicators of one listed price series (no missing values), in plain Python."""
+    n = len(close)
+    sma = [sum(close[i - 19:i + 1]) / 20 if i >= 19 else math.nan for i in range(n)]
+    std = [statistics.stdev(close[i - 19:i + 1]) if i >= 19 else math.nan for i in range(n)]
+    ema = lambda span: _ewm(close, 2 / (span + 1), adjust=False)  # noqa: E731
+    momentum = [close[i] - close[i - window] if i >= window else math.nan for i in range(n)]
+    macd = [a - b for a, b in zip(ema(12), ema(26))]
+    # Wilder RSI over the changes, smoothed with alpha = 1 / window
+    changes = [close[i] - close[i - 1] for i in range(1, n)]
+    gain = _ewm([max(c, 0.0) for c in changes], 1 / window, adjust=True, min_periods=window)
+    loss = _ewm([max(-c, 0.0) for c in changes], 1 / window, adjust=True, min_periods=window)
+    rsi = [math.nan] + [100 * g / (g + l) for g, l in zip(gain, loss)]
+    return {"SMA_20_": sma, "EMA_20_": ema(20), "20_day_std_": std, "Momentum_": momentum, "MACD_": macd,
+            "rsi_": rsi}
+
+
+def test_compute_features_matches_textbook_indicators(prices):
+    prices = prices.iloc[:150]
+    features = compute_features(prices, window=14)
+    for ticker in prices.columns:
+        listed = prices[ticker].notna().to_numpy()
+        for prefix, expected in _reference(prices[ticker][listed].tolist(), 14).items():
+            column = features[f"{prefix}{ticker}"].to_numpy()
+            assert np.isnan(column[~listed]).all()
+            np.testing.assert_allclose(column[listed], expected, rtol=1e-9, atol=1e-9, err_msg=prefix + ticker)
+
+
+def test_hand_computed_values():
+    close = pd.DataFrame({"T": np.arange(1.0, 31.0)})
+    features = compute_features(close, window=14)
+    assert features["SMA_20_T"].iloc[19] == 10.5
+    assert features["Momentum_T"].iloc[20] == 14.0
+    assert np.isnan(features["rsi_T"].iloc[13]) and features["rsi_T"].iloc[14] == 100.0  # only gains
+    np.testing.assert_allclose(features["20_day_std_T"].iloc[19], np.std(np.arange(1, 21), ddof=1))
@@ -0,0 +1,146 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.process_data import fetcher
+from src.process_data.fetcher import DataSource, FetchJournal, RateLimiter, fetch_tickers
+
+
+class FakeSource(DataSource):
+    """Local provider over fixed bars; `failures[ticker]` downloads fail before it answers."""
+    def __init__(self, bars, failures=None):
+        self.bars = bars
+        self.failures = dict(failures or {})
+        self.calls = []
+
+    def download(self, ticker, start, end):
+        self.calls.append((ticker, start, end))
+        if self.failures.get(ticker, 0) > 0:
+            self.failures[ticker] -= 1
+            raise ConnectionError(f"provider error for {ticker}")
+        frame = self.bars[ticker]
+        return frame[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))].copy()
+
+
+def make_bars(tickers, start="2024-01-01", periods=30, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=periods, name="Date")
+    bars = {}
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+        bars[ticker] = pd.DataFrame({"Adj Close": close, "Close": close, "Volume": 1000.0}, index=dates)
+    return bars
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Record the backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(fetcher.time, "sleep", delays.append)
+    return delays
+
+
+def test_retry_with_exponential_backoff(tmp_path, no_sleep):
+    source = FakeSource(make_bars(["A"]), failures={"A": 2})
+    results = fetch_tickers(["A"], "2024-01-01", "2024-03-01", out_dir=str(tmp_path), source=source,
+                            retries=3, backoff=1.0)
+    assert results == {"A": "done"}
+    assert len(source.calls) == 3
+    # Delays double per attempt, with up to 100% jitter
+    assert 1.0 <= no_sleep[0] <= 2.0 and 2.0 <= no_sleep[1] <= 4.0
+
+
+def test_failure_is_recorded_and_run_resumes_from_journal(tmp_path, no_sleep):
+    journal = FetchJournal(str(tmp_path / "journal.jsonl"))
+    source = FakeSource(make_bars(["A", "B"]), failures={"B": 10})
+    results = fetch_tickers(["A", "B"], "2024-01-01", "2024-03-01", out_dir=str(tmp_path), source=source,
+                            retries=2, backoff=0.01, journal=journal)
+    assert results["A"] == "done" and "provider error for B" in results["B"]
+    entries = {e["ticker"]: e for e in journal.entries()}
+    assert entries["B"]["status"] == "failed" and "provider error" in entries["B"]["error"]
+    assert not (tmp_path / "B.csv").exists()
+
+    # The rerun skips A (done in the journal) and retries only B
+    source.failures, source.calls = {}, []
+    results = fetch_tickers(["A", "B"], "2024-01-01", "2024-03-01", out_dir=str(tmp_path), source=source,
+                            journal=journal)
+    assert results == {"B": "done"}
+    assert [call[0] for call in source.calls] == ["B"]
+    assert journal.completed("2024-03-01") == {"A", "B"}
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # The first token is available at once, the next five are spaced 1/rate apart
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+
+def test_fetch_respects_rate(tmp_path):
+    tickers = [f"T{i}" for i in range(6)]
+    start = time.monotonic()
+    fetch_tickers(tickers, "2024-01-01", "2024-03-01", out_dir=str(tmp_path), source=FakeSource(make_bars(tickers)),
+                  max_workers=2, rate=40)
+    # Two workers start on the burst, the remaining four wait for tokens
+    assert time.monotonic() - start >= 4 / 40 * 0.9
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.tokens = 0
+
+    def acquire(self):
+        self.tokens += 1
+
+
+@pytest.fixture
+def stored(tmp_path):
+    """Fake provider with 30 bars and a CSV holding the first 20 of them."""
+    bars = make_bars(["A"])
+    path = tmp_path / "A.csv"
+    bars["A"].iloc[:20].to_csv(path)
+    return FakeSource(bars), str(path)
+
+
+def test_update_appends_missing_bars(stored):
+    source, path = stored
+    action, rows = fetcher.update_ticker_csv(source, "A", path, "2024-01-01", "2024-03-01")
+    assert (action, rows) == ("appended", 10)
+    frame = pd.read_csv(path, index_col=0, parse_dates=True)
+    pd.testing.assert_frame_equal(frame, source.bars["A"], check_freq=False)
+    # Only the overlap and the missing range were downloaded
+    assert source.calls == [("A", str(source.bars["A"].index[15].date()), "2024-03-01")]
+
+
+def test_update_backfills_restated_overlap(stored):
+    source, path = stored
+    restated = source.bars["A"].copy()
+    restated.iloc[:18, restated.columns.get_loc("Adj Close")] *= 0.98  # dividend adjustment before the last bar
+    source.bars["A"] = restated
+    limiter = CountingLimiter()
+    action, rows = fetcher.update_ticker_csv(source, "A", path, "2024-01-01", "2024-03-01", limiter=limiter)
+    assert (action, rows) == ("backfilled", 30)
+    assert limiter.tokens == 1  # the backfill download takes its own token
+    pd.testing.assert_frame_equal(pd.read_csv(path, index_col=0, parse_dates=True), restated, check_freq=False)
+
+
+def test_update_uptodate(stored):
+    source, path = stored
+    last = source.bars["A"].index[19]
+    assert fetcher.update_ticker_csv(source, "A", path, "2024-01-01", str((last + pd.Timedelta(days=1)).date())) \
+        == ("uptodate", 0)
+    assert source.calls == []
+    # Bars due but none after the stored ones (e.g. a holiday): the overlap comes back, nothing to append
+    source.bars["A"] = source.bars["A"].iloc[:20]
+    assert fetcher.update_ticker_csv(source, "A", path, "2024-01-01", "2024-03-01") == ("uptodate", 0)
+
+
+def test_update_empty_download_is_an_error(stored):
+    source, path = stored
+    source.bars["A"] = source.bars["A"].iloc[:0]
+    with pytest.raises(ValueError, match="No data returned"):
+        fetcher.update_ticker_csv(source, "A", path, "2024-01-01", "2024-03-01")
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression, RidgeClassifier
+
+from src.train.inference import InferenceEngine, _label_predictor
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int) + (X[:, 2] > 1)
+    return X, y
+
+
+def test_engine_matches_voting_classifier(data):
+    X, y = data
+    clf = VotingClassifier([("rf", RandomForestClassifier(n_estimators=10, random_state=0)),
+                            ("gb", GradientBoostingClassifier(n_estimators=10, random_state=0)),
+                            ("lr", LogisticRegression(max_iter=500)),
+                            ("ridge", RidgeClassifier())]).fit(X, y)
+    engine = InferenceEngine.from_votingclf(clf)
+    assert all(labels is not None for labels in engine._labels[1:])
+    np.testing.assert_array_equal(engine.predict(X), clf.predict(X))
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_gbm_label_path_matches_predict(data, n_classes):
+    X, y = data
+    gb = GradientBoostingClassifier(n_estimators=20, random_state=0).fit(X, np.minimum(y, n_classes - 1))
+    labels = _label_predictor(gb)
+    assert labels is not None
+    # Small batches take the packed trees, larger ones the estimator's decision_function
+    for rows in (X[:1], X[:8], X):
+        np.testing.assert_array_equal(gb.classes_[labels(rows, rows.astype(np.float32))], gb.predict(rows))
+
+
+def test_gbm_falls_back_without_a_constant_init(data, monkeypatch):
+    X, y = data
+    gb = GradientBoostingClassifier(n_estimators=10, init=LogisticRegression(), random_state=0).fit(X, y)
+    assert _label_predictor(gb) is None
+    np.testing.assert_array_equal(InferenceEngine([gb]).predict(X), gb.predict(X))
+
+    gb = GradientBoostingClassifier(n_estimators=10, random_state=0).fit(X, y)
+    # Raw scores that disagree with the packed trees (e.g. a changed loss) disable the path
+    decision = gb.decision_function
+    monkeypatch.setattr(gb, "decision_function", lambda rows: decision(rows) + np.arange(len(rows))[:, None])
+    assert _label_predictor(gb) is None
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.process_data.labels import (BUY, HOLD, SELL, forward_returns, make_labels, multi_horizon_labels,
+                                     triple_barrier_labels)
+
+
+def loop_forward_labels(prices, horizons, threshold, lower):
+    """Reference: (bars, horizons, tickers) labels, one bar at a time."""
+    n_bars, n_tickers = prices.shape
+    labels = np.full((n_bars, len(horizons), n_tickers), np.nan)
+    for j in range(n_tickers):
+        for k, horizon in enumerate(horizons):
+            for t in range(n_bars - horizon):
+                r = prices[t + horizon, j] / prices[t, j] - 1.0
+                if np.isnan(r):
+                    continue
+                labels[t, k, j] = BUY if r > threshold else SELL if r < -lower else HOLD
+    return labels
+
+
+def loop_triple_barrier(prices, horizon, upper, lower, vertical="hold"):
+    """Reference: scan each bar's path until the first barrier touch; `upper`/`lower` are (bars, tickers)."""
+    n_bars, n_tickers = prices.shape
+    labels = np.full((n_bars, n_tickers), np.nan)
+    for j in range(n_tickers):
+        for t in range(n_bars - horizon):
+            path = prices[t + 1:t + 1 + horizon, j] / prices[t, j] - 1.0
+            if np.isnan(path).any() or np.isnan(upper[t, j]) or np.isnan(lower[t, j]):
+                continue
+            label = HOLD if vertical == "hold" else BUY if path[-1] > 0 else SELL if path[-1] < 0 else HOLD
+            for r in path:
+                if r >= upper[t, j]:
+                    label = BUY
+                    break
+                if r <= -lower[t, j]:
+                    label = SELL
+                    break
+            labels[t, j] = label
+    return labels
+
+
+@pytest.fixture
+def values(prices):
+    return prices.to_numpy()
+
+
+def test_forward_returns(prices, values):
+    returns = forward_returns(prices, 5).to_numpy()
+    np.testing.assert_allclose(returns[:-5], values[5:] / values[:-5] - 1.0)
+    assert np.isnan(returns[-5:]).all()
+
+
+@pytest.mark.parametrize("threshold, lower", [(0.01, None), (0.01, 0.03), (0.03, 0.005)])
+def test_make_labels_symmetric_and_asymmetric(prices, values, threshold, lower):
+    labels = make_labels(prices, horizon=3, threshold=threshold, lower=lower)
+    reference = loop_forward_labels(values, [3], threshold, threshold if lower is None else lower)[:, 0]
+    np.testing.assert_array_equal(labels.to_numpy(), reference)
+    assert list(labels.columns) == list(prices.columns)
+    # The late listing has no labels before its first price
+    assert labels["LATE.NS"].iloc[:50].isna().all()
+
+
+def test_multi_horizon_labels(prices, values):
+    horizons = (1, 5, 20, 500)  # The last horizon is longer than the history
+    labels = multi_horizon_labels(prices, horizons, threshold=0.01, lower=0.02)
+    assert labels.columns.names == ["horizon", "ticker"]
+    assert list(labels.columns) == [(h, t) for h in horizons for t in prices.columns]
+    reference = loop_forward_labels(values, horizons, 0.01, 0.02)
+    np.testing.assert_array_equal(labels.to_numpy().reshape(reference.shape), reference)
+    # Each horizon equals make_labels at that horizon
+    pd.testing.assert_frame_equal(labels[5], make_labels(prices, 5, 0.01, 0.02), check_names=False)
+
+
+@pytest.mark.parametrize("vertical", ["hold", "sign"])
+@pytest.mark.parametrize("upper, lower", [(0.03, None), (0.03, 0.02)])
+def test_triple_barrier_fixed(prices, values, upper, lower, vertical):
+    labels = triple_barrier_labels(prices, horizon=10, upper=upper, lower=lower, vertical=vertical)
+    lower = upper if lower is None else lower
+    reference = loop_triple_barrier(values, 10, np.full(values.shape, upper), np.full(values.shape, lower), vertical)
+    np.testing.assert_array_equal(labels.to_numpy(), reference)
+    # Both barriers are touched somewhere, and 'hold' leaves the untouched paths HOLD
+    touched = set(np.unique(reference[~np.isnan(reference)]))
+    assert {BUY, SELL} <= touched and (HOLD in touched) == (vertical == "hold")
+
+
+def test_triple_barrier_volatility_scaled(prices, values):
+    labels = triple_barrier_labels(prices, horizon=10, upper=2.0, lower=1.5, volatility_span=20)
+    volatility = prices.pct_change().ewm(span=20).std().to_numpy()
+    reference = loop_triple_barrier(values, 10, 2.0 * volatility, 1.5 * volatility)
+    np.testing.assert_array_equal(labels.to_numpy(), reference)
+    # No label where the volatility is still unknown
+    assert np.isnan(labels.to_numpy()[0]).all()
+
+
+def test_triple_barrier_edge_cases(prices):
+    assert triple_barrier_labels(prices.iloc[:5], horizon=10).isna().all().all()
+    with pytest.raises(ValueError):
+        triple_barrier_labels(prices, vertical="last")
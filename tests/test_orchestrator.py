@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.cache import StageCache
+from src.process_data.features import compute_features
+from src.process_data.labels import make_labels
+from src.train.orchestrator import BatchOrchestrator, ticker_split
+
+
+def _orchestrator(out_dir, cache=None) -> BatchOrchestrator:
+    return BatchOrchestrator(RandomForestClassifier(n_estimators=5, random_state=0), out_dir=str(out_dir),
+                             cache=cache)
+
+
+def test_run_without_cache(prices, tmp_path):
+    summary = _orchestrator(tmp_path / "models").run(prices)
+    assert list(summary["ticker"]) == list(prices.columns)
+    assert not summary["cached"].any()
+    for ticker in prices.columns:
+        assert os.path.exists(tmp_path / "models" / ticker / "model.pkl")
+
+
+def test_cached_rerun_matches(prices, tmp_path):
+    cache = StageCache(str(tmp_path / "cache"))
+    first = _orchestrator(tmp_path / "models", cache).run(prices)
+    second = _orchestrator(tmp_path / "models", cache).run(prices)
+    assert second["cached"].all()
+    assert list(second["accuracy"]) == list(first["accuracy"])
+
+
+def test_ticker_split_purges_the_label_horizon(prices):
+    horizon = 5
+    values = prices.to_numpy()
+    features = compute_features(prices).to_numpy()
+    labels = make_labels(prices, horizon).to_numpy()
+    position = prices.columns.get_loc("LATE.NS")
+
+    X_train, y_train, X_test, y_test, test_rows = ticker_split(values, features, labels, position, 0.75,
+                                                               return_rows=True)
+    *purged, purged_rows = ticker_split(values, features, labels, position, 0.75, return_rows=True,
+                                        purge=horizon, embargo=2)
+    # The purge drops the training rows whose label horizon reaches the test set, as WalkForwardCV does
+    assert len(purged[0]) == len(X_train) - horizon
+    np.testing.assert_array_equal(purged[0], X_train[:-horizon])
+    np.testing.assert_array_equal(purged[1], y_train[:-horizon])
+    # The embargo skips the first test rows
+    np.testing.assert_array_equal(purged_rows, test_rows[2:])
+    np.testing.assert_array_equal(purged[2], X_test[2:])
+    np.testing.assert_array_equal(purged[3], y_test[2:])
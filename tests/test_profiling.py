@@ -0,0 +1,36 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from src import profiling
+
+
+@pytest.fixture
+def rusage(monkeypatch):
+    """A fake `resource` module reporting a peak of 2 ** 30 units for self and 2 ** 31 for children."""
+    fake = types.SimpleNamespace(RUSAGE_SELF=0, RUSAGE_CHILDREN=-1,
+                                 getrusage=lambda who: types.SimpleNamespace(ru_maxrss=2 ** 31 if who else 2 ** 30))
+    monkeypatch.setitem(sys.modules, "resource", fake)
+    return fake
+
+
+@pytest.mark.parametrize("platform, expected", [("linux", 2 ** 20), ("darwin", 2 ** 10), ("freebsd14", 2 ** 20)])
+def test_peak_rss_units_by_platform(rusage, monkeypatch, platform, expected):
+    monkeypatch.setattr(sys, "platform", platform)
+    assert profiling.peak_rss_mb() == expected  # kilobytes on Linux and the BSDs, bytes on macOS
+    assert profiling.peak_rss_mb(children=True) == 2 * expected
+
+
+def test_peak_rss_without_resource(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "win32")
+    monkeypatch.setitem(sys.modules, "resource", None)  # Importing it would fail
+    assert np.isnan(profiling.peak_rss_mb())
+    with profiling.Profiler(report_dir="unused").stage("load") as rec:
+        pass
+    assert np.isnan(rec["peak_rss_mb"])
+
+
+def test_peak_rss_is_plausible():
+    assert 10 < profiling.peak_rss_mb() < 100_000
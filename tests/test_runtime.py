@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+BOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crpt-bot")
+sys.path.insert(0, BOT_DIR)
+
+import runtime  # noqa: E402
+from simulator import SimulatedClient, SimulatedExchange, load_bars  # noqa: E402
+
+
+class FlakyExchange(SimulatedExchange):
+    """Replay whose stream drops once after `drop_after` updates and whose orders are rejected."""
+    def __init__(self, client, drop_after=200):
+        super().__init__(client)
+        self.drop_after = drop_after
+        self.history_calls = []
+        self.orders = 0
+
+    async def history(self, symbol, interval, start):
+        self.history_calls.append(start)
+        return await super().history(symbol, interval, start)
+
+    async def stream(self, symbol, interval):
+        n = 0
+        async for kline in super().stream(symbol, interval):
+            n += 1
+            if self.drop_after is not None and n > self.drop_after:
+                self.drop_after = None
+                raise ConnectionError("websocket closed")
+            yield kline
+
+    async def market_order(self, symbol, side, quantity):
+        self.orders += 1
+        raise RuntimeError("order rejected")
+
+
+@pytest.fixture
+def messages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    lines = []
+    monkeypatch.setattr(runtime, "log", lines.append)
+    return lines
+
+
+def test_runtime_logs_failed_orders_and_reconnects(messages):
+    client = SimulatedClient(load_bars(os.path.join(BOT_DIR, "BTC-USD_data.csv")).iloc[:600])
+    exchange = FlakyExchange(client)
+    bot = runtime.BotRuntime(exchange, {client.symbol: {"entry_p": 45, "exit_p": 55}}, state_path="state",
+                             account_path="missing.json", poll=0.001, status_interval=3600, reconnect_delay=0)
+    asyncio.run(bot.run())
+
+    assert client.finished
+    assert len(exchange.history_calls) == 2
+    assert isinstance(exchange.history_calls[1], int)  # catches up from the last closed bar
+    assert exchange.orders > 0
+    assert sum(m == "ERROR: order rejected" for m in messages) == exchange.orders
+    assert sum("stream lost" in m for m in messages) == 1
+
+
+def test_replay_runtime_reports_tick_to_decision(tmp_path, monkeypatch):
+    from simulator import replay_runtime
+
+    monkeypatch.chdir(tmp_path)
+    client = SimulatedClient(load_bars(os.path.join(BOT_DIR, "BTC-USD_data.csv")).iloc[:300])
+    result = replay_runtime(client, 45, 55)
+    # One sample per streamed update: the forming and the closed update of every bar
+    assert len(result["decisions"]) == 2 * result["bars"] + 1
+    assert (result["decisions"] >= 0).all()
+
+
+def test_load_bars_uses_millisecond_open_times():
+    bars = load_bars(os.path.join(BOT_DIR, "BTC-USD_data.csv"))
+    # Binance kline open times are in ms; one-minute bars are 60 000 ms apart
+    assert bars["open_time"].diff().min() == 60_000
+    client = SimulatedClient(bars)
+    client.advance(140)
+    assert len(client.get_historical_klines(client.symbol, "1m", "1 hour ago UTC")) <= 61
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from src.process_data.scaler import PreprocessingPipeline
+
+
+@pytest.mark.parametrize("name", ["preprocessing.npz", "preprocessing"])
+def test_save_load_roundtrip(tmp_path, name):
+    X = np.random.default_rng(0).normal(size=(200, 5))
+    pipeline = PreprocessingPipeline(3.0).fit(X)
+    pipeline.save(str(tmp_path / name))
+    loaded = PreprocessingPipeline.load(str(tmp_path / name))
+    np.testing.assert_array_equal(loaded.transform(X), pipeline.transform(X))
+
+
+def test_handle_memmap_copy_stays_on_disk(tmp_path):
+    X = np.random.default_rng(0).normal(size=(1000, 4))
+    X[::50] = 100.0
+    handler = PreprocessingPipeline(3.0).fit(X).outliers_
+    mm = np.lib.format.open_memmap(str(tmp_path / "X.npy"), mode="w+", shape=X.shape, dtype=X.dtype)
+    mm[:] = X
+    result = handler.handle(mm, chunk_size=128)
+    assert isinstance(result, np.memmap)
+    np.testing.assert_array_equal(result, handler.handle(X))
+    np.testing.assert_array_equal(mm, X)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.train.cv import FoldCache, WalkForwardCV
+from src.train.search import ParallelSearch
+from src.train.trials import TrialStore, classifier_key
+
+
+@pytest.fixture
+def folds():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(240, 4))
+    y = (X[:, 0] + rng.normal(0, 0.5, 240) > 0).astype(int)
+    return FoldCache(X, y, WalkForwardCV(n_splits=2))
+
+
+def _search(folds, store, **fixed):
+    search = ParallelSearch(resource="n_estimators", max_resource=9, min_resource=3)
+    results = search.run([("RandomForestClassifier", RandomForestClassifier(random_state=0, **fixed),
+                           {"max_depth": [2, 3, 4]})], folds, n_iter=3, store=store, data_fp="data", warm_start=3)
+    return search.report[0], results["RandomForestClassifier"]
+
+
+def test_trials_are_reused_only_with_the_same_fixed_settings(folds, tmp_path):
+    store = TrialStore(str(tmp_path / "trials.sqlite"))
+    first, _ = _search(folds, store)
+    assert first["cached"] == 0
+    again, _ = _search(folds, store)
+    assert again["cached"] == again["evaluations"]
+    changed, _ = _search(folds, store, min_samples_leaf=5)
+    assert changed["cached"] == 0
+    store.close()
+
+
+def test_classifier_key_ignores_tuned_params():
+    a = RandomForestClassifier(max_depth=2, random_state=0)
+    b = RandomForestClassifier(max_depth=5, random_state=0)
+    assert classifier_key("rf", a, ["max_depth"]) == classifier_key("rf", b, ["max_depth"])
+    assert classifier_key("rf", a, ["max_depth"]) != classifier_key("rf", a.set_params(random_state=1), ["max_depth"])
+
+
+def test_best_ranks_full_budget_trials_only(tmp_path):
+    store = TrialStore(str(tmp_path / "trials.sqlite"))
+    trials = [{"params": {"max_depth": 2}, "budget_key": "low", "mean_score": 0.9, "fold_scores": [0.9]},
+              {"params": {"max_depth": 2}, "budget_key": "full", "mean_score": 0.5, "fold_scores": [0.5]},
+              {"params": {"max_depth": 3}, "budget_key": "full", "mean_score": 0.6, "fold_scores": [0.6]}]
+    store.put_many("rf", "data", "cv", "accuracy", trials)
+    assert store.best("rf", budget="full") == [{"max_depth": 3}, {"max_depth": 2}]
+    store.close()
+
+
+def test_refit_uses_the_scored_early_stopping():
+    from sklearn.ensemble import GradientBoostingClassifier
+    from src.train import search
+    from src.train.Htuning import Htuner
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] + rng.normal(0, 1.0, 300) > 0).astype(int)
+    tuner = Htuner([GradientBoostingClassifier(n_estimators=500, random_state=0)], [{"max_depth": [1, 2]}])
+    tuner.tune(X, y, cv=2, n_iter=2, early_stopping_rounds=3)
+    model = tuner.tuned_clf["GradientBoostingClassifier"]
+    assert model.n_iter_no_change == 3
+    assert model.n_estimators_ < 500
+    assert search._FOLDS == []
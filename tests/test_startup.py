@@ -0,0 +1,18 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from bench_startup import STARTUP, cold_time  # noqa: E402
+
+# Generous budget over a bare interpreter (the benchmark's default is 150 ms): the test guards against
+# heavy imports creeping back into startup, not against timing noise
+BUDGET_MS = 300.0
+
+
+def test_cli_startup_is_light():
+    bare, _ = cold_time("pass", 3)
+    startup, out = cold_time(STARTUP, 3)
+    assert json.loads(out) == [], "startup imports heavy modules"
+    assert 1000 * (startup - bare) < BUDGET_MS
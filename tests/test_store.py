@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.process_data.store import PriceStore
+from src.process_data.transformation import compile_frames
+
+FIELDS = ["Close", "Adj Close", "Volume"]
+
+
+def _write_csvs(prices, csv_dir):
+    os.makedirs(csv_dir, exist_ok=True)
+    for ticker in prices.columns:
+        close = prices[ticker].dropna()
+        frame = pd.DataFrame({"Close": close, "Adj Close": close * 0.97, "Volume": 1000.0})
+        frame.index = frame.index.strftime("%Y-%m-%d")
+        frame.index.name = "Date"
+        frame.to_csv(os.path.join(csv_dir, f"{ticker}.csv"))
+
+
+@pytest.fixture
+def store(prices, tmp_path):
+    _write_csvs(prices, tmp_path / "stock_dfs")
+    return PriceStore.from_csvs(list(prices.columns), csv_dir=str(tmp_path / "stock_dfs"),
+                                root=str(tmp_path / "store"))
+
+
+def test_frame_round_trips_the_compiled_panel(store, prices, tmp_path):
+    assert store.fields == FIELDS and store.tickers == list(prices.columns)
+    for field in FIELDS:
+        panel = compile_frames(store.tickers, fields=[field], csv_dir=str(tmp_path / "stock_dfs"))
+        panel.index = pd.DatetimeIndex(panel.index, name="Date").as_unit("ns")
+        pd.testing.assert_frame_equal(store.frame(field), panel, check_freq=False)
+    # The late listing's missing history stays NaN
+    assert store.frame()["LATE.NS"].iloc[:50].isna().all()
+
+
+def test_subsets_and_date_ranges(store, prices):
+    frame = store.frame("Close", tickers=["LATE.NS", "AAA.NS"], start="2015-03-01", end="2015-03-31")
+    expected = prices.loc["2015-03-01":"2015-03-31", ["LATE.NS", "AAA.NS"]]
+    assert len(frame) == 22 and frame["LATE.NS"].isna().any() and frame["LATE.NS"].notna().any()  # Spans the listing
+    np.testing.assert_allclose(frame.to_numpy(), expected.to_numpy(), rtol=1e-15)  # Through the CSV text
+    np.testing.assert_array_equal(frame.index, expected.index)
+    with pytest.raises(KeyError):
+        store.array("Open")
+
+
+def test_contiguous_reads_are_zero_copy(store):
+    mmap = store.array("Adj Close")
+    assert isinstance(mmap, np.memmap) and not mmap.flags.writeable
+    assert np.shares_memory(store.frame().to_numpy(), mmap)
+    assert np.shares_memory(store.read(tickers=["BBB.NS", "LATE.NS"], start="2015-06-01")[0], mmap)
+    # A scattered ticker selection copies only its columns
+    assert not np.shares_memory(store.read(tickers=["LATE.NS", "AAA.NS"])[0], mmap)
+
+
+def test_rebuild_extends_dates_and_tickers(store, prices, tmp_path):
+    old_frame = store.frame()
+    # New bars for every ticker and a newly listed ticker, as after an incremental fetch
+    more = pd.bdate_range(prices.index[-1] + pd.offsets.BDay(), periods=10)
+    extended = pd.concat([prices, pd.DataFrame(101.0, index=more, columns=prices.columns)])
+    extended["NEW.NS"] = np.where(extended.index >= more[0], 50.0, np.nan)
+    _write_csvs(extended, tmp_path / "stock_dfs")
+
+    rebuilt = PriceStore.from_csvs(list(extended.columns), csv_dir=str(tmp_path / "stock_dfs"),
+                                   root=str(tmp_path / "store"))
+    assert rebuilt.tickers == list(extended.columns) and len(rebuilt.dates) == len(prices) + 10
+    np.testing.assert_allclose(rebuilt.frame("Close").to_numpy(), extended.to_numpy(), rtol=1e-15)
+    assert not os.path.exists(f"{rebuilt.root}.tmp") and not os.path.exists(f"{rebuilt.root}.old")
+    # Frames of the replaced store stay readable: their memory map outlives the swap
+    pd.testing.assert_frame_equal(old_frame, store.frame())
+    assert len(store.frame()) == len(prices)
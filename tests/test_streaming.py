@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.process_data.features import build_feature_matrix, compute_features
+from src.process_data.streaming import StreamingEMA, StreamingFeatures, StreamingRSI
+
+
+@pytest.fixture
+def gappy(prices) -> pd.DataFrame:
+    """The shared panel (late listing in LATE.NS) plus a few isolated missing days."""
+    prices = prices.copy()
+    prices.iloc[[120, 121, 300], 0] = np.nan
+    prices.iloc[200, 1] = np.nan
+    return prices
+
+
+def _stream(prices: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+    engine = StreamingFeatures(prices.columns, window=window)
+    rows = [engine.update(bar) for bar in prices.to_numpy()]
+    return pd.DataFrame(rows, index=prices.index)
+
+
+def test_features_match_batch(gappy):
+    streamed = _stream(gappy)
+    columns = list(gappy.columns) + list(streamed.columns)
+    expected = build_feature_matrix(gappy, columns, window=14)
+    actual = pd.concat([gappy, streamed], axis=1)[columns]
+    pd.testing.assert_frame_equal(actual, expected, check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+def test_late_listing_recovers(gappy):
+    streamed = _stream(gappy)
+    for prefix in ("EMA_20_", "MACD_", "rsi_", "SMA_20_"):
+        assert np.isfinite(streamed[f"{prefix}LATE.NS"].iloc[-1])
+
+
+def test_peek_matches_update(gappy):
+    engine = StreamingFeatures(gappy.columns)
+    engine.seed(gappy.iloc[:-1])
+    peeked = engine.peek(gappy.to_numpy()[-1])
+    pd.testing.assert_series_equal(peeked, engine.update(gappy.to_numpy()[-1]))
+
+
+@pytest.mark.parametrize("adjust", [False, True])
+def test_ema_matches_pandas_ewm(adjust):
+    x = pd.Series([np.nan, np.nan, 3.0, 4.0, np.nan, np.nan, 1.0, 2.0, np.nan, 5.0])
+    ema = StreamingEMA(alpha=0.3, adjust=adjust, min_periods=2)
+    streamed = [ema.update(v) for v in x]
+    np.testing.assert_allclose(streamed, x.ewm(alpha=0.3, adjust=adjust, min_periods=2).mean(), rtol=1e-12)
+
+
+def test_rsi_matches_batch(gappy):
+    rsi = StreamingRSI(14)
+    streamed = np.array([rsi.update(bar) for bar in gappy.to_numpy()])
+    expected = compute_features(gappy, window=14).filter(like="rsi_").to_numpy()
+    np.testing.assert_allclose(streamed, expected, rtol=1e-9, atol=1e-9)
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crpt-bot")
+sys.path.insert(0, BOT_DIR)
+
+import bot  # noqa: E402
+from simulator import SimulatedClient, load_bars  # noqa: E402
+from state import StateStore  # noqa: E402
+from sweep import crossover_actions, load_closes, sweep_length  # noqa: E402
+from src.process_data.features import rsi  # noqa: E402
+from src.train.backtest import positions_from_actions  # noqa: E402
+
+ENTRY, EXIT = 45.0, 55.0
+
+
+@pytest.fixture
+def closes():
+    return load_closes(os.path.join(BOT_DIR, "BTC-USD_data.csv"))[:400]
+
+
+@pytest.fixture
+def live_bot(closes, tmp_path, monkeypatch):
+    """bot.step against a simulated exchange with instant fills; the trades it logs are collected."""
+    monkeypatch.chdir(tmp_path)
+    bars = load_bars(os.path.join(BOT_DIR, "BTC-USD_data.csv")).iloc[:len(closes)]
+    monkeypatch.setattr(bot, "client", SimulatedClient(bars, warmup=0))
+    state = StateStore(str(tmp_path / "state"), fsync=False)
+    monkeypatch.setattr(bot, "state", state)
+    monkeypatch.setattr(bot, "entry_p", ENTRY)
+    monkeypatch.setattr(bot, "exit_p", EXIT)
+    trades = []
+    monkeypatch.setattr(bot, "trade_log", lambda sym, side, price, amount: trades.append(side))
+    yield trades
+    state.close()
+
+
+def test_crossovers_reproduce_bot_step(closes, live_bot):
+    rsi_values = rsi(pd.DataFrame({"close": closes}), 14)["close"].to_numpy()
+
+    # The bot, one closed bar at a time
+    decisions, positions = [None], [0.0]
+    for t in range(1, len(closes)):
+        bot.client.advance()
+        side = bot.step(rsi_values[t], rsi_values[t - 1])
+        decisions.append(side)
+        positions.append(1.0 if side == "buy" else 0.0 if side == "sell" else positions[-1])
+
+    # The sweep's vectorized rules for the same (entry, exit) pair
+    actions = crossover_actions(rsi_values, np.array([ENTRY]), np.array([EXIT]))
+    swept = positions_from_actions(actions)[:, 0, 0]
+
+    assert live_bot == [side for side in decisions if side is not None]
+    assert sum(side is not None for side in decisions) >= 10  # Enough trades to compare
+    np.testing.assert_array_equal(swept, positions)
+    # Bars where the position changes are exactly the bot's trades
+    changes = np.flatnonzero(np.diff(swept, prepend=0.0))
+    assert list(changes) == [t for t, side in enumerate(decisions) if side is not None]
+
+    stats = sweep_length(closes, 14, [ENTRY], [EXIT], cost=0.0)
+    assert int(stats["trades"].iloc[0]) == len(changes)
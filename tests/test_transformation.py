@@ -0,0 +1,64 @@
+import os
+import pickle
+
+import pandas as pd
+import pytest
+
+from src.process_data.transformation import compile_data
+
+
+@pytest.fixture
+def universe(prices, tmp_path, monkeypatch):
+    """Per-ticker CSVs and the ticker list under tmp_path/data, with tmp_path as the working directory."""
+    os.makedirs(tmp_path / "data" / "stock_dfs")
+    for ticker in prices.columns:
+        close = prices[ticker].dropna()
+        if ticker == "BBB.NS":
+            close = close.drop(close.index[100:105])  # A trading halt: dates the other tickers have
+        # The columns yfinance writes, in its order
+        frame = pd.DataFrame({"Open": close * 0.99, "High": close * 1.01, "Low": close * 0.98, "Close": close,
+                              "Adj Close": close * 0.97, "Volume": 1000.0})
+        frame.index = frame.index.strftime("%Y-%m-%d")
+        frame.index.name = "Date"
+        frame.to_csv(tmp_path / "data" / "stock_dfs" / f"{ticker}.csv")
+    with open(tmp_path / "data" / "tickers.pickle", "wb") as f:
+        pickle.dump(list(prices.columns), f)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _baseline_join(tickers):
+    """The original per-ticker join of compile_data (without its `axis=1`, which pandas 3 rejects with `columns`)."""
+    main_frame = pd.DataFrame()
+    for ticker in tickers:
+        frame = pd.read_csv(f"data/stock_dfs/{ticker}.csv")
+        frame.set_index('Date', inplace=True)
+        frame.rename(columns={'Adj Close': f'{ticker}'}, inplace=True)
+        frame.drop(columns=['Open', 'High', 'Low', 'Close', 'Volume'], inplace=True)
+        main_frame = frame if main_frame.empty else main_frame.join(frame, how='outer')
+    return main_frame
+
+
+@pytest.mark.parametrize("store_path", [None, "store"])
+def test_compile_matches_the_baseline_join(universe, prices, store_path):
+    compile_data("tickers.pickle", "joined.csv", store_path=store_path)
+    _baseline_join(prices.columns).to_csv(universe / "baseline.csv")
+    with open(universe / "data" / "joined.csv") as compiled, open(universe / "baseline.csv") as baseline:
+        assert compiled.read() == baseline.read()
+
+    joined = pd.read_csv(universe / "data" / "joined.csv", index_col="Date")
+    assert list(joined.columns) == list(prices.columns)
+    # The late listing is NaN until its first date, the halted ticker on its missing dates only
+    assert joined["LATE.NS"].isna().sum() == 50 and joined["LATE.NS"].iloc[50:].notna().all()
+    assert joined["BBB.NS"].isna().sum() == 5 and joined["AAA.NS"].notna().all()
+
+
+def test_compile_without_output_raises(universe):
+    with pytest.raises(ValueError):
+        compile_data("tickers.pickle", None)
+    assert not os.path.exists(universe / "data" / "None")
+
+
+def test_compile_store_only(universe):
+    store = compile_data("tickers.pickle", None, store_path="store")
+    assert store is not None and not os.path.exists(universe / "data" / "None")
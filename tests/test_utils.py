@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.utils import LogWriter
+
+
+def test_concurrent_first_writes_start_one_writer(tmp_path, monkeypatch):
+    starts = []
+    start = LogWriter._start
+
+    def slow_start(self):
+        starts.append(threading.get_ident())
+        time.sleep(0.05)  # widen the race between the check and the start
+        start(self)
+    monkeypatch.setattr(LogWriter, "_start", slow_start)
+
+    writer = LogWriter(str(tmp_path), flush_interval=0.01)
+    barrier = threading.Barrier(8)
+
+    def write(k):
+        barrier.wait()
+        for i in range(100):
+            writer.write(f"{k},{i}", "2024-01-01")
+    threads = [threading.Thread(target=write, args=(k,)) for k in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    assert len(starts) == 1
+    with open(os.path.join(tmp_path, "2024-01-01.log")) as f:
+        assert len(f.read().splitlines()) == 800
+
+
+def _within(seconds, target, *args):
+    """Run `target` in a thread; True if it returned within `seconds`."""
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return not thread.is_alive()
+
+
+def test_unwritable_directory_does_not_block(tmp_path, capsys):
+    (tmp_path / "file").write_text("")
+    writer = LogWriter(str(tmp_path / "file" / "logs"), max_queue=10, flush_interval=0.01)
+
+    def write_many():
+        for i in range(100):
+            writer.write(str(i), "2024-01-01")
+    assert _within(5, write_many)
+    assert _within(5, writer.flush)
+    assert _within(5, writer.close)
+    assert writer.errors > 0
+    assert "LogWriter: could not write" in capsys.readouterr().err
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_writer_thread_does_not_block(tmp_path, monkeypatch):
+    def crash(self):
+        raise RuntimeError("writer thread died")
+    monkeypatch.setattr(LogWriter, "_run", crash)
+    writer = LogWriter(str(tmp_path), max_queue=5, flush_interval=0.01)
+
+    def write_many():
+        for i in range(20):
+            writer.write(str(i), "2024-01-01")
+    assert _within(5, write_many)
+    assert writer.dropped > 0
+    assert _within(5, writer.flush)
+    assert _within(5, writer.close)